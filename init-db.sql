@@ -15,11 +15,26 @@ CREATE TABLE IF NOT EXISTS conversation_summaries (
     embedding vector(1536) -- OpenAI embeddings are 1536 dimensions
 );
 
--- Create index for vector similarity search
-CREATE INDEX IF NOT EXISTS conversation_summaries_embedding_idx 
-ON conversation_summaries 
-USING ivfflat (embedding vector_cosine_ops) 
-WITH (lists = 100);
+-- Create HNSW index for vector similarity search
+-- (ivfflat needs existing rows to train its lists; HNSW works from an empty table.
+-- Tune recall per query with SET hnsw.ef_search, see src/chatbot/summary_store.py)
+CREATE INDEX IF NOT EXISTS conversation_summaries_embedding_hnsw_idx
+ON conversation_summaries
+USING hnsw (embedding vector_cosine_ops)
+WITH (m = 16, ef_construction = 64);
+
+-- Full-text search column and indexes for hybrid (lexical + vector) search
+-- (the summary prompt's "Here are the things we discussed:" and "Topics:"
+-- labels are left out, they would match every row)
+ALTER TABLE conversation_summaries ADD COLUMN IF NOT EXISTS summary_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('english', regexp_replace(summary,
+        '^\s*(here are the things we discussed|topics)\s*:', '', 'gin'))) STORED;
+
+CREATE INDEX IF NOT EXISTS conversation_summaries_summary_tsv_idx
+ON conversation_summaries USING gin (summary_tsv);
+
+CREATE INDEX IF NOT EXISTS conversation_summaries_topics_idx
+ON conversation_summaries USING gin (topics);
 
 -- Create index for thread_id lookups
 CREATE INDEX IF NOT EXISTS conversation_summaries_thread_id_idx 
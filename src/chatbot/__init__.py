@@ -2,8 +2,22 @@
 LangGraph Chatbot Module
 
 This module contains modern conversational AI implementations using LangGraph.
+
+``ConversationBot`` is imported on first access, so importing a submodule
+(a node, a store, a benchmark) doesn't load the whole graph.
 """
 
-from .conversation_bot import ConversationBot
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .conversation_bot import ConversationBot
 
 __all__ = ["ConversationBot"]
+
+
+def __getattr__(name: str):
+    if name == "ConversationBot":
+        from .conversation_bot import ConversationBot
+
+        return ConversationBot
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,6 @@
+"""
+Benchmarks for the conversation chatbot.
+
+Run a benchmark as a module from the repository root, for example:
+    uv run python -m src.chatbot.benchmarks.retrieval_latency
+"""
@@ -0,0 +1,75 @@
+"""
+Concurrent-thread throughput of ConversationBot.achat on one event loop.
+
+Uses fake model and vector store backends with fixed latencies, so the
+numbers show how well the async graph overlaps I/O rather than API speed.
+
+    uv run python -m src.chatbot.benchmarks.async_throughput
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+
+from src.chatbot.benchmarks.fakes import FakeChatModel, FakeVectorStore
+from src.chatbot.checkpointer import Checkpointers
+from src.chatbot.conversation_bot import ConversationBot
+from src.chatbot.instrumentation import configure_logging
+from src.llm import override_chat_model
+
+
+async def run_threads(bot: ConversationBot, threads: int, turns: int) -> float:
+    """Run ``threads`` conversations concurrently and return turns per second."""
+
+    async def conversation(index: int) -> None:
+        for turn in range(turns):
+            await bot.achat(f"Question {turn} about LangGraph", f"thread-{index}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(conversation(i) for i in range(threads)))
+    return threads * turns / (time.perf_counter() - start)
+
+
+def run_sync(bot: ConversationBot, turns: int) -> float:
+    """Baseline: the blocking chat API, one turn at a time."""
+    start = time.perf_counter()
+    for turn in range(turns):
+        bot.chat(f"Question {turn} about LangGraph", "sync-thread")
+    return turns / (time.perf_counter() - start)
+
+
+def main():
+    configure_logging()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--model-latency-ms", type=float, default=100)
+    parser.add_argument("--db-latency-ms", type=float, default=20)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    args = parser.parse_args()
+
+    override_chat_model(
+        "openai:gpt-4o", FakeChatModel(latency_ms=args.model_latency_ms)
+    )
+    bot = ConversationBot(
+        vector_store=FakeVectorStore(latency_ms=args.db_latency_ms),
+        checkpointers=Checkpointers(backend="memory"),
+    )
+
+    print("⏱️ Conversation throughput with fake backends")
+    with contextlib.redirect_stdout(io.StringIO()):
+        sync_rate = run_sync(bot, args.turns)
+    print(f"{'sync chat':<14} {sync_rate:8.1f} turns/s")
+
+    for threads in args.concurrency:
+        with contextlib.redirect_stdout(io.StringIO()):
+            rate = asyncio.run(run_threads(bot, threads, args.turns))
+        print(
+            f"{f'async x{threads}':<14} {rate:8.1f} turns/s "
+            f"({rate / sync_rate:.1f}x sync)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Checkpoint put/get latency and resident memory: MemorySaver vs persistent backends.
+
+Each backend runs in its own subprocess so resident memory is measured cleanly.
+The postgres backend needs the local Postgres from docker-compose.yml.
+"memory-spill" keeps a tenth of the threads in memory and spills the rest to
+disk, so its reads include restoring evicted threads.
+
+    uv run python -m src.chatbot.benchmarks.checkpointer_bench --threads 10000
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.base.id import uuid6
+
+from src.chatbot.benchmarks.retrieval_latency import percentile
+from src.chatbot.checkpointer import Checkpointers, RetentionPolicy
+from src.chatbot.instrumentation import configure_logging
+from src.chatbot.memory_saver import BoundedMemorySaver
+
+
+def resident_memory_mb() -> float:
+    """Current resident set size (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024**2
+    except OSError:
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage / 1024**2 if sys.platform == "darwin" else usage / 1024
+
+
+def make_messages(turns: int) -> List:
+    messages = []
+    for turn in range(turns):
+        messages.append(HumanMessage(content=f"Question {turn} about deploying LangGraph"))
+        messages.append(AIMessage(content=f"Answer {turn}: use Docker and a managed Postgres. " * 4))
+    return messages
+
+
+def run_backend(backend: str, threads: int, turns: int) -> dict:
+    """Put one checkpoint per thread, then read every thread back."""
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpointers = Checkpointers(
+            backend="memory" if backend == "memory-spill" else backend,
+            sqlite_path=os.path.join(tmp, "checkpoints.sqlite"),
+            retention=RetentionPolicy(max_thread_age_seconds=None),
+        )
+        saver = checkpointers.saver
+        if backend == "memory-spill":
+            saver = BoundedMemorySaver(
+                max_threads=max(1, threads // 10),
+                ttl_seconds=None,
+                spill_dir=os.path.join(tmp, "spill"),
+            )
+        elif backend == "memory":
+            saver.max_threads = threads  # unbounded baseline
+        messages = make_messages(turns)
+        baseline_mb = resident_memory_mb()
+
+        put_ms, get_ms = [], []
+        for index in range(threads):
+            checkpoint = empty_checkpoint()
+            checkpoint["id"] = str(uuid6(clock_seq=index))
+            version = saver.get_next_version(None, None)
+            checkpoint["channel_values"] = {"messages": messages}
+            checkpoint["channel_versions"] = {"messages": version}
+            config = {"configurable": {"thread_id": f"bench-{index}", "checkpoint_ns": ""}}
+
+            start = time.perf_counter()
+            saver.put(config, checkpoint, {"source": "input", "step": 0}, {"messages": version})
+            put_ms.append((time.perf_counter() - start) * 1000)
+
+        for index in range(threads):
+            config = {"configurable": {"thread_id": f"bench-{index}"}}
+            start = time.perf_counter()
+            saver.get_tuple(config)
+            get_ms.append((time.perf_counter() - start) * 1000)
+
+        result = {
+            "backend": backend,
+            "threads": threads,
+            "put_p50_ms": percentile(put_ms, 50),
+            "put_p99_ms": percentile(put_ms, 99),
+            "get_p50_ms": percentile(get_ms, 50),
+            "get_p99_ms": percentile(get_ms, 99),
+            "rss_growth_mb": resident_memory_mb() - baseline_mb,
+        }
+        if backend == "postgres":
+            for index in range(threads):
+                saver.delete_thread(f"bench-{index}")
+        checkpointers.close()
+        return result
+
+
+def main():
+    configure_logging()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=10_000)
+    parser.add_argument("--turns", type=int, default=10, help="turns of history per thread")
+    parser.add_argument(
+        "--backends", nargs="+", default=["memory", "memory-spill", "sqlite", "postgres"]
+    )
+    parser.add_argument("--backend", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend:
+        print(json.dumps(run_backend(args.backend, args.threads, args.turns)))
+        return
+
+    print(f"⏱️ Checkpointer benchmark: {args.threads} threads x {args.turns} turns")
+    for backend in args.backends:
+        completed = subprocess.run(
+            [
+                sys.executable, "-m", __spec__.name,
+                "--backend", backend,
+                "--threads", str(args.threads),
+                "--turns", str(args.turns),
+            ],
+            capture_output=True,
+            text=True,
+        )
+        if completed.returncode != 0:
+            print(f"{backend:<12} ❌ failed: {completed.stderr.strip().splitlines()[-1]}")
+            continue
+        r = json.loads(completed.stdout.strip().splitlines()[-1])
+        print(
+            f"{backend:<12} put p50={r['put_p50_ms']:.3f}ms p99={r['put_p99_ms']:.3f}ms | "
+            f"get p50={r['get_p50_ms']:.3f}ms p99={r['get_p99_ms']:.3f}ms | "
+            f"RSS +{r['rss_growth_mb']:.1f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
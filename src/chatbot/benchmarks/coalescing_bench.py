@@ -0,0 +1,140 @@
+"""
+Embedding and search requests saved by request coalescing under a burst.
+
+A burst of sessions arrives at once. Most ask one of a few popular questions
+and the rest ask distinct ones. Each session embeds its query through
+CachedEmbeddings, then runs a simulated pgvector search. The bench reports
+backend calls, the coalescing ratio, the micro-batch size and per-request
+latency with coalescing on and off. It runs on threads (sync API) and on one
+event loop (async API).
+
+    uv run python -m src.chatbot.benchmarks.coalescing_bench --sessions 200
+"""
+
+import argparse
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from src.chatbot.benchmarks.fakes import HashEmbeddings
+from src.chatbot.benchmarks.retrieval_latency import percentile
+from src.chatbot.coalescing import SingleFlight, vector_key
+from src.chatbot.embedding_cache import CachedEmbeddings
+from src.chatbot.instrumentation import configure_logging
+
+
+def make_queries(sessions: int, popular: int, popular_share: float) -> List[str]:
+    rng = random.Random(0)
+    return [
+        f"Popular question {rng.randrange(popular)}"
+        if rng.random() < popular_share
+        else f"Distinct question {i}"
+        for i in range(sessions)
+    ]
+
+
+def run_threads(queries: List[str], coalesce: bool, args) -> Dict[str, float]:
+    backend = HashEmbeddings(latency_ms=args.embedding_latency_ms)
+    embeddings = CachedEmbeddings(backend, model="hash", db_path=None, coalesce=coalesce)
+    flight = SingleFlight("bench-search", enabled=coalesce)
+    searches = 0
+    counter_lock = threading.Lock()
+    barrier = threading.Barrier(len(queries))
+
+    def search() -> List[str]:
+        nonlocal searches
+        with counter_lock:
+            searches += 1
+        time.sleep(args.db_latency_ms / 1000)
+        return ["match"]
+
+    def session(query: str) -> float:
+        barrier.wait()
+        start = time.perf_counter()
+        embedding = embeddings.embed_query(query)
+        flight.do((vector_key(embedding), 2, 0.8), search)
+        return (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        latencies = list(executor.map(session, queries))
+    return summarize(latencies, backend.calls, searches, embeddings, flight)
+
+
+async def run_async(queries: List[str], coalesce: bool, args) -> Dict[str, float]:
+    backend = HashEmbeddings(latency_ms=args.embedding_latency_ms)
+    embeddings = CachedEmbeddings(backend, model="hash", db_path=None, coalesce=coalesce)
+    flight = SingleFlight("bench-search", enabled=coalesce)
+    searches = 0
+
+    async def search() -> List[str]:
+        nonlocal searches
+        searches += 1
+        await asyncio.sleep(args.db_latency_ms / 1000)
+        return ["match"]
+
+    async def session(query: str) -> float:
+        start = time.perf_counter()
+        embedding = await embeddings.aembed_query(query)
+        await flight.ado((vector_key(embedding), 2, 0.8), search)
+        return (time.perf_counter() - start) * 1000
+
+    latencies = await asyncio.gather(*(session(query) for query in queries))
+    return summarize(list(latencies), backend.calls, searches, embeddings, flight)
+
+
+def summarize(
+    latencies: List[float],
+    embedding_calls: int,
+    searches: int,
+    embeddings: CachedEmbeddings,
+    flight: SingleFlight,
+) -> Dict[str, float]:
+    stats = embeddings.stats()
+    return {
+        "embedding_calls": embedding_calls,
+        "searches": searches,
+        "embedding_coalescing": stats["coalescing_ratio"],
+        "search_coalescing": flight.stats()["coalescing_ratio"],
+        "avg_batch": stats.get("avg_batch_size", 1.0),
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+def report(label: str, result: Dict[str, float]) -> None:
+    print(
+        f"{label:<16} embed calls={result['embedding_calls']:4d} "
+        f"searches={result['searches']:4d} "
+        f"coalesced embed={result['embedding_coalescing']:5.1%} "
+        f"search={result['search_coalescing']:5.1%} "
+        f"batch={result['avg_batch']:5.1f} "
+        f"p50={result['p50_ms']:6.1f}ms p99={result['p99_ms']:6.1f}ms"
+    )
+
+
+def main():
+    configure_logging()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--popular", type=int, default=5, help="Distinct popular questions")
+    parser.add_argument("--popular-share", type=float, default=0.8)
+    parser.add_argument("--embedding-latency-ms", type=float, default=40)
+    parser.add_argument("--db-latency-ms", type=float, default=15)
+    args = parser.parse_args()
+
+    queries = make_queries(args.sessions, args.popular, args.popular_share)
+    print(
+        f"⏱️ Burst of {args.sessions} sessions, {args.popular_share:.0%} asking "
+        f"one of {args.popular} popular questions"
+    )
+    for coalesce in (False, True):
+        suffix = "on" if coalesce else "off"
+        report(f"threads, {suffix}", run_threads(queries, coalesce, args))
+        report(f"asyncio, {suffix}", asyncio.run(run_async(queries, coalesce, args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Deterministic fake backends for offline benchmarks.
+
+Nothing here talks to OpenAI or Postgres. Latencies are simulated with
+``time.sleep`` on the sync path and ``asyncio.sleep`` on the async path, so
+concurrency behaves like real network I/O would.
+"""
+
+import asyncio
+import hashlib
+import re
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+import numpy as np
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that returns a fixed reply after a simulated delay."""
+
+    response: str = (
+        "Here is a deterministic answer from the fake benchmark model. "
+        "It streams word by word so time-to-first-token can be measured."
+    )
+    latency_ms: float = 50.0  # delay before the first token
+    tokens_per_second: float = 0.0  # 0 emits all tokens at once
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-benchmark-chat"
+
+    def _tokens(self) -> List[str]:
+        return re.findall(r"\S+\s*", self.response)
+
+    def _token_delay(self) -> float:
+        return 1 / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    def _message(self, messages: List[BaseMessage]) -> AIMessage:
+        input_tokens = sum(len(str(m.content).split()) for m in messages)
+        output_tokens = len(self._tokens())
+        return AIMessage(
+            content=self.response,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self.latency_ms / 1000 + self._token_delay() * len(self._tokens()))
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(
+            self.latency_ms / 1000 + self._token_delay() * len(self._tokens())
+        )
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages))])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency_ms / 1000)
+        for token in self._tokens():
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+            time.sleep(self._token_delay())
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.latency_ms / 1000)
+        for token in self._tokens():
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+            await asyncio.sleep(self._token_delay())
+
+
+class FakeVectorStore:
+    """In-memory stand-in for SimpleVectorStore with simulated query latency."""
+
+    def __init__(self, latency_ms: float = 20.0, results: Optional[List[str]] = None):
+        self.latency_ms = latency_ms
+        self.results = results if results is not None else [
+            "User previously asked about deploying LangGraph apps with Docker..."
+        ]
+        self.stored: List[str] = []
+        self.store_calls = 0
+
+    def search_conversations(
+        self, query: str, limit: int = 2, distance_threshold: float = 0.8
+    ) -> List[str]:
+        time.sleep(self.latency_ms / 1000)
+        return self.results[:limit]
+
+    async def asearch_conversations(
+        self, query: str, limit: int = 2, distance_threshold: float = 0.8
+    ) -> List[str]:
+        await asyncio.sleep(self.latency_ms / 1000)
+        return self.results[:limit]
+
+    def store_conversation(self, summary: str, thread_id: Optional[str] = None) -> None:
+        time.sleep(self.latency_ms / 1000)
+        self.stored.append(summary)
+        self.store_calls += 1
+
+    def store_conversations(
+        self, summaries: List[str], thread_ids: Optional[List[Optional[str]]] = None
+    ) -> None:
+        time.sleep(self.latency_ms / 1000)
+        self.stored.extend(summaries)
+        self.store_calls += 1
+
+    async def astore_conversation(
+        self, summary: str, thread_id: Optional[str] = None
+    ) -> None:
+        await asyncio.sleep(self.latency_ms / 1000)
+        self.stored.append(summary)
+        self.store_calls += 1
+
+
+class HashEmbeddings(Embeddings):
+    """
+    Deterministic embeddings from hashed words, with simulated request latency.
+
+    Each word adds a signed count to the dimension its hash picks, so texts
+    sharing words are near each other and searches rank meaningfully, while
+    the same text always gets the same unit vector.
+    """
+
+    def __init__(self, size: int = 256, latency_ms: float = 0.0):
+        self.size = size
+        self.latency_ms = latency_ms
+        self.calls = 0
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.size, dtype=np.float32)
+        for word in re.findall(r"\w+", text.lower()):
+            digest = hashlib.sha256(word.encode()).digest()
+            index = int.from_bytes(digest[:4], "little") % self.size
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        if not norm:
+            vector[0], norm = 1.0, 1.0
+        return (vector / norm).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self.latency_ms / 1000)
+        self.calls += 1
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        await asyncio.sleep(self.latency_ms / 1000)
+        self.calls += 1
+        return [self._embed(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
@@ -0,0 +1,150 @@
+"""
+Recall and latency: hybrid (vector + full text + topics) vs vector-only search.
+
+Synthetic summaries each mention one unique project identifier and one of a
+few topics. Their embeddings only capture the topic, the way real embeddings
+blur rare names, so many summaries look alike to the vector index. Queries
+ask about one identifier; a hit means its summary is in the top k.
+
+Needs the local Postgres from docker-compose.yml (`docker compose up -d`).
+
+    uv run python -m src.chatbot.benchmarks.hybrid_recall --rows 20000
+"""
+
+import argparse
+import hashlib
+import random
+import time
+from typing import Dict, List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from sqlalchemy import text
+
+from src.chatbot.benchmarks.retrieval_latency import percentile
+from src.chatbot.instrumentation import configure_logging
+from src.chatbot.summary_store import SummaryStore
+
+BENCH_TABLE = "bench_hybrid_summaries"
+TOPICS = [
+    "docker", "postgres", "react", "kubernetes", "fastapi", "langgraph",
+    "terraform", "redis", "kafka", "pandas", "django", "graphql",
+]
+NAMES = ["orca", "falcon", "ember", "quartz", "nimbus", "atlas", "comet", "harbor"]
+
+
+class TopicEmbeddings(Embeddings):
+    """Embeds text as its topic's centre plus per-text noise; names are ignored."""
+
+    def __init__(self, dim: int = 256, noise: float = 0.35):
+        rng = np.random.default_rng(0)
+        self.dim = dim
+        self.noise = noise
+        self.centres = {topic: rng.standard_normal(dim) for topic in TOPICS}
+
+    def _embed(self, text_: str) -> List[float]:
+        topic = next((t for t in TOPICS if t in text_.lower()), TOPICS[0])
+        seed = int.from_bytes(hashlib.sha256(text_.encode()).digest()[:8], "little")
+        vector = self.centres[topic] + self.noise * np.random.default_rng(
+            seed
+        ).standard_normal(self.dim)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text_: str) -> List[float]:
+        return self._embed(text_)
+
+
+def make_summary(index: int, rng: random.Random) -> Dict[str, str]:
+    topic = rng.choice(TOPICS)
+    identifier = f"{rng.choice(NAMES)}{index}"
+    summary = (
+        "Here are the things we discussed:\n"
+        f"- Setting up project {identifier} with {topic}\n"
+        f"- Debugging the {topic} configuration and deployment\n"
+        "- Next steps for testing\n\n"
+        f"Topics: {topic}, {identifier}, deployment"
+    )
+    return {"summary": summary, "identifier": identifier, "topic": topic}
+
+
+def measure(search, cases: List[Dict[str, str]]) -> Dict:
+    """Hit rate of the expected summary and latency percentiles."""
+    timings, hits = [], 0
+    for case in cases:
+        start = time.perf_counter()
+        found = search(case["query"])
+        timings.append((time.perf_counter() - start) * 1000)
+        hits += any(case["identifier"] in doc.page_content for doc in found)
+    return {
+        "recall": hits / len(cases),
+        "p50_ms": percentile(timings, 50),
+        "p95_ms": percentile(timings, 95),
+    }
+
+
+def report(label: str, result: Dict) -> None:
+    print(
+        f"{label:<12} recall@k={result['recall']:.3f} "
+        f"p50={result['p50_ms']:7.2f}ms p95={result['p95_ms']:7.2f}ms"
+    )
+
+
+def main():
+    configure_logging()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--dim", type=int, default=256)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    embeddings = TopicEmbeddings(args.dim)
+    store = SummaryStore(embeddings=embeddings, table=BENCH_TABLE, dimensions=args.dim)
+    with store.engine.begin() as conn:
+        conn.execute(text(f"TRUNCATE {BENCH_TABLE}"))
+
+    print(f"⏱️ Hybrid vs vector search over {args.rows} summaries")
+    rows = [make_summary(index, rng) for index in range(args.rows)]
+    for start in range(0, len(rows), 1000):
+        batch = [row["summary"] for row in rows[start : start + 1000]]
+        store.add_embeddings(batch, embeddings.embed_documents(batch))
+
+    cases = [
+        {
+            "query": f"What did we decide about {row['identifier']} and {row['topic']}?",
+            "identifier": row["identifier"],
+        }
+        for row in rng.sample(rows, args.queries)
+    ]
+
+    report(
+        "vector",
+        measure(
+            lambda q: [
+                doc for doc, _ in store.search_by_vector(embeddings.embed_query(q), args.k)
+            ],
+            cases,
+        ),
+    )
+    report(
+        "hybrid",
+        measure(
+            lambda q: [
+                doc
+                for doc, _, _ in store.hybrid_search(q, embeddings.embed_query(q), args.k)
+            ],
+            cases,
+        ),
+    )
+
+    with store.engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE {BENCH_TABLE}"))
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
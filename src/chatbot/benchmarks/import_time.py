@@ -0,0 +1,145 @@
+"""
+Cold-start import time of the package entry points against a budget.
+
+Each entry point is imported in a fresh interpreter under ``python -X importtime``
+and the best of --runs is compared to its budget. The run also fails if an
+entry point loads a heavy dependency at import (Postgres drivers, the OpenAI
+SDK, tiktoken, Deepgram, yt-dlp, Tavily, LangSmith evaluation): those are
+imported where a client is first built, never as a side effect of an import.
+
+    uv run python -m src.chatbot.benchmarks.import_time
+    uv run python -m src.chatbot.benchmarks.import_time src.chatbot.server --runs 5
+
+Budgets are wall-clock milliseconds on a warm disk cache; --scale multiplies
+them for slower machines.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Set, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# Entry point -> import budget in ms
+ENTRY_POINTS: Dict[str, float] = {
+    "src.chatbot.server": 1500,
+    "src.chatbot.conversation_bot": 1500,
+    "src.chatbot.profile_conversation_bot": 1600,
+    "src.chatbot.graph.conversation_graph": 1500,
+    "src.chatbot.graph.profile_graph": 1600,
+    "src.chatbot.simple_example": 1500,
+    "src.evaluation.youtube_summarizer": 1200,
+    "src.evaluation.evaluators.eval_summaries": 1200,
+    "src.evaluation.evaluators.langsmith_dataset_creator": 100,
+    "src.evaluation.transcription.deepgram_audio_transcription": 200,
+    "src.evaluation.transcription.get_youtube_audio": 100,
+    "src.prompt_engineering.national_parks": 1200,
+    "src.prompt_engineering.advertising_costar": 1200,
+}
+# Loaded only by the code that builds their client
+HEAVY_MODULES = [
+    "langchain_postgres",
+    "sqlalchemy",
+    "psycopg",
+    "langgraph.checkpoint.postgres",
+    "langchain_openai",
+    "openai",
+    "tiktoken",
+    "deepgram",
+    "yt_dlp",
+    "langchain_tavily",
+    "langsmith.evaluation",
+]
+
+LINE = re.compile(r"import time:\s*(\d+) \|\s*(\d+) \|( *)(\S+)")
+
+
+def parse_importtime(stderr: str) -> List[Tuple[int, str, int, int]]:
+    """(depth, module, self µs, cumulative µs) per line of ``-X importtime`` output."""
+    rows = []
+    for line in stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative, indent, name = match.groups()
+            rows.append(((len(indent) - 1) // 2, name, int(self_us), int(cumulative)))
+    return rows
+
+
+def measure(module: str) -> Tuple[float, Set[str], List[Tuple[str, float]]]:
+    """Import ``module`` in a fresh interpreter.
+
+    Returns:
+        Import time in ms, every module loaded, and the three third-party
+        packages that took longest (own time of all their modules, in ms)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env={**os.environ, "PYTHONPATH": ROOT},
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if not LINE.match(line)]
+        raise RuntimeError(errors[-1] if errors else f"exit status {result.returncode}")
+
+    rows = parse_importtime(result.stderr)
+    total_us = next(us for depth, name, _, us in rows if depth == 0 and name == module)
+    packages: Dict[str, int] = {}
+    for _, name, self_us, _ in rows:
+        package = name.split(".")[0]
+        if package != "src" and package not in sys.stdlib_module_names:
+            packages[package] = packages.get(package, 0) + self_us
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:3]
+    loaded = {name for _, name, _, _ in rows}
+    return total_us / 1000, loaded, [(name, us / 1000) for name, us in slowest]
+
+
+def heavy_imports(loaded: Set[str]) -> List[str]:
+    return [
+        heavy
+        for heavy in HEAVY_MODULES
+        if any(name == heavy or name.startswith(heavy + ".") for name in loaded)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("modules", nargs="*", help="Entry points (default: all)")
+    parser.add_argument("--runs", type=int, default=3, help="Best of this many imports")
+    parser.add_argument("--scale", type=float, default=1.0, help="Budget multiplier")
+    args = parser.parse_args()
+
+    modules = args.modules or list(ENTRY_POINTS)
+    print(f"🧪 Import time of {len(modules)} entry point(s), best of {args.runs}")
+    failures = 0
+    for module in modules:
+        budget_ms = ENTRY_POINTS.get(module, min(ENTRY_POINTS.values())) * args.scale
+        try:
+            runs = [measure(module) for _ in range(args.runs)]
+        except RuntimeError as e:
+            # Optional dependencies (deepgram, yt-dlp...) may be missing
+            print(f"{module:<58} ⚠️ import failed: {e}")
+            continue
+        elapsed_ms, loaded, slowest = min(runs, key=lambda run: run[0])
+        heavy = heavy_imports(loaded)
+        ok = elapsed_ms <= budget_ms and not heavy
+        failures += not ok
+        deps = ", ".join(f"{name} {ms:.0f}ms" for name, ms in slowest)
+        print(
+            f"{module:<58} {'✅' if ok else '❌'} {elapsed_ms:7.1f}ms / {budget_ms:.0f}ms  ({deps})"
+        )
+        if heavy:
+            print(f"{'':<58} ❌ heavy imports: {', '.join(heavy)}")
+
+    if failures:
+        print(f"❌ {failures} entry point(s) over budget")
+        sys.exit(1)
+    print("✅ All entry points within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+False negatives of the intent gate on a labelled fixture set.
+
+Each fixture line is {"text": ..., "retrieve": true|false}. A false negative
+is a message labelled "retrieve" that the gate would skip: that turn is
+answered without past context. The eval reports those, the share of small
+talk that skips retrieval, and the classification time. It exits with status
+1 when there are more false negatives than --max-false-negatives.
+
+With --train the tiny model is scored by 5-fold cross-validation. If it stays
+within the false-negative limit, it is fitted on all fixtures and saved for
+CHATBOT_INTENT_MODEL.
+
+    uv run python -m src.chatbot.benchmarks.intent_gate_eval
+    uv run python -m src.chatbot.benchmarks.intent_gate_eval --train .cache/intent_model.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from src.chatbot.intent import IntentGate, IntentModel
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "intent_turns.jsonl")
+
+
+def load_fixtures(path: str) -> List[Tuple[str, bool]]:
+    with open(path) as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [(row["text"], bool(row["retrieve"])) for row in rows]
+
+
+def evaluate(
+    gate: IntentGate, examples: List[Tuple[str, bool]], models: Optional[List] = None
+) -> Dict:
+    """
+    Confusion counts for the gate; ``models`` gives one gate per example
+    (cross-validation) instead of the shared one.
+    """
+    false_negatives, false_positives, reasons = [], [], {}
+    start = time.perf_counter()
+    for index, (text, retrieve) in enumerate(examples):
+        decision = (models[index] if models else gate).classify(text)
+        reasons[decision.reason] = reasons.get(decision.reason, 0) + 1
+        if retrieve and not decision.retrieve:
+            false_negatives.append(text)
+        elif not retrieve and decision.retrieve:
+            false_positives.append(text)
+    elapsed_us = (time.perf_counter() - start) * 1e6 / len(examples)
+
+    positives = sum(1 for _, retrieve in examples if retrieve)
+    negatives = len(examples) - positives
+    return {
+        "false_negatives": false_negatives,
+        "false_positives": false_positives,
+        "fn_rate": len(false_negatives) / positives if positives else 0.0,
+        "skip_recall": 1 - len(false_positives) / negatives if negatives else 0.0,
+        "reasons": reasons,
+        "us_per_message": elapsed_us,
+    }
+
+
+def cross_validated_gates(
+    examples: List[Tuple[str, bool]], threshold: float, folds: int = 5
+) -> List[IntentGate]:
+    """For each example, a gate whose model was trained without it."""
+    gates: List[Optional[IntentGate]] = [None] * len(examples)
+    for fold in range(folds):
+        train = [ex for i, ex in enumerate(examples) if i % folds != fold]
+        gate = IntentGate(model=IntentModel.train(train), skip_threshold=threshold)
+        for i in range(fold, len(examples), folds):
+            gates[i] = gate
+    return gates
+
+
+def report(label: str, result: Dict) -> None:
+    print(
+        f"{label:<20} false negatives={len(result['false_negatives'])} "
+        f"({result['fn_rate']:.1%})  small talk skipped={result['skip_recall']:.1%}  "
+        f"{result['us_per_message']:.1f}µs/message"
+    )
+    print(f"{'':<20} decided by: {result['reasons']}")
+    for text in result["false_negatives"]:
+        print(f"{'':<20} ❌ skipped: {text!r}")
+    for text in result["false_positives"]:
+        print(f"{'':<20} ℹ️ searched: {text!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fixtures", default=FIXTURES)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--train", metavar="PATH", help="Fit and save the tiny model")
+    parser.add_argument("--max-false-negatives", type=int, default=0)
+    args = parser.parse_args()
+
+    examples = load_fixtures(args.fixtures)
+    positives = sum(1 for _, retrieve in examples if retrieve)
+    print(
+        f"🧪 Intent gate on {len(examples)} fixtures "
+        f"({positives} need retrieval, {len(examples) - positives} small talk)"
+    )
+    result = evaluate(IntentGate(), examples)
+    report("heuristics", result)
+    false_negatives = len(result["false_negatives"])
+
+    if args.train:
+        gates = cross_validated_gates(examples, args.threshold)
+        result = evaluate(None, examples, models=gates)
+        report("heuristics + model", result)
+        false_negatives = max(false_negatives, len(result["false_negatives"]))
+        if false_negatives <= args.max_false_negatives:
+            IntentModel.train(examples).save(args.train)
+            print(f"💾 Model written to {args.train}")
+
+    if false_negatives > args.max_false_negatives:
+        print(f"❌ More than {args.max_false_negatives} false negative(s)")
+        sys.exit(1)
+    print("✅ No turn that needs memory is skipped")
+
+
+if __name__ == "__main__":
+    main()
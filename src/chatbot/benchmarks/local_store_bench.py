@@ -0,0 +1,136 @@
+"""
+Embedded LocalVectorStore vs Postgres (HNSW SummaryStore) at growing sizes.
+
+Reports the time to open each store, query latency percentiles and recall@k
+against an exact scan of the local matrix. Runs without Postgres too
+(``--skip-postgres``). Vectors are the clustered random ones from
+vector_index_recall.
+
+    uv run python -m src.chatbot.benchmarks.local_store_bench --rows 10000 100000 1000000
+"""
+
+import argparse
+import tempfile
+import time
+from typing import Dict, List
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from sqlalchemy import text
+
+from src.chatbot.benchmarks.retrieval_latency import percentile
+from src.chatbot.benchmarks.vector_index_recall import clustered_vectors
+from src.chatbot.instrumentation import configure_logging
+from src.chatbot.local_vector_store import LocalVectorStore
+from src.chatbot.summary_store import SummaryStore
+
+BENCH_TABLE = "bench_local_comparison"
+
+
+def measure(search, queries: List[List[float]], truth: List[set], k: int) -> Dict:
+    """Recall@k and latency percentiles for one search function."""
+    timings, hits = [], 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        found = search(query)
+        timings.append((time.perf_counter() - start) * 1000)
+        hits += len({doc.page_content for doc, _ in found} & expected)
+    return {
+        "recall": hits / (k * len(queries)),
+        "p50_ms": percentile(timings, 50),
+        "p95_ms": percentile(timings, 95),
+    }
+
+
+def report(label: str, open_ms: float, result: Dict) -> None:
+    print(
+        f"{label:<18} open={open_ms:8.1f}ms recall@k={result['recall']:.3f} "
+        f"p50={result['p50_ms']:8.2f}ms p95={result['p95_ms']:8.2f}ms"
+    )
+
+
+def run(rows: int, args, tmp: str) -> None:
+    embeddings = DeterministicFakeEmbedding(size=args.dim)
+    print(f"\n📦 {rows} rows x {args.dim} dims")
+
+    local_path = f"{tmp}/local-{rows}"
+    writer = LocalVectorStore(
+        path=local_path, embeddings=embeddings, dtype=args.dtype, ivf_threshold=0
+    )
+    postgres = None
+    if not args.skip_postgres:
+        postgres = SummaryStore(embeddings=embeddings, table=BENCH_TABLE, dimensions=args.dim)
+        with postgres.engine.begin() as conn:
+            conn.execute(text(f"DROP INDEX IF EXISTS {BENCH_TABLE}_embedding_hnsw_idx"))
+            conn.execute(text(f"TRUNCATE {BENCH_TABLE}"))
+
+    offset = 0
+    for vectors in clustered_vectors(rows, args.dim):
+        summaries = [f"row {offset + i}" for i in range(len(vectors))]
+        writer.add_embeddings(summaries, vectors.tolist())
+        if postgres is not None:
+            postgres.add_embeddings(summaries, vectors.tolist())
+        offset += len(vectors)
+    if postgres is not None:
+        postgres.ensure_schema()  # builds the HNSW index over the loaded rows
+
+    queries = [v.tolist() for v in next(clustered_vectors(args.queries, args.dim, seed=1))]
+    truth = [
+        {doc.page_content for doc, _ in writer.search_by_vector(q, args.k, exact=True)}
+        for q in queries
+    ]
+
+    start = time.perf_counter()
+    exact = LocalVectorStore(path=local_path, embeddings=embeddings, ivf_threshold=0)
+    open_ms = (time.perf_counter() - start) * 1000
+    report(
+        f"local {args.dtype} exact",
+        open_ms,
+        measure(lambda q: exact.search_by_vector(q, args.k), queries, truth, args.k),
+    )
+
+    indexed = LocalVectorStore(path=local_path, embeddings=embeddings, nprobe=args.nprobe)
+    indexed.build_ivf()
+    start = time.perf_counter()
+    indexed = LocalVectorStore(path=local_path, embeddings=embeddings, nprobe=args.nprobe)
+    open_ms = (time.perf_counter() - start) * 1000
+    report(
+        f"local ivf n={args.nprobe}",
+        open_ms,
+        measure(lambda q: indexed.search_by_vector(q, args.k), queries, truth, args.k),
+    )
+
+    if postgres is not None:
+        start = time.perf_counter()
+        reopened = SummaryStore(embeddings=embeddings, table=BENCH_TABLE, dimensions=args.dim)
+        open_ms = (time.perf_counter() - start) * 1000
+        report(
+            "postgres hnsw",
+            open_ms,
+            measure(lambda q: reopened.search_by_vector(q, args.k), queries, truth, args.k),
+        )
+        with reopened.engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE {BENCH_TABLE}"))
+        reopened.close()
+        postgres.close()
+
+
+def main():
+    configure_logging()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--dtype", choices=["float32", "int8"], default="float32")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, default=16)
+    parser.add_argument("--skip-postgres", action="store_true")
+    args = parser.parse_args()
+
+    print("⏱️ Local vector store vs Postgres")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            run(rows, args, tmp)
+
+
+if __name__ == "__main__":
+    main()
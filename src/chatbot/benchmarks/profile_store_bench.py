@@ -0,0 +1,112 @@
+"""
+Profile lookup latency in the user profile store at many users.
+
+Seeds one profile per user (in batched puts), then times the three lookups
+the profile graph does: a keyed get, a namespace listing and a semantic
+search within the user's namespace. Embeddings are deterministic fakes, so
+no API calls are made. ``--backend postgres`` needs the local Postgres from
+docker-compose.yml (`docker compose up -d`).
+
+    uv run python -m src.chatbot.benchmarks.profile_store_bench --users 100000 --backend sqlite
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.chatbot.benchmarks.retrieval_latency import percentile
+from src.chatbot.instrumentation import configure_logging
+from src.chatbot.profile_store import (
+    PROFILE_KEY,
+    ProfileStore,
+    profile_namespace,
+    put_profiles,
+)
+
+TOPICS = ["python", "docker", "postgres", "react", "langgraph", "kubernetes", "rust"]
+
+
+def make_profile(user: int, rng: random.Random) -> dict:
+    return {
+        "topics": rng.sample(TOPICS, 2),
+        "preferences": "prefers concise answers",
+        "facts": [f"Name is user{user}", f"Works on project {rng.randint(0, 999)}"],
+    }
+
+
+def namespace_for(user: int):
+    return profile_namespace({"configurable": {"user_id": f"bench-{user}"}})
+
+
+def measure(lookup: Callable[[int], object], users: List[int]) -> Dict[str, float]:
+    timings = []
+    for user in users:
+        start = time.perf_counter()
+        lookup(user)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"p50_ms": percentile(timings, 50), "p95_ms": percentile(timings, 95)}
+
+
+def report(label: str, result: Dict[str, float]) -> None:
+    print(f"{label:<16} p50={result['p50_ms']:7.2f}ms p95={result['p95_ms']:7.2f}ms")
+
+
+def main():
+    configure_logging()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument(
+        "--backend", choices=["memory", "sqlite", "postgres"], default="sqlite"
+    )
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        profiles = ProfileStore(
+            backend=args.backend,
+            sqlite_path=f"{tmp}/profiles.sqlite",
+            embeddings=DeterministicFakeEmbedding(size=args.dim),
+            dimensions=args.dim,
+        )
+        store = profiles.store
+        print(f"⏱️ Profile store ({profiles.backend}) with {args.users} users")
+
+        start = time.perf_counter()
+        for first in range(0, args.users, args.batch):
+            put_profiles(
+                store,
+                [
+                    (namespace_for(user), PROFILE_KEY, make_profile(user, rng))
+                    for user in range(first, min(first + args.batch, args.users))
+                ],
+            )
+        print(f"📦 Seeded in {time.perf_counter() - start:.1f}s")
+
+        users = [rng.randrange(args.users) for _ in range(args.lookups)]
+        report("keyed get", measure(lambda u: store.get(namespace_for(u), PROFILE_KEY), users))
+        report("namespace list", measure(lambda u: store.search(namespace_for(u)), users))
+        report(
+            "semantic search",
+            measure(
+                lambda u: store.search(
+                    namespace_for(u), query="What is my name?", limit=3
+                ),
+                users,
+            ),
+        )
+
+        if args.backend == "postgres":
+            with store.conn.connection() as conn:
+                conn.execute("DELETE FROM store WHERE prefix LIKE 'user.bench-%'")
+        profiles.close()
+
+
+if __name__ == "__main__":
+    main()
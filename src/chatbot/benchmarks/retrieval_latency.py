@@ -0,0 +1,96 @@
+"""
+Per-turn retrieval latency: a fresh SimpleVectorStore per turn vs the shared pool.
+
+Needs the local Postgres from docker-compose.yml (`docker compose up -d`).
+Embeddings are faked so only store construction and database time are measured.
+
+    uv run python -m src.chatbot.benchmarks.retrieval_latency --turns 200
+"""
+
+import argparse
+import statistics
+import time
+from typing import Callable, List
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.messages import HumanMessage
+
+from src.chatbot.instrumentation import configure_logging
+from src.chatbot.nodes.retrieval import search_relevant_conversations
+from src.chatbot.simple_vector_store import PoolSettings, SimpleVectorStore
+
+EMBEDDINGS = DeterministicFakeEmbedding(size=1536)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def time_turns(run_turn: Callable[[int], None], turns: int) -> List[float]:
+    """Run ``turns`` retrieval turns and return per-turn latency in milliseconds."""
+    timings = []
+    for turn in range(turns):
+        start = time.perf_counter()
+        run_turn(turn)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def state_for(turn: int) -> dict:
+    return {"messages": [HumanMessage(content=f"How do I deploy service {turn}?")]}
+
+
+def per_call_turn(turn: int) -> None:
+    """Old behaviour: build a new store (engine, connection, bootstrap) every turn."""
+    vector_store = SimpleVectorStore(embeddings=EMBEDDINGS)
+    try:
+        search_relevant_conversations(state_for(turn), vector_store=vector_store)
+    finally:
+        vector_store.close()
+
+
+def report(label: str, timings: List[float]) -> None:
+    print(
+        f"{label:<12} p50={percentile(timings, 50):7.2f}ms "
+        f"p95={percentile(timings, 95):7.2f}ms "
+        f"mean={statistics.mean(timings):7.2f}ms"
+    )
+
+
+def main():
+    configure_logging()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--pool-min", type=int, default=2)
+    parser.add_argument("--pool-max", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"⏱️ Retrieval latency over {args.turns} turns")
+
+    shared = SimpleVectorStore(
+        embeddings=EMBEDDINGS,
+        pool_settings=PoolSettings(min_size=args.pool_min, max_size=args.pool_max),
+    )
+    shared.store_conversation("Seed summary so searches touch real rows.")
+
+    before = time_turns(per_call_turn, args.turns)
+    after = time_turns(
+        lambda turn: search_relevant_conversations(
+            state_for(turn), vector_store=shared
+        ),
+        args.turns,
+    )
+    shared.close()
+
+    report("per-call", before)
+    report("pooled", after)
+    print(
+        f"📉 p50 speedup: {percentile(before, 50) / percentile(after, 50):.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
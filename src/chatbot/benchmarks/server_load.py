@@ -0,0 +1,170 @@
+"""
+Load test of the HTTP/SSE server against fake model and vector store backends.
+
+Starts the app in-process on a free port, then fires concurrent clients at
+/chat (requests/sec) and /chat/stream (TTFT and full-response latency), and
+finally over-subscribes the in-flight limit to show how many requests are
+turned away with 429.
+
+    uv run python -m src.chatbot.benchmarks.server_load --concurrency 1 16 64
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import socket
+import threading
+import time
+from typing import Dict, List
+
+import httpx
+import uvicorn
+
+from src.chatbot.benchmarks.fakes import FakeChatModel, FakeVectorStore
+from src.chatbot.benchmarks.retrieval_latency import percentile
+from src.chatbot.checkpointer import Checkpointers
+from src.chatbot.conversation_bot import ConversationBot
+from src.chatbot.instrumentation import configure_logging
+from src.chatbot.server import create_app
+from src.llm import override_chat_model
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(app, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="error")
+    )
+    threading.Thread(target=server.run, name="bench-server", daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def chat_once(client: httpx.AsyncClient, index: int, turn: int) -> int:
+    response = await client.post(
+        "/chat",
+        json={"message": f"Question {turn} about LangGraph", "thread_id": f"chat-{index}"},
+    )
+    return response.status_code
+
+
+async def stream_once(client: httpx.AsyncClient, index: int, turn: int) -> tuple:
+    """(status, first token ms, last token ms) for one streamed request."""
+    start = time.perf_counter()
+    first_token_ms = None
+    async with client.stream(
+        "POST",
+        "/chat/stream",
+        json={"message": f"Question {turn} about LangGraph", "thread_id": f"sse-{index}"},
+    ) as response:
+        async for line in response.aiter_lines():
+            if line == "event: token" and first_token_ms is None:
+                first_token_ms = (time.perf_counter() - start) * 1000
+    return response.status_code, first_token_ms, (time.perf_counter() - start) * 1000
+
+
+async def run_clients(base_url: str, clients: int, requests: int, stream: bool) -> Dict:
+    """``clients`` concurrent clients, each sending ``requests`` in sequence."""
+    statuses: List[int] = []
+    first_tokens: List[float] = []
+    latencies: List[float] = []
+
+    async def client_loop(client: httpx.AsyncClient, index: int) -> None:
+        for turn in range(requests):
+            if stream:
+                status, first_token_ms, last_token_ms = await stream_once(
+                    client, index, turn
+                )
+                if first_token_ms is not None:
+                    first_tokens.append(first_token_ms)
+            else:
+                start = time.perf_counter()
+                status = await chat_once(client, index, turn)
+                last_token_ms = (time.perf_counter() - start) * 1000
+            statuses.append(status)
+            if status == 200:
+                latencies.append(last_token_ms)
+
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=60, limits=limits
+    ) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client, i) for i in range(clients)))
+        elapsed = time.perf_counter() - start
+
+    ok = statuses.count(200)
+    return {
+        "rps": ok / elapsed,
+        "rejected": statuses.count(429),
+        "p50_ms": percentile(latencies, 50) if latencies else 0.0,
+        "p99_ms": percentile(latencies, 99) if latencies else 0.0,
+        "ttft_p50_ms": percentile(first_tokens, 50) if first_tokens else 0.0,
+        "ttft_p99_ms": percentile(first_tokens, 99) if first_tokens else 0.0,
+    }
+
+
+def main():
+    configure_logging()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--requests", type=int, default=5, help="Per client")
+    parser.add_argument("--model-latency-ms", type=float, default=100)
+    parser.add_argument("--tokens-per-second", type=float, default=200)
+    parser.add_argument("--db-latency-ms", type=float, default=20)
+    parser.add_argument("--max-in-flight", type=int, default=64)
+    args = parser.parse_args()
+
+    override_chat_model(
+        "openai:gpt-4o",
+        FakeChatModel(
+            latency_ms=args.model_latency_ms, tokens_per_second=args.tokens_per_second
+        ),
+    )
+    override_chat_model(
+        "openai:gpt-4o-mini", FakeChatModel(latency_ms=args.model_latency_ms)
+    )
+    bot = ConversationBot(
+        vector_store=FakeVectorStore(latency_ms=args.db_latency_ms),
+        checkpointers=Checkpointers(backend="memory"),
+    )
+    port = free_port()
+    server = start_server(create_app(bot, max_in_flight=args.max_in_flight), port)
+    base_url = f"http://127.0.0.1:{port}"
+
+    print(f"⏱️ Server load test (max {args.max_in_flight} in flight)")
+    with contextlib.redirect_stdout(io.StringIO()):
+        asyncio.run(run_clients(base_url, 1, 1, stream=False))  # compile the graph
+
+    for clients in args.concurrency:
+        for stream in (False, True):
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = asyncio.run(
+                    run_clients(base_url, clients, args.requests, stream)
+                )
+            label = f"{'/chat/stream' if stream else '/chat'} x{clients}"
+            ttft = f" ttft p50={result['ttft_p50_ms']:6.1f}ms" if stream else ""
+            print(
+                f"{label:<18} {result['rps']:7.1f} req/s "
+                f"p50={result['p50_ms']:7.1f}ms p99={result['p99_ms']:7.1f}ms"
+                f"{ttft} 429s={result['rejected']}"
+            )
+
+    clients = args.max_in_flight * 2
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = asyncio.run(run_clients(base_url, clients, 1, stream=True))
+    print(
+        f"🚦 {clients} clients at once: {result['rejected']} rejected with 429, "
+        f"ttft p99={result['ttft_p99_ms']:.1f}ms for the rest"
+    )
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
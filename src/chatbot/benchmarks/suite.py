@@ -0,0 +1,384 @@
+"""
+Offline benchmark suite for the chatbots.
+
+Drives ConversationBot.chat / chat_stream and the profile graph (through
+ProfileConversationBot) with deterministic fake chat models of fixed latency
+and token rate, and hash embeddings, so runs are repeatable and make no API
+calls. Every scenario reports throughput, p50/p99 turn latency and peak
+allocated memory; the run is written to JSON so commits can be compared:
+
+    uv run python -m src.chatbot.benchmarks.suite --output .cache/bench/base.json
+    uv run python -m src.chatbot.benchmarks.suite --compare .cache/bench/base.json
+
+``--vector-store local`` searches a real LocalVectorStore in a temporary
+directory. ``--vector-store postgres`` uses SimpleVectorStore on the Postgres
+from docker-compose.yml and stores the benchmark's summaries in its
+conversations collection.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+import tracemalloc
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from src.chatbot.benchmarks.fakes import FakeChatModel, FakeVectorStore, HashEmbeddings
+from src.chatbot.benchmarks.retrieval_latency import percentile
+from src.chatbot.checkpointer import Checkpointers
+from src.chatbot.conversation_bot import ConversationBot
+from src.chatbot.instrumentation import configure_logging
+from src.chatbot.profile_conversation_bot import ProfileConversationBot
+from src.chatbot.profile_scheduler import ProfileUpdateScheduler
+from src.chatbot.profile_store import ProfileStore
+from src.llm import override_chat_model
+
+# Metrics shown by --compare, and whether a higher value is better
+COMPARED_METRICS = {
+    "turns_per_s": True,
+    "p50_ms": False,
+    "p99_ms": False,
+    "peak_alloc_mb": False,
+}
+PROFILE_RESPONSE = '{"topics": ["docker", "langgraph"], "facts": ["Name is Sam"]}'
+QUESTIONS = [
+    "How do I deploy a LangGraph app with Docker?",
+    "What does the checkpointer store between turns?",
+    "Can you compare pgvector and a local index?",
+    "How should I size the Postgres connection pool?",
+    "Why is my first token slow?",
+]
+
+
+def question(turn: int) -> str:
+    return f"{QUESTIONS[turn % len(QUESTIONS)]} (turn {turn})"
+
+
+def new_thread() -> str:
+    return f"bench-{uuid.uuid4().hex[:8]}"
+
+
+def summarize(latencies_ms: List[float], seconds: float) -> Dict[str, float]:
+    return {
+        "turns": len(latencies_ms),
+        "seconds": round(seconds, 3),
+        "turns_per_s": round(len(latencies_ms) / seconds, 2) if seconds else 0.0,
+        "p50_ms": round(percentile(latencies_ms, 50), 2),
+        "p99_ms": round(percentile(latencies_ms, 99), 2),
+    }
+
+
+def run_scenario(
+    run: Callable[[Dict[str, float]], List[float]], trace_memory: bool
+) -> Dict[str, float]:
+    """
+    Run one scenario with the bots' console output silenced.
+
+    Args:
+        run: Takes a dict for extra results and returns per-turn latencies (ms);
+             it may set "measured_seconds" when it does untimed setup work
+        trace_memory: Record the peak memory allocated while it runs
+
+    Returns:
+        Throughput, latency percentiles, peak allocation and the extras
+    """
+    extra: Dict[str, float] = {}
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            latencies = run(extra)
+        seconds = time.perf_counter() - start
+    finally:
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        if trace_memory:
+            tracemalloc.stop()
+    result = summarize(latencies, extra.pop("measured_seconds", seconds))
+    if peak is not None:
+        result["peak_alloc_mb"] = round(peak / 2**20, 2)
+    result.update({key: round(value, 2) for key, value in extra.items()})
+    return result
+
+
+def timed(call: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    call()
+    return (time.perf_counter() - start) * 1000
+
+
+def stream_turn(bot: ConversationBot, message: str, thread_id: str) -> tuple:
+    """(first token ms, last token ms) for one streamed turn."""
+    start = time.perf_counter()
+    first_token_ms = None
+    for _ in bot.chat_stream(message, thread_id):
+        if first_token_ms is None:
+            first_token_ms = (time.perf_counter() - start) * 1000
+    return first_token_ms or 0.0, (time.perf_counter() - start) * 1000
+
+
+def single_turn(bot: ConversationBot, count: int) -> Callable:
+    def run(extra: Dict[str, float]) -> List[float]:
+        return [timed(lambda i=i: bot.chat(question(i), new_thread())) for i in range(count)]
+
+    return run
+
+
+def single_turn_stream(bot: ConversationBot, count: int) -> Callable:
+    def run(extra: Dict[str, float]) -> List[float]:
+        timings = [stream_turn(bot, question(i), new_thread()) for i in range(count)]
+        first_tokens = [first for first, _ in timings]
+        extra["ttft_p50_ms"] = percentile(first_tokens, 50)
+        extra["ttft_p99_ms"] = percentile(first_tokens, 99)
+        return [last for _, last in timings]
+
+    return run
+
+
+def long_thread(bot: ConversationBot, turns: int) -> Callable:
+    def run(extra: Dict[str, float]) -> List[float]:
+        thread_id = new_thread()
+        latencies = [timed(lambda i=i: bot.chat(question(i), thread_id)) for i in range(turns)]
+        # Growth in per-turn cost as history accumulates
+        window = max(1, turns // 5)
+        extra["first_turns_p50_ms"] = percentile(latencies[:window], 50)
+        extra["last_turns_p50_ms"] = percentile(latencies[-window:], 50)
+        return latencies
+
+    return run
+
+
+def concurrent_threads(bot: ConversationBot, threads: int, turns: int) -> Callable:
+    def conversation(index: int) -> List[float]:
+        thread_id = new_thread()
+        return [timed(lambda i=i: bot.chat(question(i), thread_id)) for i in range(turns)]
+
+    def run(extra: Dict[str, float]) -> List[float]:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(conversation, range(threads)))
+        return [latency for latencies in results for latency in latencies]
+
+    return run
+
+
+def quit_storage(bot: ConversationBot, count: int, vector_store) -> Callable:
+    def run(extra: Dict[str, float]) -> List[float]:
+        threads = [new_thread() for _ in range(count)]
+        for i, thread_id in enumerate(threads):
+            bot.chat(question(i), thread_id)
+            bot.chat(question(i + 1), thread_id)
+        start = time.perf_counter()
+        latencies = [timed(lambda t=t: bot.chat("quit", t)) for t in threads]
+        extra["measured_seconds"] = time.perf_counter() - start
+        if isinstance(vector_store, FakeVectorStore):
+            extra["stored"] = len(vector_store.stored)
+        return latencies
+
+    return run
+
+
+def profile_turns(bot: ProfileConversationBot, threads: List[str], turns: int) -> Callable:
+    def run(extra: Dict[str, float]) -> List[float]:
+        latencies, first_tokens = [], []
+        for thread_id in threads:
+            for i in range(turns):
+                for _ in bot.chat_stream(question(i), thread_id):
+                    pass
+                first_tokens.append(bot.last_turn_timing["ttft_ms"] or 0.0)
+                latencies.append(bot.last_turn_timing["ttlt_ms"])
+        extra["ttft_p50_ms"] = percentile(first_tokens, 50)
+        extra["ttft_p99_ms"] = percentile(first_tokens, 99)
+        return latencies
+
+    return run
+
+
+def profile_quit(bot: ProfileConversationBot, threads: List[str]) -> Callable:
+    def run(extra: Dict[str, float]) -> List[float]:
+        return [timed(lambda t=t: bot.chat("quit", t)) for t in threads]
+
+    return run
+
+
+def create_vector_store(kind: str, directory: str, args: argparse.Namespace):
+    if kind == "fake":
+        return FakeVectorStore(latency_ms=args.db_latency_ms)
+    embeddings = HashEmbeddings(latency_ms=args.embedding_latency_ms)
+    if kind == "local":
+        from src.chatbot.local_vector_store import LocalVectorStore
+
+        return LocalVectorStore(path=directory, embeddings=embeddings)
+    from src.chatbot.simple_vector_store import SimpleVectorStore
+
+    # Same size as text-embedding-3-small, to match the existing collection
+    embeddings.size = 1536
+    return SimpleVectorStore(embeddings=embeddings)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous: dict, current: dict) -> None:
+    """Print each scenario's change against an earlier run."""
+    print(f"\n📊 Compared with {previous['meta'].get('commit') or 'previous run'}")
+    for name, result in current["scenarios"].items():
+        before = previous["scenarios"].get(name)
+        if before is None:
+            continue
+        changes = []
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            if metric not in result or not before.get(metric):
+                continue
+            change = (result[metric] - before[metric]) / before[metric] * 100
+            better = change > 0 if higher_is_better else change < 0
+            marker = " " if abs(change) < 5 else ("✅" if better else "⚠️")
+            changes.append(f"{metric} {change:+6.1f}%{marker}")
+        print(f"{name:<24} " + "  ".join(changes))
+
+
+def report(name: str, result: Dict[str, float]) -> None:
+    memory = (
+        f" peak={result['peak_alloc_mb']:6.1f}MB" if "peak_alloc_mb" in result else ""
+    )
+    print(
+        f"{name:<24} {result['turns_per_s']:7.1f} turns/s "
+        f"p50={result['p50_ms']:8.1f}ms p99={result['p99_ms']:8.1f}ms{memory}"
+    )
+
+
+def main():
+    configure_logging()
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--output", default=".cache/bench/results.json")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    parser.add_argument("--model-latency-ms", type=float, default=50)
+    parser.add_argument("--tokens-per-second", type=float, default=400)
+    parser.add_argument("--db-latency-ms", type=float, default=5)
+    parser.add_argument("--embedding-latency-ms", type=float, default=20)
+    parser.add_argument("--single-turns", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=50, help="Turns in the long thread")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--concurrent-turns", type=int, default=5)
+    parser.add_argument(
+        "--vector-store", choices=["fake", "local", "postgres"], default="fake"
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Measure peak allocations (slows every scenario by a similar amount)",
+    )
+    args = parser.parse_args()
+    # Profile updates log from worker threads, outside the silenced scenarios
+    logging.getLogger("src").setLevel(logging.WARNING)
+
+    model = FakeChatModel(
+        latency_ms=args.model_latency_ms, tokens_per_second=args.tokens_per_second
+    )
+    override_chat_model("openai:gpt-4o", model)
+    # Summaries and profile extraction; the profile parser needs JSON
+    override_chat_model(
+        "openai:gpt-4o-mini",
+        FakeChatModel(
+            response=PROFILE_RESPONSE,
+            latency_ms=args.model_latency_ms,
+            tokens_per_second=args.tokens_per_second,
+        ),
+    )
+
+    scenarios: Dict[str, Dict[str, float]] = {}
+    print(f"⏱️ Chatbot benchmark suite ({args.vector_store} vector store)")
+    with tempfile.TemporaryDirectory() as tmp:
+        vector_store = create_vector_store(args.vector_store, tmp, args)
+        bot = ConversationBot(
+            vector_store=vector_store, checkpointers=Checkpointers(backend="memory")
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            profiles = ProfileStore(
+                backend="memory", embeddings=HashEmbeddings(), dimensions=256
+            )
+            scheduler = ProfileUpdateScheduler()
+            profile_bot = ProfileConversationBot(
+                checkpointers=Checkpointers(backend="memory"),
+                user_id="bench-user",
+                store=profiles.store,
+                scheduler=scheduler,
+            )
+        profile_threads = [new_thread() for _ in range(max(1, args.threads // 4))]
+
+        plan = {
+            "chat_single_turn": single_turn(bot, args.single_turns),
+            "chat_stream_single_turn": single_turn_stream(bot, args.single_turns),
+            f"chat_{args.turns}_turn_thread": long_thread(bot, args.turns),
+            f"chat_{args.threads}_threads": concurrent_threads(
+                bot, args.threads, args.concurrent_turns
+            ),
+            "chat_quit_storage": quit_storage(bot, args.single_turns, vector_store),
+            "profile_stream_turns": profile_turns(
+                profile_bot, profile_threads, args.concurrent_turns
+            ),
+            "profile_quit": profile_quit(profile_bot, profile_threads),
+        }
+        for name, run in plan.items():
+            scenarios[name] = run_scenario(run, args.trace_memory)
+            report(name, scenarios[name])
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            profile_bot.close()
+            scheduler.close()
+        scenarios["profile_quit"]["profile_updates"] = scheduler.stats()["updates"]
+        if hasattr(vector_store, "close"):
+            vector_store.close()
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            # ru_maxrss is KiB on Linux
+            "max_rss_mb": round(
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+            ),
+            "config": vars(args),
+        },
+        "scenarios": scenarios,
+    }
+    print(f"🧠 Max RSS {results['meta']['max_rss_mb']}MB")
+
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+
+if __name__ == "__main__":
+    main()
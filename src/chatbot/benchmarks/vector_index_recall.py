@@ -0,0 +1,187 @@
+"""
+Recall and latency: HNSW on conversation_summaries vs the collection tables.
+
+Loads the same clustered random vectors into a scratch SummaryStore table and
+a scratch langchain_postgres collection, then runs the same queries against
+both. Ground truth is an exact scan of the summaries table with index scans
+disabled. The collection path has no vector index, so it is always an exact
+(sequential) scan.
+
+Needs the local Postgres from docker-compose.yml (`docker compose up -d`).
+Loading 1M rows at 1536 dimensions takes a long while; pass a smaller
+``--dim`` for a quick run.
+
+    uv run python -m src.chatbot.benchmarks.vector_index_recall --rows 100000 1000000
+"""
+
+import argparse
+import time
+from typing import Dict, Iterator, List
+
+import numpy as np
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_postgres import PGVector
+from sqlalchemy import text
+
+from src.chatbot.benchmarks.retrieval_latency import percentile
+from src.chatbot.instrumentation import configure_logging
+from src.chatbot.summary_store import HnswSettings, SummaryStore, vector_literal
+
+BENCH_TABLE = "bench_conversation_summaries"
+BENCH_COLLECTION = "bench_conversations"
+
+
+def clustered_vectors(
+    rows: int, dim: int, clusters: int = 1000, seed: int = 0, chunk: int = 10_000
+) -> Iterator[np.ndarray]:
+    """
+    Unit vectors around fixed random cluster centres, yielded in chunks.
+
+    The centres are the same for every ``seed``, so queries drawn with another
+    seed come from the same distribution as the stored rows.
+    """
+    centres = np.random.default_rng(0).standard_normal((clusters, dim)).astype(np.float32)
+    rng = np.random.default_rng(seed + 1)
+    for start in range(0, rows, chunk):
+        size = min(chunk, rows - start)
+        vectors = centres[rng.integers(0, clusters, size)]
+        vectors = vectors + 0.3 * rng.standard_normal((size, dim)).astype(np.float32)
+        yield vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def load(store: SummaryStore, collection: PGVector, rows: int, dim: int) -> float:
+    """Bulk-load both backends, then build the HNSW index; returns build seconds."""
+    with store.engine.begin() as conn:
+        conn.execute(text(f"DROP INDEX IF EXISTS {BENCH_TABLE}_embedding_hnsw_idx"))
+        conn.execute(text(f"TRUNCATE {BENCH_TABLE}"))
+
+    offset = 0
+    for vectors in clustered_vectors(rows, dim):
+        summaries = [f"row {offset + i}" for i in range(len(vectors))]
+        embeddings = vectors.tolist()
+        for start in range(0, len(summaries), 1000):
+            store.add_embeddings(
+                summaries[start : start + 1000], embeddings[start : start + 1000]
+            )
+            collection.add_embeddings(
+                summaries[start : start + 1000], embeddings[start : start + 1000]
+            )
+        offset += len(vectors)
+        print(f"   loaded {offset}/{rows} rows", end="\r", flush=True)
+    print()
+
+    # Building the index once after loading is much faster than growing it per insert
+    start = time.perf_counter()
+    store.ensure_schema()
+    return time.perf_counter() - start
+
+
+def exact_neighbours(store: SummaryStore, query: List[float], k: int) -> List[str]:
+    """True nearest neighbours by a sequential scan."""
+    with store.engine.begin() as conn:
+        conn.execute(text("SET LOCAL enable_indexscan = off"))
+        rows = conn.execute(
+            store._search_sql(),
+            {"embedding": vector_literal(query), "limit": k},
+        ).all()
+    return [summary for summary, _ in rows]
+
+
+def measure(search, queries: List[List[float]], truth: List[List[str]], k: int) -> Dict:
+    """Recall@k and latency percentiles for one search function."""
+    timings, hits = [], 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        found = search(query)
+        timings.append((time.perf_counter() - start) * 1000)
+        hits += len(set(found) & set(expected))
+    return {
+        "recall": hits / (k * len(queries)),
+        "p50_ms": percentile(timings, 50),
+        "p95_ms": percentile(timings, 95),
+    }
+
+
+def report(label: str, result: Dict) -> None:
+    print(
+        f"{label:<22} recall@k={result['recall']:.3f} "
+        f"p50={result['p50_ms']:8.2f}ms p95={result['p95_ms']:8.2f}ms"
+    )
+
+
+def run(rows: int, args) -> None:
+    embeddings = DeterministicFakeEmbedding(size=args.dim)
+    store = SummaryStore(
+        embeddings=embeddings,
+        hnsw=HnswSettings(m=args.m, ef_construction=args.ef_construction),
+        table=BENCH_TABLE,
+        dimensions=args.dim,
+    )
+    collection = PGVector(
+        embeddings=embeddings,
+        connection=store.engine,
+        collection_name=BENCH_COLLECTION,
+        pre_delete_collection=True,
+    )
+
+    print(f"\n📦 {rows} rows x {args.dim} dims")
+    build_seconds = load(store, collection, rows, args.dim)
+    print(
+        f"🏗️ HNSW build (m={args.m}, ef_construction={args.ef_construction}): "
+        f"{build_seconds:.1f}s"
+    )
+
+    queries = [v.tolist() for v in next(clustered_vectors(args.queries, args.dim, seed=1))]
+    truth = [exact_neighbours(store, query, args.k) for query in queries]
+
+    report(
+        "collection (exact)",
+        measure(
+            lambda q: [
+                doc.page_content
+                for doc, _ in collection.similarity_search_with_score_by_vector(q, k=args.k)
+            ],
+            queries,
+            truth,
+            args.k,
+        ),
+    )
+    for ef_search in args.ef_search:
+        report(
+            f"hnsw ef_search={ef_search}",
+            measure(
+                lambda q: [
+                    doc.page_content
+                    for doc, _ in store.search_by_vector(q, args.k, ef_search=ef_search)
+                ],
+                queries,
+                truth,
+                args.k,
+            ),
+        )
+
+    collection.delete_collection()
+    with store.engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE {BENCH_TABLE}"))
+    store.close()
+
+
+def main():
+    configure_logging()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--m", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=64)
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[10, 40, 100, 200])
+    args = parser.parse_args()
+
+    print("⏱️ Vector index recall and latency")
+    for rows in args.rows:
+        run(rows, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,416 @@
+"""
+Persistent checkpointer backends for the chatbot graphs.
+
+Thread history is stored in Postgres (the instance from docker-compose.yml),
+falling back to a local SQLite file when Postgres is unavailable. Connections
+come from a bounded, health-checked pool. A retention policy prunes old
+checkpoints so storage stays bounded.
+
+Choose the backend with CHATBOT_CHECKPOINTER:
+    auto (default) - Postgres, or SQLite if Postgres can't be reached
+    postgres | sqlite | memory
+
+The memory backend is bounded too: idle threads are evicted and optionally
+spilled to disk (see memory_saver.py).
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+
+from src.chatbot.memory_saver import BoundedMemorySaver
+from src.chatbot.simple_vector_store import PoolSettings, database_url
+
+logger = logging.getLogger(__name__)
+
+SQLITE_CHECKPOINT_PATH = ".cache/checkpoints.sqlite"
+# "exit" writes one checkpoint per graph run instead of one per step
+CHECKPOINT_DURABILITY = os.getenv("CHATBOT_CHECKPOINT_DURABILITY", "exit")
+
+# Seconds between 1582-10-15 (UUID epoch) and 1970-01-01
+_UUID_EPOCH_OFFSET = 12219292800
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """How much checkpoint history to keep."""
+
+    max_checkpoints_per_thread: int = 20
+    max_thread_age_seconds: Optional[float] = 30 * 24 * 3600
+    prune_interval_seconds: float = 600
+
+    @classmethod
+    def from_env(cls) -> "RetentionPolicy":
+        """Read limits from CHATBOT_CHECKPOINT_* environment variables."""
+        max_age_days = float(os.getenv("CHATBOT_CHECKPOINT_MAX_AGE_DAYS", 30))
+        return cls(
+            max_checkpoints_per_thread=int(
+                os.getenv("CHATBOT_CHECKPOINT_KEEP", cls.max_checkpoints_per_thread)
+            ),
+            max_thread_age_seconds=max_age_days * 24 * 3600 if max_age_days else None,
+            prune_interval_seconds=float(
+                os.getenv(
+                    "CHATBOT_CHECKPOINT_PRUNE_INTERVAL", cls.prune_interval_seconds
+                )
+            ),
+        )
+
+
+def checkpoint_timestamp(checkpoint_id: str) -> float:
+    """Unix time at which a checkpoint was created, read from its UUIDv6 ID."""
+    value = uuid.UUID(checkpoint_id).int
+    ticks = (
+        ((value >> 96) << 28) | (((value >> 80) & 0xFFFF) << 12) | ((value >> 64) & 0x0FFF)
+    )
+    return ticks / 1e7 - _UUID_EPOCH_OFFSET
+
+
+def _postgres_conninfo(connection: str) -> str:
+    """psycopg wants a plain postgresql:// URL (no SQLAlchemy driver suffix)."""
+    for prefix in ("postgresql+psycopg://", "postgresql+psycopg2://"):
+        if connection.startswith(prefix):
+            return "postgresql://" + connection[len(prefix) :]
+    return connection
+
+
+_PRUNE_POSTGRES_SQL = """
+WITH doomed AS (
+    SELECT thread_id, checkpoint_ns, checkpoint_id FROM (
+        SELECT thread_id, checkpoint_ns, checkpoint_id,
+               row_number() OVER (
+                   PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+               ) AS position
+        FROM checkpoints
+    ) ranked
+    WHERE position > %(keep)s
+), deleted_writes AS (
+    DELETE FROM checkpoint_writes w USING doomed d
+    WHERE w.thread_id = d.thread_id AND w.checkpoint_ns = d.checkpoint_ns
+      AND w.checkpoint_id = d.checkpoint_id
+)
+DELETE FROM checkpoints c USING doomed d
+WHERE c.thread_id = d.thread_id AND c.checkpoint_ns = d.checkpoint_ns
+  AND c.checkpoint_id = d.checkpoint_id
+RETURNING c.thread_id
+"""
+
+# Blobs of the just-pruned threads that no remaining checkpoint references.
+# PostgresSaver.put writes blobs before their checkpoint row, so a blob is only
+# deleted once a checkpoint references a newer version of its channel; the
+# versions are zero-padded counters, so they compare as text.
+_PRUNE_POSTGRES_BLOBS_SQL = """
+DELETE FROM checkpoint_blobs b
+WHERE b.thread_id = ANY(%(thread_ids)s)
+  AND NOT EXISTS (
+    SELECT 1 FROM checkpoints c
+    WHERE c.thread_id = b.thread_id AND c.checkpoint_ns = b.checkpoint_ns
+      AND c.checkpoint -> 'channel_versions' ->> b.channel = b.version
+  )
+  AND EXISTS (
+    SELECT 1 FROM checkpoints c
+    WHERE c.thread_id = b.thread_id AND c.checkpoint_ns = b.checkpoint_ns
+      AND c.checkpoint -> 'channel_versions' ->> b.channel > b.version
+  )
+"""
+
+_PRUNE_SQLITE_SQL = """
+DELETE FROM {table} WHERE (thread_id, checkpoint_ns, checkpoint_id) IN (
+    SELECT thread_id, checkpoint_ns, checkpoint_id FROM (
+        SELECT thread_id, checkpoint_ns, checkpoint_id,
+               row_number() OVER (
+                   PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+               ) AS position
+        FROM checkpoints
+    ) WHERE position > ?
+)
+"""
+
+
+class Checkpointers:
+    """
+    Sync and async checkpoint savers over one backend.
+
+    The sync saver is created immediately. Async savers hold connections that
+    belong to one event loop, so ``aget_saver()`` builds one per running loop on
+    first use. All of them see the same threads because they share the same
+    database. ``aclose()`` closes the async savers; call it before the loop ends.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[str] = None,
+        connection: Optional[str] = None,
+        sqlite_path: Optional[str] = None,
+        pool_settings: Optional[PoolSettings] = None,
+        retention: Optional[RetentionPolicy] = None,
+    ):
+        # Read here rather than at import, so values from .env apply
+        self.connection = _postgres_conninfo(connection or database_url())
+        self.sqlite_path = sqlite_path or os.getenv(
+            "CHATBOT_CHECKPOINT_SQLITE_PATH", SQLITE_CHECKPOINT_PATH
+        )
+        self.pool_settings = pool_settings or PoolSettings.from_env()
+        self.retention = retention or RetentionPolicy.from_env()
+
+        self._pool = None
+        # Per event loop: the async saver and the pool or connection it owns
+        self._async_savers: Dict[asyncio.AbstractEventLoop, BaseCheckpointSaver] = {}
+        self._async_resources: Dict[asyncio.AbstractEventLoop, Any] = {}
+        self._async_locks: Dict[asyncio.AbstractEventLoop, asyncio.Lock] = {}
+        self._async_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._pruner: Optional[threading.Thread] = None
+
+        backend = backend or os.getenv("CHATBOT_CHECKPOINTER", "auto")
+        if backend == "auto":
+            try:
+                self.saver = self._create_postgres_saver()
+                backend = "postgres"
+            except Exception as e:
+                logger.warning(f"⚠️ Postgres checkpointer unavailable ({e}), using SQLite")
+                self.saver = self._create_sqlite_saver()
+                backend = "sqlite"
+        elif backend == "postgres":
+            self.saver = self._create_postgres_saver()
+        elif backend == "sqlite":
+            self.saver = self._create_sqlite_saver()
+        elif backend == "memory":
+            self.saver = BoundedMemorySaver(
+                max_checkpoints=self.retention.max_checkpoints_per_thread
+            )
+        else:
+            raise ValueError(f"Unknown checkpointer backend: {backend}")
+        self.backend = backend
+
+    def _pool_kwargs(self) -> dict:
+        from psycopg.rows import dict_row
+
+        return {
+            "autocommit": True,
+            "prepare_threshold": 0,
+            "row_factory": dict_row,
+            "connect_timeout": self.pool_settings.connect_timeout,
+        }
+
+    def _create_postgres_saver(self) -> BaseCheckpointSaver:
+        from langgraph.checkpoint.postgres import PostgresSaver
+        from psycopg_pool import ConnectionPool
+
+        pool = ConnectionPool(
+            self.connection,
+            min_size=self.pool_settings.min_size,
+            max_size=self.pool_settings.max_size,
+            timeout=self.pool_settings.checkout_timeout,
+            max_lifetime=self.pool_settings.recycle_seconds,
+            kwargs=self._pool_kwargs(),
+            check=ConnectionPool.check_connection,
+            open=False,
+        )
+        try:
+            pool.open(wait=True, timeout=self.pool_settings.connect_timeout)
+            saver = PostgresSaver(pool)
+            saver.setup()
+        except Exception:
+            pool.close()
+            raise
+        self._pool = pool
+        return saver
+
+    def _create_sqlite_saver(self) -> BaseCheckpointSaver:
+        from langgraph.checkpoint.sqlite import SqliteSaver
+
+        directory = os.path.dirname(self.sqlite_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.sqlite_path, check_same_thread=False)
+        saver = SqliteSaver(conn)
+        saver.setup()
+        return saver
+
+    async def aget_saver(self) -> BaseCheckpointSaver:
+        """Async saver for the same backend, owned by the running event loop."""
+        if self.backend == "memory":
+            # BoundedMemorySaver implements both the sync and async interfaces
+            return self.saver
+
+        loop = asyncio.get_running_loop()
+        saver = self._async_savers.get(loop)
+        if saver is not None:
+            return saver
+
+        with self._async_lock:
+            lock = self._async_locks.setdefault(loop, asyncio.Lock())
+        # Concurrent first calls on one loop share a single pool or connection
+        async with lock:
+            if loop not in self._async_savers:
+                await self._close_stale_savers()
+                saver, resource = await self._create_async_saver()
+                self._async_resources[loop] = resource
+                self._async_savers[loop] = saver
+        return self._async_savers[loop]
+
+    async def _create_async_saver(self):
+        """A new async saver and the pool or connection to close with it."""
+        if self.backend == "postgres":
+            from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+            from psycopg_pool import AsyncConnectionPool
+
+            pool = AsyncConnectionPool(
+                self.connection,
+                min_size=self.pool_settings.min_size,
+                max_size=self.pool_settings.max_size,
+                timeout=self.pool_settings.checkout_timeout,
+                max_lifetime=self.pool_settings.recycle_seconds,
+                kwargs=self._pool_kwargs(),
+                check=AsyncConnectionPool.check_connection,
+                open=False,
+            )
+            try:
+                await pool.open(wait=True, timeout=self.pool_settings.connect_timeout)
+                saver = AsyncPostgresSaver(pool)
+                await saver.setup()
+            except Exception:
+                await pool.close()
+                raise
+            return saver, pool
+
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+        conn = aiosqlite.connect(self.sqlite_path)
+        # aiosqlite runs each connection on its own thread; a connection that
+        # is never closed must not keep the process from exiting
+        conn.daemon = True
+        await conn
+        return AsyncSqliteSaver(conn), conn
+
+    async def _close_async(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._async_savers.pop(loop, None)
+        self._async_locks.pop(loop, None)
+        resource = self._async_resources.pop(loop, None)
+        if resource is None:
+            return
+        try:
+            await resource.close()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not close async checkpointer connection: {e}")
+
+    async def _close_stale_savers(self) -> None:
+        """Close savers whose event loop has ended (e.g. an earlier asyncio.run)."""
+        for loop in [loop for loop in self._async_savers if loop.is_closed()]:
+            await self._close_async(loop)
+
+    def prune(self) -> Dict[str, int]:
+        """
+        Apply the retention policy once.
+
+        Returns:
+            Number of threads deleted for age and checkpoints deleted for count
+        """
+        if self.backend == "memory":
+            # Checkpoints per thread are capped on every write
+            threads_deleted = self.saver.evict_idle()
+            if self.retention.max_thread_age_seconds:
+                cutoff = time.time() - self.retention.max_thread_age_seconds
+                threads_deleted += self.saver.delete_spilled_before(cutoff)
+            return {"threads_deleted": threads_deleted, "checkpoints_deleted": 0}
+
+        threads_deleted = 0
+        if self.retention.max_thread_age_seconds:
+            cutoff = time.time() - self.retention.max_thread_age_seconds
+            for thread_id in self._threads_idle_since(cutoff):
+                self.saver.delete_thread(thread_id)
+                threads_deleted += 1
+
+        keep = self.retention.max_checkpoints_per_thread
+        if self.backend == "postgres":
+            with self._pool.connection() as conn:
+                pruned = conn.execute(_PRUNE_POSTGRES_SQL, {"keep": keep}).fetchall()
+                checkpoints_deleted = len(pruned)
+                thread_ids = sorted({row["thread_id"] for row in pruned})
+                if thread_ids:
+                    conn.execute(_PRUNE_POSTGRES_BLOBS_SQL, {"thread_ids": thread_ids})
+        else:
+            with self.saver.cursor() as cur:
+                cur.execute(_PRUNE_SQLITE_SQL.format(table="writes"), (keep,))
+                cur.execute(_PRUNE_SQLITE_SQL.format(table="checkpoints"), (keep,))
+                checkpoints_deleted = cur.rowcount
+
+        return {
+            "threads_deleted": threads_deleted,
+            "checkpoints_deleted": checkpoints_deleted,
+        }
+
+    def _threads_idle_since(self, cutoff: float) -> List[str]:
+        """Threads whose newest checkpoint was written before ``cutoff``."""
+        query = "SELECT thread_id, MAX(checkpoint_id) AS latest FROM checkpoints GROUP BY thread_id"
+        if self.backend == "postgres":
+            with self._pool.connection() as conn:
+                rows = [(r["thread_id"], r["latest"]) for r in conn.execute(query)]
+        else:
+            with self.saver.cursor(transaction=False) as cur:
+                rows = cur.execute(query).fetchall()
+        return [
+            thread_id for thread_id, latest in rows if checkpoint_timestamp(latest) < cutoff
+        ]
+
+    def start_retention(self) -> None:
+        """Run ``prune()`` periodically on a daemon thread."""
+        interval = self.retention.prune_interval_seconds
+        if not interval or self._pruner is not None:
+            return
+
+        def run() -> None:
+            while not self._stop.wait(interval):
+                try:
+                    result = self.prune()
+                    if any(result.values()):
+                        logger.info(f"🧹 Pruned checkpoints: {result}")
+                except Exception as e:
+                    logger.error(f"❌ Checkpoint pruning error: {e}")
+
+        self._pruner = threading.Thread(
+            target=run, name="checkpoint-retention", daemon=True
+        )
+        self._pruner.start()
+
+    def close(self) -> None:
+        """Stop pruning and close connections (sync side)."""
+        self._stop.set()
+        if self._pool is not None:
+            self._pool.close()
+        elif self.backend == "sqlite":
+            self.saver.conn.close()
+        else:
+            self.saver.close()
+
+    async def aclose(self) -> None:
+        """Close the async savers' connections, then the sync side."""
+        for loop in list(self._async_savers):
+            await self._close_async(loop)
+        self.close()
+
+
+_shared_checkpointers: Optional[Checkpointers] = None
+_shared_lock = threading.Lock()
+
+
+def get_checkpointers() -> Checkpointers:
+    """Return the process-wide checkpointers, creating them on first use."""
+    global _shared_checkpointers
+    if _shared_checkpointers is None:
+        with _shared_lock:
+            if _shared_checkpointers is None:
+                _shared_checkpointers = Checkpointers()
+                _shared_checkpointers.start_retention()
+                atexit.register(_shared_checkpointers.close)
+    return _shared_checkpointers
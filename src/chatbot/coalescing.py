@@ -0,0 +1,262 @@
+"""
+Request coalescing for the embedding and vector search path.
+
+When many sessions ask the same popular question at once, each would embed
+the same text and run the same nearest-neighbour query. ``SingleFlight``
+lets identical concurrent requests share one in-flight call, and
+``EmbeddingBatcher`` folds a burst of distinct texts arriving within a few
+milliseconds into one embeddings API request.
+
+    CHATBOT_COALESCING=0                 disable both
+    CHATBOT_EMBED_BATCH_WINDOW_MS=3      how long a batch stays open
+    CHATBOT_EMBED_BATCH_SIZE=64          texts per embeddings request
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from array import array
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Sequence, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+from src.chatbot.instrumentation import configure_logging, embedding_timer
+from src.chatbot.metrics import REGISTRY, Counter
+
+COALESCING_ENABLED = os.getenv("CHATBOT_COALESCING", "1") != "0"
+BATCH_WINDOW_MS = float(os.getenv("CHATBOT_EMBED_BATCH_WINDOW_MS", 3))
+BATCH_SIZE = int(os.getenv("CHATBOT_EMBED_BATCH_SIZE", 64))
+
+COALESCED_REQUESTS = REGISTRY.register(
+    Counter(
+        "chatbot_coalesced_requests_total",
+        "Requests by whether they ran (leader) or joined one in flight (shared)",
+        ("flight", "role"),
+    )
+)
+EMBEDDING_BATCHES = REGISTRY.register(
+    Counter("chatbot_embedding_batches_total", "Micro-batched embeddings requests")
+)
+EMBEDDING_BATCHED_TEXTS = REGISTRY.register(
+    Counter("chatbot_embedding_batched_texts_total", "Texts sent in micro-batches")
+)
+
+
+def vector_key(vector: Sequence[float]) -> str:
+    """Compact hashable key for an embedding."""
+    return hashlib.sha1(array("f", vector).tobytes()).hexdigest()
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share its result."""
+
+    def __init__(self, name: str, enabled: bool = COALESCING_ENABLED):
+        self.name = name
+        self.enabled = enabled
+        self._calls: Dict[Hashable, Future] = {}
+        self._async_calls: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self._counters = {"calls": 0, "shared": 0}
+
+    def _count(self, shared: bool) -> None:
+        with self._lock:
+            self._counters["calls"] += 1
+            self._counters["shared"] += shared
+        COALESCED_REQUESTS.inc(flight=self.name, role="shared" if shared else "leader")
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Return ``fn()``, or the result of the identical call already running."""
+        if not self.enabled:
+            return fn()
+        with self._lock:
+            running = self._calls.get(key)
+            if running is None:
+                future = self._calls[key] = Future()
+        if running is not None:
+            self._count(shared=True)
+            return running.result()
+
+        self._count(shared=False)
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Async variant of do; calls are shared within one event loop."""
+        if not self.enabled:
+            return await fn()
+        flight_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            task = self._async_calls.get(flight_key)
+            shared = task is not None
+            if task is None:
+                task = self._async_calls[flight_key] = asyncio.ensure_future(fn())
+                task.add_done_callback(lambda _: self._forget(flight_key))
+        self._count(shared=shared)
+        # Shielded, so one caller cancelling doesn't fail the others
+        return await asyncio.shield(task)
+
+    def _forget(self, flight_key: Tuple[int, Hashable]) -> None:
+        with self._lock:
+            self._async_calls.pop(flight_key, None)
+
+    def stats(self) -> Dict[str, float]:
+        """Calls, how many shared a call in flight, and that ratio."""
+        with self._lock:
+            stats = dict(self._counters)
+        stats["coalescing_ratio"] = (
+            stats["shared"] / stats["calls"] if stats["calls"] else 0.0
+        )
+        return stats
+
+
+class EmbeddingBatcher:
+    """
+    Collects single texts for a few milliseconds and embeds them in one request.
+
+    Texts go to ``embed_documents``, which for OpenAI embeddings is the same
+    endpoint ``embed_query`` uses.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        window_ms: float = BATCH_WINDOW_MS,
+        max_batch: int = BATCH_SIZE,
+    ):
+        """
+        Args:
+            embeddings: Backend that embeds each batch
+            window_ms: How long the first text of a batch waits for company
+            max_batch: Texts that close a batch early
+        """
+        self.embeddings = embeddings
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._pending: List[Tuple[str, Future]] = []
+        self._async_pending: Dict[int, List[Tuple[str, asyncio.Future]]] = {}
+        self._lock = threading.Lock()
+        self._counters = {"texts": 0, "batches": 0}
+
+    def _record(self, texts: int) -> None:
+        with self._lock:
+            self._counters["texts"] += texts
+            self._counters["batches"] += 1
+        EMBEDDING_BATCHES.inc()
+        EMBEDDING_BATCHED_TEXTS.inc(texts)
+
+    def _take(self) -> List[Tuple[str, Future]]:
+        """Close the open batch (lock held)."""
+        batch, self._pending = self._pending, []
+        return batch
+
+    def _run(self, batch: List[Tuple[str, Future]]) -> None:
+        self._record(len(batch))
+        try:
+            with embedding_timer(len(batch)):
+                vectors = self.embeddings.embed_documents([text for text, _ in batch])
+        except BaseException as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), vector in zip(batch, vectors):
+            future.set_result(vector)
+
+    def embed(self, text: str) -> List[float]:
+        """Embed ``text`` together with whatever else arrives within the window."""
+        future: Future = Future()
+        with self._lock:
+            self._pending.append((text, future))
+            leader = len(self._pending) == 1
+            batch = self._take() if len(self._pending) >= self.max_batch else None
+        if batch:
+            self._run(batch)
+        elif leader:
+            # The first caller holds the batch open, then sends it
+            time.sleep(self.window)
+            with self._lock:
+                batch = self._take()
+            if batch:
+                self._run(batch)
+        return future.result()
+
+    async def _aflush_later(self, loop_id: int) -> None:
+        await asyncio.sleep(self.window)
+        with self._lock:
+            batch = self._async_pending.pop(loop_id, [])
+        if batch:
+            await self._asend(batch)
+
+    async def _asend(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        self._record(len(batch))
+        try:
+            with embedding_timer(len(batch)):
+                vectors = await self.embeddings.aembed_documents(
+                    [text for text, _ in batch]
+                )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+    async def aembed(self, text: str) -> List[float]:
+        """Async variant of embed; batches texts from one event loop."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            pending = self._async_pending.setdefault(id(loop), [])
+            pending.append((text, future))
+            first = len(pending) == 1
+            full = self._async_pending.pop(id(loop)) if len(pending) >= self.max_batch else None
+        # Separate tasks, so the batch is sent even if this caller is cancelled
+        if full:
+            loop.create_task(self._asend(full))
+        elif first:
+            loop.create_task(self._aflush_later(id(loop)))
+        return await future
+
+    def stats(self) -> Dict[str, float]:
+        """Texts, embeddings requests and the average batch size."""
+        with self._lock:
+            stats = dict(self._counters)
+        stats["avg_batch_size"] = (
+            stats["texts"] / stats["batches"] if stats["batches"] else 0.0
+        )
+        return stats
+
+
+if __name__ == "__main__":
+    """Demo: 32 threads asking 4 questions share 4 embeddings in one request."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from src.chatbot.benchmarks.fakes import HashEmbeddings
+
+    configure_logging()
+    print("🧪 Testing Request Coalescing...")
+    backend = HashEmbeddings(latency_ms=50)
+    batcher = EmbeddingBatcher(backend, window_ms=5)
+    flight = SingleFlight("demo")
+    questions = [f"Popular question {i % 4}" for i in range(32)]
+
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        list(
+            executor.map(
+                lambda text: flight.do(text, lambda: batcher.embed(text)), questions
+            )
+        )
+    print(f"✅ Single-flight: {flight.stats()}")
+    print(f"✅ Batches: {batcher.stats()} ({backend.calls} embeddings requests)")
@@ -0,0 +1,151 @@
+"""
+Token-budgeted packing of retrieved memories into the response prompt.
+
+Retrieval returns whole conversation summaries or profile facts. Slicing
+them by characters wastes budget on some and cuts key facts out of others.
+The packer counts real tokens with the shared tokenizer, drops memories that
+mostly repeat a better-ranked one, and fills the budget best-first. A memory
+that doesn't fit is trimmed to a sentence boundary when enough budget is left.
+
+    CHATBOT_CONTEXT_TOKEN_BUDGET=400    tokens for all memories in a turn
+    CHATBOT_CONTEXT_MAX_ITEM_TOKENS=160 tokens for any single memory
+"""
+
+import logging
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Set, Tuple
+
+from src.chatbot.tokens import DEFAULT_TOKEN_MODEL, count_tokens, truncate_to_tokens
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CHATBOT_CONTEXT_TOKEN_BUDGET", 400))
+MAX_ITEM_TOKENS = int(os.getenv("CHATBOT_CONTEXT_MAX_ITEM_TOKENS", 160))
+# A memory sharing this much of its words with a better one is dropped
+OVERLAP_THRESHOLD = float(os.getenv("CHATBOT_CONTEXT_OVERLAP", 0.8))
+# Trimmed memories shorter than this are left out instead
+MIN_FRAGMENT_TOKENS = 24
+# The "- " bullet and newline each memory gets in the prompt
+ITEM_OVERHEAD_TOKENS = 2
+
+WORD = re.compile(r"\w+")
+SENTENCE_END = re.compile(r"[.!?](\s|$)")
+
+
+@dataclass
+class Memory:
+    """One retrieved memory; a higher score ranks first."""
+
+    text: str
+    score: float = 0.0
+
+
+def ranked(texts: Sequence[str]) -> List[Memory]:
+    """Memories scored by position, for results that arrive best first."""
+    return [Memory(text, float(len(texts) - index)) for index, text in enumerate(texts)]
+
+
+def _words(text: str) -> Set[str]:
+    return set(WORD.findall(text.lower()))
+
+
+def overlaps(words: Set[str], kept: Set[str], threshold: float = OVERLAP_THRESHOLD) -> bool:
+    """True if most of the smaller word set also appears in the other."""
+    if not words or not kept:
+        return False
+    return len(words & kept) / min(len(words), len(kept)) >= threshold
+
+
+def trim(text: str, max_tokens: int, model: str = DEFAULT_TOKEN_MODEL) -> str:
+    """``text`` cut to ``max_tokens``, at the last sentence end if one is past halfway."""
+    prefix = truncate_to_tokens(text, max_tokens - 1, model)  # room for the ellipsis
+    ends = [match.end() for match in SENTENCE_END.finditer(prefix)]
+    if ends and ends[-1] >= len(prefix) / 2:
+        return prefix[: ends[-1]].rstrip()
+    return prefix.rstrip() + "…"
+
+
+def pack_context(
+    memories: Sequence[Memory],
+    token_budget: int = CONTEXT_TOKEN_BUDGET,
+    max_item_tokens: int = MAX_ITEM_TOKENS,
+    model: str = DEFAULT_TOKEN_MODEL,
+) -> Tuple[List[str], Dict[str, int]]:
+    """
+    Pick and trim memories to fit ``token_budget``, best score first.
+
+    Args:
+        memories: Candidate memories in any order
+        token_budget: Tokens available for all packed memories
+        max_item_tokens: Tokens any one memory may take
+        model: Model whose tokenizer counts the tokens
+
+    Returns:
+        Packed memory texts, best first, and the packing stats
+    """
+    memories = [m for m in memories if m.text.strip()]
+    stats = {
+        "candidates": len(memories),
+        "packed": 0,
+        "overlapping": 0,
+        "trimmed": 0,
+        "over_budget": 0,
+        "tokens": 0,
+        "budget": token_budget,
+    }
+    packed: List[str] = []
+    kept_words: List[Set[str]] = []
+    for memory in sorted(memories, key=lambda m: m.score, reverse=True):
+        text = memory.text.strip()
+        words = _words(text)
+        if any(overlaps(words, kept) for kept in kept_words):
+            stats["overlapping"] += 1
+            continue
+
+        available = min(max_item_tokens, token_budget - stats["tokens"] - ITEM_OVERHEAD_TOKENS)
+        tokens = count_tokens(text, model)
+        if tokens > available:
+            if available < MIN_FRAGMENT_TOKENS:
+                stats["over_budget"] += 1
+                continue
+            text = trim(text, available, model)
+            tokens = count_tokens(text, model)
+            stats["trimmed"] += 1
+
+        packed.append(text)
+        kept_words.append(words)
+        stats["packed"] += 1
+        stats["tokens"] += tokens + ITEM_OVERHEAD_TOKENS
+    return packed, stats
+
+
+def log_packing(stats: Dict[str, int], source: str) -> None:
+    """One log line per turn with what the packer kept and dropped."""
+    if not stats["candidates"]:
+        return
+    logger.info(
+        f"📦 Packed {stats['packed']}/{stats['candidates']} {source} "
+        f"({stats['tokens']}/{stats['budget']} tokens, {stats['overlapping']} overlapping, "
+        f"{stats['trimmed']} trimmed, {stats['over_budget']} over budget)"
+    )
+
+
+if __name__ == "__main__":
+    """Demo: pack three summaries, one of them a near-duplicate, into 120 tokens."""
+    from src.chatbot.instrumentation import configure_logging
+
+    configure_logging()
+    print("🧪 Testing Context Packing...")
+    summaries = [
+        "User deployed a LangGraph app with Docker Compose and Postgres. "
+        "They hit connection pool exhaustion and raised the pool size to 20.",
+        "User deployed a LangGraph app with Docker Compose and Postgres, "
+        "then raised the pool size to 20 after pool exhaustion.",
+        "User compared pgvector HNSW with a local numpy index. " * 12,
+    ]
+    texts, stats = pack_context(ranked(summaries), token_budget=120)
+    for text in texts:
+        print(f"  - {text}")
+    print(f"✅ Stats: {stats}")
@@ -5,13 +5,31 @@ This module demonstrates how to build a stateful chatbot using LangGraph,
 showcasing conversation memory, state management, and graph-based workflows.
 """
 
+import asyncio
+import threading
 import uuid
-from typing import Optional, Iterator
+from typing import AsyncIterator, Dict, Optional, Iterator
 from dotenv import load_dotenv
 from langchain_core.messages import HumanMessage, AIMessage
-from src.chatbot.graph import create_conversation_graph
-
-load_dotenv()
+from src.chatbot.checkpointer import (
+    CHECKPOINT_DURABILITY,
+    Checkpointers,
+    get_checkpointers,
+)
+from src.chatbot.graph import (
+    RESPONSE_NODES,
+    build_async_conversation_graph,
+    build_conversation_graph,
+)
+from src.chatbot.instrumentation import configure_logging
+from src.chatbot.intent import IntentGate
+from src.chatbot.response_cache import (
+    RESPONSE_CACHE_ENABLED,
+    SemanticResponseCache,
+    get_response_cache,
+)
+from src.chatbot.simple_vector_store import SimpleVectorStore
+from src.chatbot.write_behind import WRITE_BEHIND_ENABLED, get_write_queue
 
 
 class ConversationBot:
@@ -22,10 +40,90 @@ class ConversationBot:
     - Automatic conversation memory via LangGraph checkpointer
     - Thread-based conversation management
     - LangGraph Studio compatible structure
+    - Async API (achat / achat_stream) sharing the same conversation memory
     """
 
-    def __init__(self):
-        self.graph = create_conversation_graph()
+    def __init__(
+        self,
+        vector_store: Optional[SimpleVectorStore] = None,
+        retrieval_deadline_ms: Optional[float] = None,
+        checkpointers: Optional[Checkpointers] = None,
+        response_cache: Optional[SemanticResponseCache] = None,
+        intent_gate: Optional[IntentGate] = None,
+    ):
+        """
+        Args:
+            vector_store: Store for past conversations (default: shared pooled store)
+            retrieval_deadline_ms: Retrieval budget per turn; after it the response
+                                   is generated without context
+                                   (default: CHATBOT_RETRIEVAL_DEADLINE_MS, off)
+            checkpointers: Checkpoint backend for thread history
+                           (default: shared Postgres/SQLite checkpointer)
+            response_cache: Semantic cache for first-turn answers
+                            (default: shared cache if CHATBOT_RESPONSE_CACHE=1)
+            intent_gate: Decides which turns skip retrieval
+                         (default: shared gate, off with CHATBOT_INTENT_GATE=0)
+        """
+        # API keys from .env are read when the clients are first built
+        load_dotenv()
+        self.vector_store = vector_store
+        self.retrieval_deadline_ms = retrieval_deadline_ms
+        # Sync and async graphs use the same backend so threads can mix both APIs
+        self.checkpointers = checkpointers or get_checkpointers()
+        if response_cache is None and RESPONSE_CACHE_ENABLED:
+            response_cache = get_response_cache()
+        self.response_cache = response_cache
+        self.intent_gate = intent_gate
+        if vector_store is None and WRITE_BEHIND_ENABLED:
+            # Start the workers now so saves journaled before a crash are
+            # stored without waiting for the next quit
+            get_write_queue()
+        self.graph = build_conversation_graph(
+            vector_store=vector_store,
+            checkpointer=self.checkpointers.saver,
+            response_cache=response_cache,
+            intent_gate=intent_gate,
+        )
+        # One async graph per event loop, since its checkpointer belongs to the loop
+        self._async_graphs: Dict[asyncio.AbstractEventLoop, object] = {}
+        self._async_locks: Dict[asyncio.AbstractEventLoop, asyncio.Lock] = {}
+        self._async_lock = threading.Lock()
+
+    async def get_async_graph(self):
+        """Async graph, compiled on first use inside the running event loop."""
+        loop = asyncio.get_running_loop()
+        graph = self._async_graphs.get(loop)
+        if graph is not None:
+            return graph
+
+        with self._async_lock:
+            lock = self._async_locks.setdefault(loop, asyncio.Lock())
+        async with lock:
+            if loop not in self._async_graphs:
+                for stale in [l for l in self._async_graphs if l.is_closed()]:
+                    del self._async_graphs[stale]
+                    self._async_locks.pop(stale, None)
+                saver = await self.checkpointers.aget_saver()
+                self._async_graphs[loop] = build_async_conversation_graph(
+                    checkpointer=saver,
+                    vector_store=self.vector_store,
+                    response_cache=self.response_cache,
+                    intent_gate=self.intent_gate,
+                )
+        return self._async_graphs[loop]
+
+    async def aclose(self) -> None:
+        """Close the async checkpointer connections; call before the event loop ends."""
+        self._async_graphs.clear()
+        self._async_locks.clear()
+        await self.checkpointers.aclose()
+
+    def _config(self, thread_id: str) -> dict:
+        """Run config with the thread ID for checkpointing and the retrieval budget."""
+        configurable = {"thread_id": thread_id}
+        if self.retrieval_deadline_ms is not None:
+            configurable["retrieval_deadline_ms"] = self.retrieval_deadline_ms
+        return {"configurable": configurable}
 
     def chat(self, user_input: str, thread_id: Optional[str] = None) -> str:
         """
@@ -46,14 +144,16 @@ class ConversationBot:
             thread_id = str(uuid.uuid4())
 
         # Create config with thread ID for checkpointing
-        config = {"configurable": {"thread_id": thread_id}}
+        config = self._config(thread_id)
 
         # Create input with just the new user message
         # The graph's checkpointer handles conversation history automatically
         input_state = {"messages": [HumanMessage(content=user_input)]}
 
         # Run the graph - it automatically loads previous state and saves new state
-        result = self.graph.invoke(input_state, config=config)
+        result = self.graph.invoke(
+            input_state, config=config, durability=CHECKPOINT_DURABILITY
+        )
 
         # Extract AI response
         ai_message = result["messages"][-1]
@@ -84,17 +184,84 @@ class ConversationBot:
             thread_id = str(uuid.uuid4())
 
         # Create config with thread ID for checkpointing
-        config = {"configurable": {"thread_id": thread_id}}
+        config = self._config(thread_id)
 
         # Create input with just the new user message
         input_state = {"messages": [HumanMessage(content=user_input)]}
 
         # Stream the response using LangGraph's message streaming
         for chunk, metadata in self.graph.stream(
-            input_state, config=config, stream_mode="messages"
+            input_state,
+            config=config,
+            stream_mode="messages",
+            durability=CHECKPOINT_DURABILITY,
+        ):
+            # Only the reply's chunks (generated or cached), not the history summary
+            if (
+                isinstance(chunk, AIMessage)
+                and chunk.content
+                and metadata.get("langgraph_node") in RESPONSE_NODES
+            ):
+                yield chunk.content
+
+    async def achat(self, user_input: str, thread_id: Optional[str] = None) -> str:
+        """
+        Async variant of chat, for serving many threads from one event loop.
+
+        Args:
+            user_input: The user's message
+            thread_id: Optional thread ID to maintain conversation context.
+                      If None, creates a new conversation thread.
+
+        Returns:
+            AI response text
+        """
+        if thread_id is None:
+            thread_id = str(uuid.uuid4())
+
+        config = self._config(thread_id)
+        input_state = {"messages": [HumanMessage(content=user_input)]}
+
+        graph = await self.get_async_graph()
+        result = await graph.ainvoke(
+            input_state, config=config, durability=CHECKPOINT_DURABILITY
+        )
+
+        ai_message = result["messages"][-1]
+        return ai_message.content if hasattr(ai_message, "content") else str(ai_message)
+
+    async def achat_stream(
+        self, user_input: str, thread_id: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Async variant of chat_stream.
+
+        Args:
+            user_input: The user's message
+            thread_id: Optional thread ID to maintain conversation context.
+                      If None, creates a new conversation thread.
+
+        Yields:
+            Individual response tokens/chunks as they're generated
+        """
+        if thread_id is None:
+            thread_id = str(uuid.uuid4())
+
+        config = self._config(thread_id)
+        input_state = {"messages": [HumanMessage(content=user_input)]}
+
+        graph = await self.get_async_graph()
+        async for chunk, metadata in graph.astream(
+            input_state,
+            config=config,
+            stream_mode="messages",
+            durability=CHECKPOINT_DURABILITY,
         ):
-            # Filter to only AI message chunks and yield content
-            if isinstance(chunk, AIMessage) and chunk.content:
+            if (
+                isinstance(chunk, AIMessage)
+                and chunk.content
+                and metadata.get("langgraph_node") in RESPONSE_NODES
+            ):
                 yield chunk.content
 
     def start_conversation(self, streaming: bool = True) -> None:
@@ -104,6 +271,7 @@ class ConversationBot:
         Args:
             streaming: Whether to stream responses in real-time (default: True)
         """
+        configure_logging()
         mode_text = "Streaming" if streaming else "Standard"
         print(f"🤖 LangGraph Chatbot Ready! ({mode_text} Mode)")
         print("Type 'quit' to exit, 'new' to start new conversation\n")
@@ -156,6 +324,7 @@ def main():
     """
     Example usage of the ConversationBot with streaming responses.
     """
+    configure_logging()
     bot = ConversationBot()
 
     # Start interactive session with streaming enabled by default
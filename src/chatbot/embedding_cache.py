@@ -0,0 +1,236 @@
+"""
+Two-tier embedding cache for the conversation vector store.
+
+Tier 1 is an in-memory LRU bounded by entry count. Tier 2 is a SQLite file
+that survives restarts. Entries are keyed by (model, dimensions, hash of the
+normalized text), so repeated queries skip the embeddings API round trip.
+Query misses are coalesced: identical concurrent queries share one request,
+and distinct ones arriving together are embedded in one batch.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from src.chatbot.coalescing import COALESCING_ENABLED, EmbeddingBatcher, SingleFlight
+from src.chatbot.instrumentation import configure_logging, embedding_timer
+
+DEFAULT_CACHE_PATH = os.getenv(
+    "CHATBOT_EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite"
+)
+DEFAULT_MAX_ENTRIES = int(os.getenv("CHATBOT_EMBEDDING_CACHE_SIZE", 10_000))
+
+
+def openai_embeddings(model: str = "text-embedding-3-small") -> Embeddings:
+    """OpenAI embeddings client (langchain_openai is imported on first use)."""
+    from langchain_openai import OpenAIEmbeddings
+
+    return OpenAIEmbeddings(model=model)
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different spellings share a cache entry."""
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper with an in-memory LRU in front of a SQLite store."""
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model: Optional[str] = None,
+        dimensions: Optional[int] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        db_path: Optional[str] = DEFAULT_CACHE_PATH,
+        coalesce: bool = COALESCING_ENABLED,
+    ):
+        """
+        Args:
+            embeddings: The embeddings backend to call on a cache miss
+            model: Model name for the cache key (read from ``embeddings`` if None)
+            dimensions: Output dimensions for the cache key (read from ``embeddings`` if None)
+            max_entries: Maximum number of vectors held in memory
+            db_path: SQLite file for the persistent tier, or None to disable it
+            coalesce: Share and micro-batch concurrent query misses
+        """
+        self.embeddings = embeddings
+        self.model = model or getattr(embeddings, "model", type(embeddings).__name__)
+        self.dimensions = dimensions or getattr(embeddings, "dimensions", None)
+        self.max_entries = max_entries
+
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        self._flight = SingleFlight("embedding", enabled=coalesce)
+        self._batcher = EmbeddingBatcher(embeddings) if coalesce else None
+
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " key TEXT PRIMARY KEY, model TEXT NOT NULL,"
+                " dimensions INTEGER, vector BLOB NOT NULL)"
+            )
+            self._db.commit()
+
+    def _key(self, text: str) -> str:
+        digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+        return f"{self.model}:{self.dimensions}:{digest}"
+
+    def _lookup(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Return cached vectors for ``keys`` from memory, then disk."""
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+                    self._counters["memory_hits"] += 1
+
+            missing = [key for key in keys if key not in found]
+            if missing and self._db is not None:
+                placeholders = ",".join("?" * len(missing))
+                rows = self._db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    missing,
+                ).fetchall()
+                for key, blob in rows:
+                    vector = array("f", blob).tolist()
+                    found[key] = vector
+                    self._remember(key, vector)
+                    self._counters["disk_hits"] += 1
+
+            self._counters["misses"] += len([key for key in keys if key not in found])
+        return found
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        """Insert into the LRU tier, evicting the least recently used entry (lock held)."""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _save(self, computed: Dict[str, List[float]]) -> None:
+        with self._lock:
+            for key, vector in computed.items():
+                self._remember(key, vector)
+            if self._db is not None:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, model, dimensions, vector)"
+                    " VALUES (?, ?, ?, ?)",
+                    [
+                        (key, self.model, self.dimensions, array("f", vector).tobytes())
+                        for key, vector in computed.items()
+                    ],
+                )
+                self._db.commit()
+
+    def _misses(self, texts: List[str], keys: List[str], found: Dict) -> Dict[str, str]:
+        """Map each uncached key to one text to embed (deduplicating repeats)."""
+        return {key: text for text, key in zip(texts, keys) if key not in found}
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents, calling the backend only for uncached texts."""
+        keys = [self._key(text) for text in texts]
+        found = self._lookup(keys)
+        misses = self._misses(texts, keys, found)
+        if misses:
+            with embedding_timer(len(misses)):
+                vectors = self.embeddings.embed_documents(list(misses.values()))
+            computed = dict(zip(misses.keys(), vectors))
+            self._save(computed)
+            found.update(computed)
+        return [found[key] for key in keys]
+
+    def _embed_query_miss(self, key: str, text: str) -> List[float]:
+        if self._batcher is not None:
+            vector = self._batcher.embed(text)
+        else:
+            with embedding_timer(1):
+                vector = self.embeddings.embed_query(text)
+        self._save({key: vector})
+        return vector
+
+    async def _aembed_query_miss(self, key: str, text: str) -> List[float]:
+        if self._batcher is not None:
+            vector = await self._batcher.aembed(text)
+        else:
+            with embedding_timer(1):
+                vector = await self.embeddings.aembed_query(text)
+        self._save({key: vector})
+        return vector
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a search query, using the cache when possible."""
+        key = self._key(text)
+        found = self._lookup([key])
+        if key not in found:
+            return self._flight.do(key, lambda: self._embed_query_miss(key, text))
+        return found[key]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Async variant of embed_documents."""
+        keys = [self._key(text) for text in texts]
+        found = self._lookup(keys)
+        misses = self._misses(texts, keys, found)
+        if misses:
+            with embedding_timer(len(misses)):
+                vectors = await self.embeddings.aembed_documents(list(misses.values()))
+            computed = dict(zip(misses.keys(), vectors))
+            self._save(computed)
+            found.update(computed)
+        return [found[key] for key in keys]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """Async variant of embed_query."""
+        key = self._key(text)
+        found = self._lookup([key])
+        if key not in found:
+            return await self._flight.ado(
+                key, lambda: self._aembed_query_miss(key, text)
+            )
+        return found[key]
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters, the overall hit rate and query coalescing."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (
+            (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        )
+        stats["coalescing_ratio"] = self._flight.stats()["coalescing_ratio"]
+        if self._batcher is not None:
+            stats["avg_batch_size"] = self._batcher.stats()["avg_batch_size"]
+        return stats
+
+
+if __name__ == "__main__":
+    """Demo the embedding cache with fake embeddings."""
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+
+    configure_logging()
+    print("🧪 Testing Embedding Cache...")
+
+    cache = CachedEmbeddings(
+        DeterministicFakeEmbedding(size=8), model="fake", max_entries=2, db_path=None
+    )
+    cache.embed_query("What is LangGraph?")
+    cache.embed_query("what is   langgraph?")
+    cache.embed_documents(["Docker summary", "Python summary", "Docker summary"])
+
+    print(f"📊 Cache stats: {cache.stats()}")
@@ -2,6 +2,18 @@
 LangGraph graph definitions for the conversation chatbot.
 """
 
-from .conversation_graph import create_conversation_graph
+from .conversation_graph import (
+    RESPONSE_NODES,
+    build_async_conversation_graph,
+    build_conversation_graph,
+    create_async_conversation_graph,
+    create_conversation_graph,
+)
 
-__all__ = ["create_conversation_graph"]
+__all__ = [
+    "RESPONSE_NODES",
+    "build_async_conversation_graph",
+    "build_conversation_graph",
+    "create_async_conversation_graph",
+    "create_conversation_graph",
+]
@@ -4,47 +4,253 @@ LangGraph conversation graph definition.
 This module defines the conversation flow for the chatbot using LangGraph Studio compatible structure.
 """
 
+from functools import partial
+from typing import Callable, Optional, Tuple
+
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from src.chatbot.checkpointer import get_checkpointers
+from src.chatbot.instrumentation import instrument_node
+from src.chatbot.intent import IntentGate
 from src.chatbot.state import ConversationState
-from src.chatbot.nodes import generate_response
-from src.chatbot.nodes.retrieval import search_relevant_conversations
-from src.chatbot.nodes.storage import store_conversation_summary
-from src.chatbot.nodes.routing import should_store_conversation
+from src.chatbot.nodes import (
+    agenerate_response,
+    aupdate_history_summary,
+    generate_response,
+    update_history_summary,
+)
+from src.chatbot.nodes.retrieval import (
+    asearch_relevant_conversations,
+    search_relevant_conversations,
+    skip_retrieval,
+)
+from src.chatbot.nodes.storage import (
+    astore_conversation_summary,
+    store_conversation_summary,
+)
+from src.chatbot.nodes.response_cache import (
+    acached_response,
+    acheck_response_cache,
+    aupdate_response_cache,
+    cached_response,
+    check_response_cache,
+    route_response_cache,
+    update_response_cache,
+)
+from src.chatbot.nodes.routing import route_turn
+from src.chatbot.response_cache import (
+    RESPONSE_CACHE_ENABLED,
+    SemanticResponseCache,
+    get_response_cache,
+)
+from src.chatbot.simple_vector_store import SimpleVectorStore
 
+# Nodes whose model output is the reply streamed to the user
+RESPONSE_NODES = ("generate_response", "cached_response")
 
-def create_conversation_graph():
-    """
-    Create and compile the conversation graph with memory, retrieval, and storage.
 
-    Returns:
-        Compiled LangGraph with checkpointer for conversation memory, retrieval, and storage
+def _compile_conversation_graph(
+    search_node: Callable,
+    respond_node: Callable,
+    store_node: Callable,
+    history_node: Callable,
+    checkpointer: BaseCheckpointSaver,
+    cache_nodes: Optional[Tuple[Callable, Callable, Callable]] = None,
+    intent_gate: Optional[IntentGate] = None,
+):
+    """Wire the conversation flow from the given node implementations.
+
+    ``cache_nodes`` is an optional (check, cached_response, update) triple that
+    puts the semantic response cache in front of generate_response.
+    ``intent_gate`` decides which turns skip the memory search (default: the
+    shared gate).
     """
     # Create the workflow
     workflow = StateGraph(ConversationState)
 
+    def add_node(name: str, action: Callable) -> None:
+        # Every node runs inside an instrumentation span
+        workflow.add_node(name, instrument_node("conversation", name, action))
+
     # Add nodes
-    workflow.add_node("search_conversations", search_relevant_conversations)
-    workflow.add_node("generate_response", generate_response)
-    workflow.add_node("store_conversation", store_conversation_summary)
+    add_node("search_conversations", search_node)
+    add_node("skip_retrieval", skip_retrieval)
+    add_node("generate_response", respond_node)
+    add_node("store_conversation", store_node)
+    add_node("summarize_history", history_node)
 
-    # Flow: check for quit first, then search if needed
+    # Flow: check for quit first, then search unless it's small talk
     workflow.add_conditional_edges(
         START,
-        should_store_conversation,
-        {
-            "store_conversation": "store_conversation",
-            "generate_response": "search_conversations",
-        },
+        partial(route_turn, intent_gate=intent_gate),
+        ["store_conversation", "search_conversations", "skip_retrieval"],
     )
 
-    # After search, generate response
-    workflow.add_edge("search_conversations", "generate_response")
+    # After search (or skipping it), generate response; the history node only
+    # hands older turns to the background summary worker, so it never holds
+    # up the reply or the end of the turn
+    context_nodes = ("search_conversations", "skip_retrieval")
+    for context_node in context_nodes:
+        workflow.add_edge(context_node, "summarize_history")
+    if cache_nodes is None:
+        for context_node in context_nodes:
+            workflow.add_edge(context_node, "generate_response")
+    else:
+        # First-turn questions may be answered from the response cache
+        check_node, cached_node, update_node = cache_nodes
+        add_node("check_response_cache", check_node)
+        add_node("cached_response", cached_node)
+        add_node("update_response_cache", update_node)
+        for context_node in context_nodes:
+            workflow.add_edge(context_node, "check_response_cache")
+        workflow.add_conditional_edges(
+            "check_response_cache",
+            route_response_cache,
+            {
+                "cached_response": "cached_response",
+                "generate_response": "generate_response",
+            },
+        )
+        workflow.add_edge("cached_response", END)
 
-    # Both storage and response end the conversation
+    # Storage, response and summary all end the conversation turn
     workflow.add_edge("store_conversation", END)
-    workflow.add_edge("generate_response", END)
+    if cache_nodes is None:
+        workflow.add_edge("generate_response", END)
+    else:
+        workflow.add_edge("generate_response", "update_response_cache")
+        workflow.add_edge("update_response_cache", END)
+    workflow.add_edge("summarize_history", END)
 
     # Compile with checkpointer for conversation memory
-    checkpointer = MemorySaver()
     return workflow.compile(checkpointer=checkpointer)
+
+
+def _cache_nodes(
+    response_cache: Optional[SemanticResponseCache],
+    check: Callable,
+    cached: Callable,
+    update: Callable,
+) -> Optional[Tuple[Callable, Callable, Callable]]:
+    """Bind the cache nodes to ``response_cache`` (None leaves the cache out)."""
+    if response_cache is None:
+        return None
+    return (
+        partial(check, response_cache=response_cache),
+        cached,
+        partial(update, response_cache=response_cache),
+    )
+
+
+def build_conversation_graph(
+    vector_store: Optional[SimpleVectorStore] = None,
+    checkpointer: Optional[BaseCheckpointSaver] = None,
+    response_cache: Optional[SemanticResponseCache] = None,
+    intent_gate: Optional[IntentGate] = None,
+):
+    """
+    Create and compile the conversation graph with injectable dependencies.
+
+    Args:
+        vector_store: Store used by the retrieval and storage nodes.
+                      If None, the nodes use the shared pooled store.
+        checkpointer: Checkpointer for conversation memory
+                      (default: the shared persistent checkpointer)
+        response_cache: Semantic cache for first-turn answers (default: none)
+        intent_gate: Decides which turns skip retrieval (default: the shared gate)
+
+    Returns:
+        Compiled LangGraph with checkpointer for conversation memory, retrieval, and storage
+    """
+    search_node = search_relevant_conversations
+    store_node = store_conversation_summary
+    if vector_store is not None:
+        search_node = partial(search_relevant_conversations, vector_store=vector_store)
+        store_node = partial(store_conversation_summary, vector_store=vector_store)
+
+    return _compile_conversation_graph(
+        search_node,
+        generate_response,
+        store_node,
+        update_history_summary,
+        checkpointer or get_checkpointers().saver,
+        _cache_nodes(
+            response_cache, check_response_cache, cached_response, update_response_cache
+        ),
+        intent_gate,
+    )
+
+
+def build_async_conversation_graph(
+    checkpointer: BaseCheckpointSaver,
+    vector_store: Optional[SimpleVectorStore] = None,
+    response_cache: Optional[SemanticResponseCache] = None,
+    intent_gate: Optional[IntentGate] = None,
+):
+    """
+    Create the conversation graph with async nodes, for use with ainvoke/astream.
+
+    The nodes await the async psycopg engine and async model clients, so many
+    threads can be served concurrently from one event loop.
+
+    Args:
+        checkpointer: Async-capable checkpointer, e.g. from
+                      ``await get_checkpointers().aget_saver()``
+        vector_store: Store used by the retrieval and storage nodes.
+                      If None, the nodes use the shared pooled store.
+        response_cache: Semantic cache for first-turn answers (default: none)
+        intent_gate: Decides which turns skip retrieval (default: the shared gate)
+
+    Returns:
+        Compiled LangGraph with async nodes
+    """
+    search_node = asearch_relevant_conversations
+    store_node = astore_conversation_summary
+    if vector_store is not None:
+        search_node = partial(asearch_relevant_conversations, vector_store=vector_store)
+        store_node = partial(astore_conversation_summary, vector_store=vector_store)
+
+    return _compile_conversation_graph(
+        search_node,
+        agenerate_response,
+        store_node,
+        aupdate_history_summary,
+        checkpointer,
+        _cache_nodes(
+            response_cache, acheck_response_cache, acached_response, aupdate_response_cache
+        ),
+        intent_gate,
+    )
+
+
+def create_conversation_graph():
+    """
+    Create and compile the conversation graph with memory, retrieval, and storage.
+
+    Kept argument-free so the LangGraph dev server can load it from langgraph.json.
+    Set CHATBOT_RESPONSE_CACHE=1 to answer repeated first-turn questions from
+    the semantic response cache.
+
+    Returns:
+        Compiled LangGraph with checkpointer for conversation memory, retrieval, and storage
+    """
+    return build_conversation_graph(
+        response_cache=get_response_cache() if RESPONSE_CACHE_ENABLED else None
+    )
+
+
+async def create_async_conversation_graph():
+    """
+    Create and compile the async variant of the conversation graph.
+
+    Must be awaited inside the event loop that will run the graph, because
+    the async checkpointer's connections are bound to that loop.
+
+    Returns:
+        Compiled LangGraph with async nodes
+    """
+    saver = await get_checkpointers().aget_saver()
+    return build_async_conversation_graph(
+        checkpointer=saver,
+        response_cache=get_response_cache() if RESPONSE_CACHE_ENABLED else None,
+    )
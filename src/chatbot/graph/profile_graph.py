@@ -3,31 +3,61 @@ LangGraph conversation graph using native Store for memory.
 Demonstrates profile-based memory management.
 """
 
+from functools import partial
+from typing import Callable, Optional
+
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import MemorySaver
-from langgraph.store.memory import InMemoryStore
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.store.base import BaseStore
 
+from src.chatbot.checkpointer import get_checkpointers
+from src.chatbot.instrumentation import configure_logging, instrument_node
 from src.chatbot.state import ConversationState
 from src.chatbot.nodes import generate_response
 from src.chatbot.nodes.profile_retrieval import search_user_profile
 from src.chatbot.nodes.profile_storage import update_user_profile
 from src.chatbot.nodes.routing import should_store_conversation
-
-
-def create_profile_graph():
+from src.chatbot.profile_scheduler import (
+    PROFILE_SCHEDULER_ENABLED,
+    ProfileUpdateScheduler,
+    get_profile_scheduler,
+)
+from src.chatbot.profile_store import get_profile_store
+
+
+def build_profile_graph(
+    checkpointer: Optional[BaseCheckpointSaver] = None,
+    scheduler: Optional[ProfileUpdateScheduler] = None,
+    store: Optional[BaseStore] = None,
+):
     """
     Create conversation graph with LangGraph Store memory.
 
+    Args:
+        checkpointer: Checkpointer for conversation memory
+                      (default: the shared persistent checkpointer)
+        scheduler: Batches profile updates off the response path
+                   (default: the shared scheduler, unless
+                   CHATBOT_PROFILE_SCHEDULER=0)
+        store: Store holding user profiles
+               (default: the shared persistent, embedding-indexed store)
+
     Returns:
         Compiled LangGraph with checkpointer and native memory store
     """
     # Create the workflow
     workflow = StateGraph(ConversationState)
 
+    def add_node(name: str, action: Callable) -> None:
+        # Every node runs inside an instrumentation span
+        workflow.add_node(name, instrument_node("profile", name, action))
+
     # Add nodes (reusing routing and response from original)
-    workflow.add_node("search_profile", search_user_profile)
-    workflow.add_node("generate_response", generate_response)
-    workflow.add_node("update_profile", update_user_profile)
+    add_node("search_profile", search_user_profile)
+    add_node("generate_response", generate_response)
+    if scheduler is None and PROFILE_SCHEDULER_ENABLED:
+        scheduler = get_profile_scheduler()
+    add_node("update_profile", partial(update_user_profile, scheduler=scheduler))
 
     # Same flow as vector approach
     workflow.add_conditional_edges(
@@ -45,22 +75,33 @@ def create_profile_graph():
     workflow.add_edge("update_profile", END)
 
     # Compile with both checkpointer AND store
-    checkpointer = MemorySaver()
-    store = InMemoryStore()  # Use DB-backed store in production
+    checkpointer = checkpointer or get_checkpointers().saver
+    store = store or get_profile_store().store
 
     return workflow.compile(checkpointer=checkpointer, store=store)
 
 
+def create_profile_graph():
+    """
+    Create conversation graph with LangGraph Store memory.
+
+    Returns:
+        Compiled LangGraph with checkpointer and native memory store
+    """
+    return build_profile_graph()
+
+
 if __name__ == "__main__":
     """Demo the profile-based graph."""
     from langchain_core.messages import HumanMessage
     import uuid
 
+    configure_logging()
     print("🧪 Testing Profile Graph...")
 
     graph = create_profile_graph()
     thread_id = str(uuid.uuid4())
-    config = {"configurable": {"thread_id": thread_id}}
+    config = {"configurable": {"thread_id": thread_id, "user_id": "demo_user"}}
 
     # Test conversation
     result1 = graph.invoke(
@@ -0,0 +1,447 @@
+"""
+Per-node instrumentation for the chatbot graphs.
+
+Every graph node runs inside a span that records its wall time, the chat
+model(s) it called with prompt/completion/cached token counts, embedding
+calls and time spent in the database. Spans feed Prometheus histograms and
+counters (see ``metrics.REGISTRY``) and can be appended to a JSONL file.
+
+    CHATBOT_INSTRUMENTATION=0         disable spans entirely
+    CHATBOT_METRICS_PORT=9464         serve /metrics for Prometheus
+    CHATBOT_METRICS_JSONL=spans.jsonl append one JSON line per node run
+    CHATBOT_LOGGING=logging           leveled log records instead of bare prints
+    CHATBOT_LOG_LEVEL=INFO            minimum level shown
+
+Token counts come from the model's ``usage_metadata``; when streaming, OpenAI
+models only report it with ``stream_usage=True``.
+"""
+
+import functools
+import inspect
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import ChatGeneration, LLMResult
+from langchain_core.tracers.context import register_configure_hook
+
+from src.chatbot.metrics import (
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    start_metrics_server,
+)
+from src.llm import get_rate_limiter
+
+INSTRUMENTATION_ENABLED = os.getenv("CHATBOT_INSTRUMENTATION", "1") != "0"
+METRICS_PORT = int(os.getenv("CHATBOT_METRICS_PORT", 0))
+METRICS_JSONL_PATH = os.getenv("CHATBOT_METRICS_JSONL", "")
+# "print" keeps the plain emoji output; "logging" emits leveled, timestamped records
+LOGGING_MODE = os.getenv("CHATBOT_LOGGING", "print")
+LOG_LEVEL = os.getenv("CHATBOT_LOG_LEVEL", "INFO")
+
+NODE_DURATION = REGISTRY.register(
+    Histogram("chatbot_node_duration_ms", "Node wall time", ("graph", "node"))
+)
+NODE_DB_TIME = REGISTRY.register(
+    Histogram("chatbot_node_db_ms", "Database time within a node", ("graph", "node"))
+)
+NODE_EMBEDDING_TIME = REGISTRY.register(
+    Histogram(
+        "chatbot_node_embedding_ms", "Embedding time within a node", ("graph", "node")
+    )
+)
+LLM_TOKENS = REGISTRY.register(
+    Counter(
+        "chatbot_llm_tokens_total",
+        "Chat model tokens by kind (prompt, completion, cached)",
+        ("graph", "node", "model", "kind"),
+    )
+)
+LLM_CALLS = REGISTRY.register(
+    Counter("chatbot_llm_calls_total", "Chat model calls", ("graph", "node", "model"))
+)
+EMBEDDING_CALLS = REGISTRY.register(
+    Counter("chatbot_embedding_calls_total", "Embedding requests", ("graph", "node"))
+)
+EMBEDDED_TEXTS = REGISTRY.register(
+    Counter("chatbot_embedded_texts_total", "Texts embedded", ("graph", "node"))
+)
+NODE_ERRORS = REGISTRY.register(
+    Counter("chatbot_node_errors_total", "Nodes that raised", ("graph", "node"))
+)
+LLM_QUEUE_WAIT = REGISTRY.register(
+    Histogram(
+        "chatbot_llm_queue_wait_ms",
+        "Time chat model calls waited for rate-limit quota",
+        ("model", "priority"),
+    )
+)
+
+
+def _llm_queue_depths() -> Dict[tuple, float]:
+    return {
+        (model, priority): depth
+        for model, stats in get_rate_limiter().stats().items()
+        for priority, depth in stats["queue_depth"].items()
+    }
+
+
+LLM_QUEUE_DEPTH = REGISTRY.register(
+    Gauge(
+        "chatbot_llm_queue_depth",
+        "Chat model calls waiting for rate-limit quota",
+        ("model", "priority"),
+        _llm_queue_depths,
+    )
+)
+get_rate_limiter().add_wait_observer(
+    lambda model, priority, wait_ms: LLM_QUEUE_WAIT.observe(
+        wait_ms, model=model, priority=priority.name.lower()
+    )
+)
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Writes to whatever sys.stdout is now, so redirect_stdout silences it."""
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+class _PrintFormatter(logging.Formatter):
+    """Just the message, like the print() calls it replaces."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        return record.getMessage()
+
+
+def configure_logging(mode: str = LOGGING_MODE, level: str = LOG_LEVEL) -> None:
+    """Route the ``src`` loggers to stdout as bare messages or leveled records."""
+    logger = logging.getLogger("src")
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    handler = _StdoutHandler()
+    if mode == "logging":
+        handler.setFormatter(
+            logging.Formatter("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+        )
+    else:
+        handler.setFormatter(_PrintFormatter())
+    logger.addHandler(handler)
+    logger.setLevel(level.upper())
+    logger.propagate = False
+
+
+@dataclass
+class NodeSpan:
+    """What one node run did."""
+
+    graph: str
+    node: str
+    started_at: float
+    wall_ms: float = 0.0
+    models: List[str] = field(default_factory=list)
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    embedding_calls: int = 0
+    embedded_texts: int = 0
+    embedding_ms: float = 0.0
+    db_calls: int = 0
+    db_ms: float = 0.0
+    error: Optional[str] = None
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def add(self, **amounts: float) -> None:
+        """Add to counters; late updates from abandoned work are ignored."""
+        with self._lock:
+            if self._closed:
+                return
+            for name, amount in amounts.items():
+                setattr(self, name, getattr(self, name) + amount)
+
+    def add_model_usage(self, model: str, usage: Dict[str, Any]) -> None:
+        details = usage.get("input_token_details") or {}
+        with self._lock:
+            if self._closed:
+                return
+            if model not in self.models:
+                self.models.append(model)
+            self.llm_calls += 1
+            self.prompt_tokens += usage.get("input_tokens", 0)
+            self.completion_tokens += usage.get("output_tokens", 0)
+            self.cached_tokens += details.get("cache_read", 0)
+        labels = {"graph": self.graph, "node": self.node, "model": model}
+        LLM_CALLS.inc(**labels)
+        LLM_TOKENS.inc(usage.get("input_tokens", 0), kind="prompt", **labels)
+        LLM_TOKENS.inc(usage.get("output_tokens", 0), kind="completion", **labels)
+        LLM_TOKENS.inc(details.get("cache_read", 0), kind="cached", **labels)
+
+    def close(self) -> Dict[str, Any]:
+        with self._lock:
+            self._closed = True
+            return asdict(self)
+
+
+_current_span: ContextVar[Optional[NodeSpan]] = ContextVar(
+    "chatbot_node_span", default=None
+)
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """Adds chat model token usage to the span of the node making the call."""
+
+    run_inline = True  # keep the caller's context, so the span is visible
+
+    def __init__(self):
+        self._models: Dict[UUID, str] = {}
+
+    def on_chat_model_start(
+        self,
+        serialized: Dict[str, Any],
+        messages: List[List[Any]],
+        *,
+        run_id: UUID,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        model = (metadata or {}).get("ls_model_name") or (serialized or {}).get(
+            "name", "unknown"
+        )
+        self._models[run_id] = model
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        model = self._models.pop(run_id, "unknown")
+        span = _current_span.get()
+        if span is None:
+            return
+        usage: Dict[str, Any] = {}
+        for generations in response.generations:
+            for generation in generations:
+                if isinstance(generation, ChatGeneration):
+                    usage = getattr(generation.message, "usage_metadata", None) or usage
+        span.add_model_usage(model, usage)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._models.pop(run_id, None)
+
+
+_usage_handler: ContextVar[Optional[UsageCallbackHandler]] = ContextVar(
+    "chatbot_usage_handler", default=None
+)
+# Chains and models started while the var is set get the handler automatically
+register_configure_hook(_usage_handler, inheritable=True)
+_handler = UsageCallbackHandler()
+
+
+class JsonlSpanWriter:
+    """Appends finished spans to a JSONL file."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, span: Dict[str, Any]) -> None:
+        line = json.dumps(span, ensure_ascii=False)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+_jsonl_writer: Optional[JsonlSpanWriter] = None
+_exporters_started = False
+_exporters_lock = threading.Lock()
+
+
+def _start_exporters() -> None:
+    """Open the JSONL file and metrics endpoint configured in the environment, once."""
+    global _jsonl_writer, _exporters_started
+    if _exporters_started:
+        return
+    with _exporters_lock:
+        if _exporters_started:
+            return
+        if METRICS_JSONL_PATH:
+            _jsonl_writer = JsonlSpanWriter(METRICS_JSONL_PATH)
+        if METRICS_PORT:
+            start_metrics_server(METRICS_PORT)
+            logging.getLogger(__name__).info(
+                f"📈 Metrics at http://127.0.0.1:{METRICS_PORT}/metrics"
+            )
+        _exporters_started = True
+
+
+def _finish(span: NodeSpan) -> Dict[str, Any]:
+    record = span.close()
+    labels = {"graph": span.graph, "node": span.node}
+    NODE_DURATION.observe(record["wall_ms"], **labels)
+    if record["db_calls"]:
+        NODE_DB_TIME.observe(record["db_ms"], **labels)
+    if record["embedding_calls"]:
+        NODE_EMBEDDING_TIME.observe(record["embedding_ms"], **labels)
+    if record["error"]:
+        NODE_ERRORS.inc(**labels)
+    if _jsonl_writer is not None:
+        _jsonl_writer.write(record)
+    return record
+
+
+@contextmanager
+def node_span(graph: str, node: str) -> Iterator[NodeSpan]:
+    """Record everything done inside the block as one run of ``node``."""
+    _start_exporters()
+    span = NodeSpan(graph=graph, node=node, started_at=time.time())
+    span_token = _current_span.set(span)
+    handler_token = _usage_handler.set(_handler)
+    start = time.perf_counter()
+    try:
+        yield span
+    except BaseException as e:
+        span.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        span.wall_ms = (time.perf_counter() - start) * 1000
+        _usage_handler.reset(handler_token)
+        _current_span.reset(span_token)
+        _finish(span)
+
+
+def instrument_node(graph: str, node: str, action: Callable) -> Callable:
+    """
+    Wrap a graph node so each run is recorded as a span.
+
+    The wrapper keeps the node's signature, so LangGraph still injects
+    ``config`` and ``store`` into it.
+
+    Args:
+        graph: Graph name used as a metric label
+        node: Node name used as a metric label
+        action: The node function (sync or async, may be a partial)
+
+    Returns:
+        The instrumented node, or ``action`` itself when instrumentation is off
+    """
+    if not INSTRUMENTATION_ENABLED:
+        return action
+
+    if inspect.iscoroutinefunction(action):
+
+        async def instrumented(*args, **kwargs):
+            with node_span(graph, node):
+                return await action(*args, **kwargs)
+
+    else:
+
+        def instrumented(*args, **kwargs):
+            with node_span(graph, node):
+                return action(*args, **kwargs)
+
+    return functools.update_wrapper(instrumented, action)
+
+
+@contextmanager
+def db_timer() -> Iterator[None]:
+    """Count the block as database time in the current span (minus embedding time)."""
+    span = _current_span.get()
+    if span is None:
+        yield
+        return
+    embedding_before = span.embedding_ms
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        embedding_ms = span.embedding_ms - embedding_before
+        span.add(db_calls=1, db_ms=max(0.0, elapsed_ms - embedding_ms))
+
+
+def timed_db(method: Callable) -> Callable:
+    """Decorator: count each call of ``method`` as database time (see ``db_timer``)."""
+    if inspect.iscoroutinefunction(method):
+
+        @functools.wraps(method)
+        async def timed(*args, **kwargs):
+            with db_timer():
+                return await method(*args, **kwargs)
+
+    else:
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            with db_timer():
+                return method(*args, **kwargs)
+
+    return timed
+
+
+@contextmanager
+def embedding_timer(texts: int) -> Iterator[None]:
+    """Count the block as one embeddings request for ``texts`` texts."""
+    span = _current_span.get()
+    if span is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        span.add(embedding_calls=1, embedded_texts=texts, embedding_ms=elapsed_ms)
+        labels = {"graph": span.graph, "node": span.node}
+        EMBEDDING_CALLS.inc(**labels)
+        EMBEDDED_TEXTS.inc(texts, **labels)
+
+
+if __name__ == "__main__":
+    """Demo: instrument a node that calls a fake model, then print the metrics."""
+    from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+    from langchain_core.messages import AIMessage
+
+    configure_logging()
+    print("🧪 Testing Instrumentation...")
+
+    model = GenericFakeChatModel(
+        messages=iter(
+            [
+                AIMessage(
+                    content="Hello!",
+                    usage_metadata={
+                        "input_tokens": 12,
+                        "output_tokens": 3,
+                        "total_tokens": 15,
+                    },
+                )
+            ]
+        )
+    )
+
+    def demo_node(state):
+        with db_timer():
+            time.sleep(0.01)
+        return {"reply": model.invoke("Hi").content}
+
+    instrument_node("demo", "demo_node", demo_node)({})
+    print(REGISTRY.render_prometheus())
@@ -0,0 +1,290 @@
+"""
+Local intent gate that decides whether a turn is worth a memory search.
+
+Greetings, thanks and acknowledgements ("hi", "thanks!", "ok") never need
+past conversations, yet each search costs an embeddings request and a
+database query. ``IntentGate`` classifies the latest message locally: clear
+small talk skips retrieval, anything that refers back to earlier
+conversations is always retrieved, and the short, unclear rest goes to an
+optional tiny hashed-feature model (or is retrieved when none is loaded).
+
+Skipping a turn that needed context is the costly mistake, so the gate
+leans towards retrieval. Check its false negatives against the fixtures
+with:
+
+    uv run python -m src.chatbot.benchmarks.intent_gate_eval
+
+    CHATBOT_INTENT_GATE=0              always retrieve
+    CHATBOT_INTENT_MODEL=path.json     tiny model for unclear messages
+    CHATBOT_INTENT_SKIP_THRESHOLD=0.8  model probability needed to skip
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.chatbot.metrics import REGISTRY, Counter
+
+INTENT_GATE_ENABLED = os.getenv("CHATBOT_INTENT_GATE", "1") != "0"
+INTENT_MODEL_PATH = os.getenv("CHATBOT_INTENT_MODEL", ".cache/intent_model.json")
+SKIP_THRESHOLD = float(os.getenv("CHATBOT_INTENT_SKIP_THRESHOLD", 0.8))
+# Messages with more words than this are treated as real questions
+MAX_SMALL_TALK_WORDS = 6
+
+TURN_ROUTES = REGISTRY.register(
+    Counter(
+        "chatbot_turn_routes_total",
+        "Conversation turns by route and the reason it was chosen",
+        ("route", "reason"),
+    )
+)
+
+SMALL_TALK_PHRASES = {
+    "good morning", "good afternoon", "good evening", "good night",
+    "how are you", "how are you doing", "how's it going", "hows it going",
+    "what's up", "whats up", "sup", "nice to meet you", "see you",
+    "see ya", "talk later", "talk to you later", "have a good day",
+    "got it", "sounds good", "makes sense", "no worries", "no problem",
+    "never mind", "nevermind", "all good", "fair enough", "will do",
+    "thank you", "thank you so much", "thanks a lot", "much appreciated",
+}
+SMALL_TALK_WORDS = {
+    "hi", "hello", "hey", "heya", "hiya", "yo", "howdy", "there",
+    "thanks", "thank", "you", "thx", "ty", "tysm", "cheers", "appreciate",
+    "so", "much", "very", "a", "lot", "ok", "okay", "k", "kk",
+    "cool", "nice", "great", "awesome", "perfect", "amazing", "wonderful",
+    "excellent", "good", "fine", "sure", "yes", "yeah", "yep", "yup", "no",
+    "nope", "nah", "right", "alright", "lol", "haha", "hahaha", "lmao",
+    "wow", "oh", "ah", "hmm", "hm", "bye", "goodbye", "later", "cya",
+    "morning", "evening", "night", "gotcha", "noted", "understood", "and",
+    "man", "mate", "buddy", "friend", "bot",
+}
+# Phrases that point back at earlier conversations always get a search
+MEMORY_CUE = re.compile(
+    r"\b("
+    r"remember|recall|remind me|forgot|forget|"
+    r"last time|last week|yesterday|earlier|before|previous(ly)?|again|"
+    r"we (talked|discussed|spoke|chatted|covered)|"
+    r"you (said|told|mentioned|suggested|recommended)|"
+    r"i (said|told|mentioned|asked)|"
+    r"my (name|project|app|setup|stack|job|team|preference)"
+    r")\b"
+)
+WORD = re.compile(r"[a-z0-9']+")
+_PHRASES_LONGEST_FIRST = sorted(SMALL_TALK_PHRASES, key=len, reverse=True)
+
+
+@dataclass
+class IntentDecision:
+    """Whether to search memory for a message, and which rule decided it."""
+
+    retrieve: bool
+    reason: str
+    skip_probability: Optional[float] = None
+
+
+def normalize(text: str) -> str:
+    """Lowercase words joined by single spaces; punctuation and emoji dropped."""
+    return " ".join(WORD.findall(text.lower().replace("’", "'")))
+
+
+def is_small_talk(normalized: str) -> bool:
+    """True if only greetings, thanks and acknowledgements are left after
+    removing the small-talk phrases ("hey how are you", "got it thanks")."""
+    padded = f" {normalized} "
+    for phrase in _PHRASES_LONGEST_FIRST:
+        padded = padded.replace(f" {phrase} ", " ")
+    return all(word in SMALL_TALK_WORDS for word in padded.split())
+
+
+def _features(words: Sequence[str]) -> List[str]:
+    return list(words) + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def _bucket(feature: str, dim: int) -> int:
+    digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") % dim
+
+
+class IntentModel:
+    """
+    Logistic regression over hashed word and bigram features; scores P(skip).
+
+    There is no bias term, so words the model has never seen score 0.5 and
+    stay below the skip threshold.
+    """
+
+    def __init__(self, weights: List[float]):
+        self.weights = weights
+
+    @property
+    def dim(self) -> int:
+        return len(self.weights)
+
+    def _buckets(self, text: str) -> List[int]:
+        return [_bucket(f, self.dim) for f in _features(normalize(text).split())]
+
+    def skip_probability(self, text: str) -> float:
+        return self._score(self._buckets(text))
+
+    @classmethod
+    def train(
+        cls,
+        examples: Iterable[Tuple[str, bool]],
+        dim: int = 4096,
+        epochs: int = 30,
+        learning_rate: float = 0.5,
+        l2: float = 1e-4,
+        retrieve_weight: float = 4.0,
+    ) -> "IntentModel":
+        """
+        Fit on (text, retrieve) pairs with plain SGD; no dependencies needed.
+
+        Args:
+            examples: Messages labelled True when they need a memory search
+            dim: Number of hashed feature buckets
+            epochs: Passes over the examples
+            learning_rate: SGD step size
+            l2: Weight decay per step
+            retrieve_weight: Loss weight of messages that need a search, since
+                             skipping one costs more than a wasted search
+
+        Returns:
+            Trained model
+        """
+        model = cls([0.0] * dim)
+        data = [
+            (model._buckets(text), 0.0, retrieve_weight) if retrieve
+            else (model._buckets(text), 1.0, 1.0)
+            for text, retrieve in examples
+        ]
+        for _ in range(epochs):
+            for buckets, target, weight in data:
+                error = weight * (model._score(buckets) - target)
+                for i in buckets:
+                    model.weights[i] -= learning_rate * (error + l2 * model.weights[i])
+        return model
+
+    def _score(self, buckets: List[int]) -> float:
+        score = sum(self.weights[i] for i in buckets)
+        return 1 / (1 + math.exp(-max(-30.0, min(30.0, score))))
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"weights": [round(w, 5) for w in self.weights]}, f)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["IntentModel"]:
+        """Model saved at ``path``, or None if there is no readable file."""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            return cls(data["weights"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+class IntentGate:
+    """Heuristic classifier, with an optional tiny model for unclear messages."""
+
+    def __init__(
+        self,
+        model: Optional[IntentModel] = None,
+        skip_threshold: float = SKIP_THRESHOLD,
+        enabled: bool = True,
+    ):
+        """
+        Args:
+            model: Scores messages no rule is sure about (default: retrieve them)
+            skip_threshold: Model probability of small talk needed to skip
+            enabled: When False every message is retrieved
+        """
+        self.model = model
+        self.skip_threshold = skip_threshold
+        self.enabled = enabled
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def classify(self, text: str) -> IntentDecision:
+        """Decide whether ``text`` is worth a memory search."""
+        if not self.enabled:
+            return IntentDecision(True, "disabled")
+        normalized = normalize(text)
+        words = normalized.split()
+        if not words:
+            return IntentDecision(False, "no_words")
+        if MEMORY_CUE.search(normalized):
+            return IntentDecision(True, "memory_cue")
+        if len(words) > MAX_SMALL_TALK_WORDS:
+            return IntentDecision(True, "long")
+        if is_small_talk(normalized):
+            return IntentDecision(False, "small_talk")
+        if self.model is not None:
+            probability = self.model.skip_probability(text)
+            return IntentDecision(
+                probability < self.skip_threshold, "model", round(probability, 3)
+            )
+        return IntentDecision(True, "default")
+
+    def should_retrieve(self, text: str) -> bool:
+        """Classify ``text`` and count the decision."""
+        decision = self.classify(text)
+        route = "search_conversations" if decision.retrieve else "skip_retrieval"
+        record_route(route, decision.reason)
+        with self._lock:
+            self._counts[route] = self._counts.get(route, 0) + 1
+        return decision.retrieve
+
+    def stats(self) -> Dict[str, float]:
+        """Turns per route and the share that skipped retrieval."""
+        with self._lock:
+            stats: Dict[str, float] = dict(self._counts)
+        total = sum(stats.values())
+        stats["skip_ratio"] = stats.get("skip_retrieval", 0) / total if total else 0.0
+        return stats
+
+
+def record_route(route: str, reason: str) -> None:
+    """Count a turn's route in ``chatbot_turn_routes_total``."""
+    TURN_ROUTES.inc(route=route, reason=reason)
+
+
+_shared_gate: Optional[IntentGate] = None
+_shared_lock = threading.Lock()
+
+
+def get_intent_gate() -> IntentGate:
+    """Return the process-wide gate, loading CHATBOT_INTENT_MODEL if present."""
+    global _shared_gate
+    if _shared_gate is None:
+        with _shared_lock:
+            if _shared_gate is None:
+                _shared_gate = IntentGate(
+                    model=IntentModel.load(INTENT_MODEL_PATH),
+                    enabled=INTENT_GATE_ENABLED,
+                )
+    return _shared_gate
+
+
+if __name__ == "__main__":
+    """Demo: classify a few messages."""
+    print("🧪 Testing Intent Gate...")
+    gate = IntentGate()
+    for message in [
+        "hi!",
+        "thanks so much 🙏",
+        "ok",
+        "hey, how are you?",
+        "How do I add a checkpointer to my graph?",
+        "What did we discuss about Docker last time?",
+        "pgvector?",
+    ]:
+        decision = gate.classify(message)
+        action = "🔍 retrieve" if decision.retrieve else "⏭️ skip"
+        print(f"{action:<12} ({decision.reason:<10}) {message}")
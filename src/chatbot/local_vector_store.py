@@ -0,0 +1,494 @@
+"""
+Embedded vector store: memory-mapped NumPy matrix, no database needed.
+
+For single-node and edge deployments without the pgvector container. Files
+in the store directory are append-only:
+
+- ``vectors.bin``: unit-normalized embeddings, float32 or int8 rows
+- ``scales.bin``: one float32 scale per int8 row (int8 only)
+- ``summaries.jsonl`` + ``offsets.bin``: summary text and its byte offset
+
+Opening a store maps the matrix without reading it, so startup takes
+milliseconds at any size. Searches are a vectorized dot product with top-k
+selection. Past ``ivf_threshold`` rows an IVF index (k-means lists) limits
+each search to the closest lists. Enable it with ``CHATBOT_VECTOR_BACKEND=local``.
+
+Several processes (server workers) can share a store: appends take an
+exclusive lock on ``write.lock``, and searches remap the files when another
+process has added rows.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.chatbot.embedding_cache import CachedEmbeddings, openai_embeddings
+from src.chatbot.instrumentation import configure_logging, timed_db
+from src.chatbot.simple_vector_store import filter_search_results
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are serialized
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SCAN_CHUNK_ROWS = 65_536  # rows scored per matrix product, bounds temporary memory
+
+
+@dataclass(frozen=True)
+class LocalStoreSettings:
+    """Where a local store lives and how it is laid out."""
+
+    path: str = ".cache/vectors"
+    dtype: str = "float32"
+    ivf_threshold: int = 50_000
+
+    @classmethod
+    def from_env(cls) -> "LocalStoreSettings":
+        """Read settings from CHATBOT_LOCAL_* environment variables."""
+        return cls(
+            path=os.getenv("CHATBOT_LOCAL_STORE_PATH", cls.path),
+            dtype=os.getenv("CHATBOT_LOCAL_STORE_DTYPE", cls.dtype),
+            ivf_threshold=int(
+                os.getenv("CHATBOT_LOCAL_IVF_THRESHOLD", cls.ivf_threshold)
+            ),
+        )
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` highest scores, best first."""
+    if len(scores) <= k:
+        return np.argsort(-scores)
+    best = np.argpartition(-scores, k)[:k]
+    return best[np.argsort(-scores[best])]
+
+
+def kmeans(
+    vectors: np.ndarray, clusters: int, iterations: int = 10, seed: int = 0
+) -> np.ndarray:
+    """Spherical k-means centroids (unit vectors) for an IVF index."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        for cluster in range(clusters):
+            members = vectors[assignment == cluster]
+            if len(members):
+                centroids[cluster] = members.sum(axis=0)
+        centroids /= np.linalg.norm(centroids, axis=1, keepdims=True) + 1e-12
+    return centroids
+
+
+class LocalVectorStore:
+    """In-process vector store on memory-mapped files (same interface as SimpleVectorStore)."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        embeddings: Optional[Embeddings] = None,
+        dtype: Optional[str] = None,
+        ivf_threshold: Optional[int] = None,
+        nprobe: int = 16,
+    ):
+        """
+        Args:
+            path: Directory holding the store's files
+            embeddings: Embeddings for summaries and queries (default: cached OpenAI)
+            dtype: "float32", or "int8" for 4x smaller files (new stores only)
+            ivf_threshold: Row count at which the IVF index is built (0 disables it)
+            nprobe: IVF lists searched per query
+
+        Unset arguments come from CHATBOT_LOCAL_* (see LocalStoreSettings).
+        """
+        settings = LocalStoreSettings.from_env()
+        path = path or settings.path
+        dtype = dtype or settings.dtype
+        if ivf_threshold is None:
+            ivf_threshold = settings.ivf_threshold
+        self.path = path
+        self.embeddings = embeddings or CachedEmbeddings(openai_embeddings())
+        self.ivf_threshold = ivf_threshold
+        self.nprobe = nprobe
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+        self._meta_path = os.path.join(path, "meta.json")
+        self.dim: Optional[int] = None
+        self.dtype = dtype
+
+        self._matrix: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._ivf: Optional[dict] = None
+        self._ivf_mtime: Optional[int] = None
+        self._rebuilding = False
+        # Under the write lock: a half-written row may be another writer's append
+        with self._lock, self._file_lock("write.lock"):
+            self._load_meta()
+            self._remap()
+            self._discard_partial_rows()
+        self._load_ivf()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    @contextmanager
+    def _file_lock(self, name: str, blocking: bool = True) -> Iterator[bool]:
+        """
+        Exclusive lock on a file in the store directory, across processes.
+
+        Yields:
+            False if ``blocking`` is off and another process holds the lock
+        """
+        if fcntl is None:
+            yield True
+            return
+        with open(self._file(name), "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load_meta(self) -> None:
+        """Dimensions and dtype of an existing store (another process may have created it)."""
+        if self.dim is None and os.path.exists(self._meta_path):
+            with open(self._meta_path) as f:
+                meta = json.load(f)
+            self.dim = meta["dim"]
+            self.dtype = meta["dtype"]
+
+    @property
+    def count(self) -> int:
+        """Committed rows (a row is committed once its vector is written)."""
+        return 0 if self._matrix is None else len(self._matrix)
+
+    def _remap(self) -> None:
+        """Map the files read-only; nothing is copied into memory."""
+        if self.dim is None or not os.path.exists(self._file("vectors.bin")):
+            return
+        itemsize = 1 if self.dtype == "int8" else 4
+        rows = os.path.getsize(self._file("vectors.bin")) // (self.dim * itemsize)
+        rows = min(rows, os.path.getsize(self._file("offsets.bin")) // 8)
+        if rows == 0:
+            self._matrix = None
+            return
+        # Matrix last: concurrent searches size their reads by it
+        if self.dtype == "int8":
+            self._scales = np.memmap(
+                self._file("scales.bin"), dtype=np.float32, mode="r", shape=(rows,)
+            )
+        self._offsets = np.memmap(
+            self._file("offsets.bin"), dtype=np.int64, mode="r", shape=(rows,)
+        )
+        self._matrix = np.memmap(
+            self._file("vectors.bin"), dtype=self.dtype, mode="r", shape=(rows, self.dim)
+        )
+
+    def _refresh(self) -> None:
+        """Map rows and load an IVF index that other processes wrote since the last look."""
+        if self.dim is None:
+            with self._lock:
+                self._load_meta()
+            if self.dim is None:
+                return
+        itemsize = 1 if self.dtype == "int8" else 4
+        try:
+            rows = os.path.getsize(self._file("vectors.bin")) // (self.dim * itemsize)
+        except FileNotFoundError:
+            return
+        if rows > self.count:
+            with self._lock:
+                self._remap()
+        if self.ivf_threshold and self._ivf_file_mtime() != self._ivf_mtime:
+            self._load_ivf()
+
+    def _ivf_file_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self._file("ivf.npz")).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _discard_partial_rows(self) -> None:
+        """Cut files back to the committed rows after an interrupted append."""
+        if self.dim is None or not os.path.exists(self._file("vectors.bin")):
+            return
+        itemsize = 1 if self.dtype == "int8" else 4
+        sizes = {
+            "vectors.bin": self.count * self.dim * itemsize,
+            "offsets.bin": self.count * 8,
+            "scales.bin": self.count * 4,
+        }
+        for name, size in sizes.items():
+            path = self._file(name)
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                with open(path, "r+b") as f:
+                    f.truncate(size)
+
+    def close(self) -> None:
+        """Drop the memory maps."""
+        self._matrix = self._scales = self._offsets = None
+        self._ivf = None
+
+    async def aclose(self) -> None:
+        self.close()
+
+    @timed_db
+    def add_embeddings(
+        self,
+        summaries: List[str],
+        embeddings: List[List[float]],
+        thread_ids: Optional[List[Optional[str]]] = None,
+    ) -> None:
+        """Append pre-embedded summaries."""
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+        thread_ids = thread_ids or [None] * len(summaries)
+
+        # Appends of several processes must not interleave: offsets and
+        # vectors are matched by position
+        with self._lock, self._file_lock("write.lock"):
+            self._load_meta()
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                with open(self._meta_path, "w") as f:
+                    json.dump({"dim": self.dim, "dtype": self.dtype}, f)
+            # Start from other processes' rows, minus any a crashed writer left half-done
+            self._remap()
+            self._discard_partial_rows()
+
+            # Text first and vectors last: a crash leaves no half-written row visible
+            with open(self._file("summaries.jsonl"), "ab") as f:
+                offsets = []
+                for summary, thread_id in zip(summaries, thread_ids):
+                    offsets.append(f.tell())
+                    line = json.dumps({"summary": summary, "thread_id": thread_id})
+                    f.write(line.encode("utf-8") + b"\n")
+            with open(self._file("offsets.bin"), "ab") as f:
+                f.write(np.asarray(offsets, dtype=np.int64).tobytes())
+            if self.dtype == "int8":
+                scales = np.abs(vectors).max(axis=1) / 127 + 1e-12
+                quantized = np.round(vectors / scales[:, None]).astype(np.int8)
+                with open(self._file("scales.bin"), "ab") as f:
+                    f.write(scales.astype(np.float32).tobytes())
+                with open(self._file("vectors.bin"), "ab") as f:
+                    f.write(quantized.tobytes())
+            else:
+                with open(self._file("vectors.bin"), "ab") as f:
+                    f.write(vectors.tobytes())
+            self._remap()
+
+        if self._ivf_stale():
+            self._start_ivf_rebuild()
+
+    def _ivf_stale(self) -> bool:
+        """True once over 10% of the rows (past ivf_threshold) are not in the index."""
+        if not self.ivf_threshold or self.count < self.ivf_threshold:
+            return False
+        return self.count - (self._ivf["rows"] if self._ivf else 0) > 0.1 * self.count
+
+    def _start_ivf_rebuild(self) -> None:
+        """Rebuild the IVF index on a background thread, off the writer's path."""
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild_ivf, name="local-ivf", daemon=True).start()
+
+    def _rebuild_ivf(self) -> None:
+        try:
+            # Another process rebuilding already: pick up its index on a later search
+            with self._file_lock("ivf.lock", blocking=False) as locked:
+                if locked:
+                    self._load_ivf()
+                    # Rows appended during a build may call for another one
+                    while self._ivf_stale():
+                        self._build_ivf()
+        except Exception as e:
+            logger.error(f"❌ IVF rebuild error: {e}")
+        finally:
+            self._rebuilding = False
+
+    def store_conversation(self, summary: str, thread_id: Optional[str] = None) -> None:
+        """Store a conversation summary."""
+        self.store_conversations([summary], [thread_id])
+
+    def store_conversations(
+        self, summaries: List[str], thread_ids: Optional[List[Optional[str]]] = None
+    ) -> None:
+        """Store many summaries with one embeddings request."""
+        self.add_embeddings(summaries, self.embeddings.embed_documents(summaries), thread_ids)
+        logger.info(f"✅ Stored {len(summaries)} conversation summaries")
+
+    async def astore_conversation(
+        self, summary: str, thread_id: Optional[str] = None
+    ) -> None:
+        """Async variant of store_conversation."""
+        embeddings = await self.embeddings.aembed_documents([summary])
+        await asyncio.to_thread(self.add_embeddings, [summary], embeddings, [thread_id])
+        logger.info(f"✅ Stored conversation summary")
+
+    def _scores(self, query: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Cosine similarity of ``query`` to all rows, or to the given row indices."""
+        if rows is not None:
+            block = np.asarray(self._matrix[rows], dtype=np.float32)
+            scores = block @ query
+            return scores * self._scales[rows] if self.dtype == "int8" else scores
+
+        parts = []
+        for start in range(0, self.count, SCAN_CHUNK_ROWS):
+            block = np.asarray(self._matrix[start : start + SCAN_CHUNK_ROWS], dtype=np.float32)
+            scores = block @ query
+            if self.dtype == "int8":
+                scores *= self._scales[start : start + len(block)]
+            parts.append(scores)
+        return np.concatenate(parts)
+
+    def _candidates(self, query: np.ndarray) -> Optional[np.ndarray]:
+        """Rows in the closest IVF lists plus rows added after the index (None = scan all)."""
+        ivf = self._ivf
+        if ivf is None or ivf["rows"] > self.count:
+            return None
+        probes = top_k(ivf["centroids"] @ query, self.nprobe)
+        starts, order = ivf["list_starts"], ivf["order"]
+        rows = [order[starts[p] : starts[p + 1]] for p in probes]
+        rows.append(np.arange(ivf["rows"], self.count))
+        return np.concatenate(rows)
+
+    @timed_db
+    def search_by_vector(
+        self, embedding: List[float], limit: int = 2, exact: bool = False
+    ) -> List[Tuple[Document, float]]:
+        """(Document, cosine distance) pairs nearest to ``embedding``."""
+        self._refresh()
+        if self.count == 0:
+            return []
+        query = np.asarray(embedding, dtype=np.float32)
+        query /= np.linalg.norm(query) + 1e-12
+
+        rows = None if exact else self._candidates(query)
+        scores = self._scores(query, rows)
+        best = top_k(scores, limit)
+        indices = best if rows is None else rows[best]
+        return [
+            (self._document(int(index)), float(1 - score))
+            for index, score in zip(indices, scores[best])
+        ]
+
+    def _document(self, row: int) -> Document:
+        with open(self._file("summaries.jsonl"), "rb") as f:
+            f.seek(int(self._offsets[row]))
+            record = json.loads(f.readline())
+        metadata = {"thread_id": record["thread_id"]} if record["thread_id"] else {}
+        return Document(page_content=record["summary"], metadata=metadata)
+
+    def search_conversations(
+        self, query: str, limit: int = 2, distance_threshold: float = 0.8
+    ) -> List[str]:
+        """Search for similar conversations with distance filtering (lower distance = more similar)."""
+        try:
+            results = self.search_by_vector(self.embeddings.embed_query(query), limit)
+            return filter_search_results(results, distance_threshold)
+
+        except Exception as e:
+            logger.error(f"❌ Search error: {e}")
+            return []
+
+    async def asearch_conversations(
+        self, query: str, limit: int = 2, distance_threshold: float = 0.8
+    ) -> List[str]:
+        """Async variant of search_conversations."""
+        try:
+            embedding = await self.embeddings.aembed_query(query)
+            results = await asyncio.to_thread(self.search_by_vector, embedding, limit)
+            return filter_search_results(results, distance_threshold)
+
+        except Exception as e:
+            logger.error(f"❌ Search error: {e}")
+            return []
+
+    def build_ivf(self, lists: Optional[int] = None, sample: int = 100_000) -> None:
+        """
+        Cluster the current rows into ``lists`` (default sqrt(rows)) IVF lists.
+
+        Rows added later are scanned exactly until the next rebuild.
+        """
+        with self._file_lock("ivf.lock"):
+            self._build_ivf(lists, sample)
+
+    def _build_ivf(self, lists: Optional[int] = None, sample: int = 100_000) -> None:
+        matrix = self._matrix  # rows appended meanwhile wait for the next rebuild
+        rows = len(matrix)
+        lists = lists or max(1, int(np.sqrt(rows)))
+        rng = np.random.default_rng(0)
+        sample_rows = np.sort(rng.choice(rows, min(sample, rows), replace=False))
+        training = np.asarray(matrix[sample_rows], dtype=np.float32)
+        training /= np.linalg.norm(training, axis=1, keepdims=True) + 1e-12
+        centroids = kmeans(training, lists)
+
+        assignment = np.empty(rows, dtype=np.int32)
+        for start in range(0, rows, SCAN_CHUNK_ROWS):
+            block = np.asarray(matrix[start : start + SCAN_CHUNK_ROWS], dtype=np.float32)
+            assignment[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        order = np.argsort(assignment, kind="stable").astype(np.int64)
+        list_starts = np.searchsorted(assignment[order], np.arange(lists + 1))
+
+        np.savez(
+            self._file("ivf.tmp.npz"),
+            centroids=centroids,
+            order=order,
+            list_starts=list_starts,
+            rows=rows,
+        )
+        os.replace(self._file("ivf.tmp.npz"), self._file("ivf.npz"))
+        self._load_ivf()
+        logger.info(f"🧭 Built IVF index: {lists} lists over {rows} rows")
+
+    def _load_ivf(self) -> None:
+        mtime = self._ivf_file_mtime()
+        if mtime is None or not self.ivf_threshold:
+            self._ivf, self._ivf_mtime = None, mtime
+            return
+        with np.load(self._file("ivf.npz")) as data:
+            ivf = {name: data[name] for name in data.files}
+        ivf["rows"] = int(ivf["rows"])
+        self._ivf, self._ivf_mtime = ivf, mtime
+
+
+if __name__ == "__main__":
+    """Test the local vector store."""
+    import tempfile
+
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+
+    configure_logging()
+    print("🧪 Testing Local Vector Store...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LocalVectorStore(path=tmp, embeddings=DeterministicFakeEmbedding(size=64))
+        store.store_conversation(
+            summary="User asked about Python web frameworks and chose FastAPI.",
+            thread_id="demo-thread",
+        )
+        store.store_conversation(summary="Discussed Docker volumes and networking.")
+
+        reopened = LocalVectorStore(path=tmp, embeddings=store.embeddings)
+        print(f"✅ Reopened with {reopened.count} rows")
+        for result in reopened.search_conversations(
+            "User asked about Python web frameworks and chose FastAPI.", limit=2
+        ):
+            print(f"📄 {result}")
@@ -0,0 +1,454 @@
+"""
+Bounded in-process checkpointer for the "memory" backend.
+
+MemorySaver keeps every checkpoint of every thread for the life of the
+process, and every chat without a thread ID starts a new thread, so memory
+grows with total traffic. BoundedMemorySaver keeps the newest
+``max_checkpoints`` of each thread and evicts whole threads that have been
+idle longer than ``ttl_seconds`` or that fall off an LRU of ``max_threads``.
+Evicted threads can be spilled to disk and are loaded back when next used.
+
+    CHATBOT_MEMORY_MAX_THREADS=10000       threads kept in memory
+    CHATBOT_MEMORY_THREAD_TTL=3600         idle seconds before eviction (0 disables)
+    CHATBOT_MEMORY_SPILL_DIR=.cache/threads  spill evicted threads here
+                                             (unset: they are dropped)
+
+Each saver spills into its own ``<pid>-<uuid>`` subdirectory of the spill
+directory, removed by ``close()`` or at exit, so several savers or worker
+processes can share one CHATBOT_MEMORY_SPILL_DIR.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import shutil
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata
+from langgraph.checkpoint.memory import InMemorySaver
+
+from src.chatbot.metrics import REGISTRY, Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+MEMORY_MAX_THREADS = int(os.getenv("CHATBOT_MEMORY_MAX_THREADS", 10_000))
+MEMORY_THREAD_TTL_SECONDS = float(os.getenv("CHATBOT_MEMORY_THREAD_TTL", 3600))
+MEMORY_SPILL_DIR = os.getenv("CHATBOT_MEMORY_SPILL_DIR") or None
+MEMORY_MAX_CHECKPOINTS = 20
+
+SPILL_SUFFIX = ".thread"
+
+BlobKey = Tuple[str, str, str, Any]  # thread ID, checkpoint NS, channel, version
+
+_savers: "weakref.WeakSet[BoundedMemorySaver]" = weakref.WeakSet()
+
+
+def _collect(attribute: str) -> Dict[Tuple[str, ...], float]:
+    totals = {("live",): 0.0, ("spilled",): 0.0}
+    for saver in list(_savers):
+        stats = saver.stats()
+        totals[("live",)] += stats[f"live_{attribute}"]
+        totals[("spilled",)] += stats[f"spilled_{attribute}"]
+    return totals
+
+
+THREAD_EVICTIONS = REGISTRY.register(
+    Counter(
+        "chatbot_checkpoint_evictions_total",
+        "Threads evicted from the in-memory checkpointer, by reason",
+        ("reason",),
+    )
+)
+THREAD_RESTORES = REGISTRY.register(
+    Counter("chatbot_checkpoint_restores_total", "Spilled threads loaded back into memory")
+)
+REGISTRY.register(
+    Gauge(
+        "chatbot_checkpoint_threads",
+        "Threads held by the in-memory checkpointer",
+        ("state",),
+        lambda: _collect("threads"),
+    )
+)
+REGISTRY.register(
+    Gauge(
+        "chatbot_checkpoint_bytes",
+        "Serialized size of the threads held by the in-memory checkpointer",
+        ("state",),
+        lambda: _collect("bytes"),
+    )
+)
+
+
+@dataclass
+class _Thread:
+    """Bookkeeping for one live thread."""
+
+    last_access: float
+    bytes: int = 0
+    # (checkpoint NS, checkpoint ID) -> blobs its channel_versions point at
+    checkpoint_blobs: Dict[Tuple[str, str], List[BlobKey]] = field(default_factory=dict)
+    # Every blob of the thread -> number of kept checkpoints using it
+    blob_refs: Dict[BlobKey, int] = field(default_factory=dict)
+    write_keys: Set[Tuple[str, str, str]] = field(default_factory=set)
+
+
+def _typed_size(value: Tuple[str, bytes]) -> int:
+    return len(value[1])
+
+
+def _writes_size(writes: Optional[dict]) -> int:
+    return sum(_typed_size(write[2]) for write in (writes or {}).values())
+
+
+def _remove_spill_dir(path: str, pid: int) -> None:
+    # A forked child inherits the finalizer but not the directory
+    if os.getpid() == pid:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """InMemorySaver with per-thread checkpoint limits and TTL/LRU thread eviction."""
+
+    def __init__(
+        self,
+        *,
+        max_threads: int = MEMORY_MAX_THREADS,
+        ttl_seconds: Optional[float] = MEMORY_THREAD_TTL_SECONDS,
+        max_checkpoints: int = MEMORY_MAX_CHECKPOINTS,
+        spill_dir: Optional[str] = MEMORY_SPILL_DIR,
+        **kwargs: Any,
+    ):
+        """
+        Args:
+            max_threads: Threads kept in memory; the least recently used go first
+            ttl_seconds: Idle time after which a thread is evicted (None/0 disables)
+            max_checkpoints: Newest checkpoints kept per thread and namespace
+            spill_dir: Directory for evicted threads (None drops them); this
+                saver writes to a subdirectory of its own
+        """
+        super().__init__(**kwargs)
+        self.max_threads = max_threads
+        self.ttl_seconds = ttl_seconds or None
+        self.max_checkpoints = max_checkpoints
+        self.spill_dir: Optional[str] = None
+        self._threads: "OrderedDict[str, _Thread]" = OrderedDict()
+        self._spilled: Dict[str, int] = {}  # thread ID -> bytes on disk
+        self._lock = threading.RLock()
+        self._remove_spill_dir = None
+        if spill_dir:
+            # Spill files only extend this saver's memory, so no one else reads them
+            self.spill_dir = os.path.join(spill_dir, f"{os.getpid()}-{uuid.uuid4().hex}")
+            os.makedirs(self.spill_dir)
+            self._remove_spill_dir = weakref.finalize(
+                self, _remove_spill_dir, self.spill_dir, os.getpid()
+            )
+        _savers.add(self)
+
+    # Bookkeeping
+
+    def _spill_path(self, thread_id: str) -> str:
+        name = hashlib.sha1(thread_id.encode()).hexdigest()
+        return os.path.join(self.spill_dir, name + SPILL_SUFFIX)
+
+    def _touch(self, thread_id: str, create: bool = True) -> Optional[_Thread]:
+        """Mark a thread as used, loading it back from disk if it was spilled."""
+        thread = self._threads.get(thread_id)
+        if thread is None and thread_id in self._spilled:
+            thread = self._restore(thread_id)
+        if thread is None:
+            if not create:
+                return None
+            thread = self._threads[thread_id] = _Thread(last_access=time.monotonic())
+        self._threads.move_to_end(thread_id)
+        thread.last_access = time.monotonic()
+        return thread
+
+    def _add_checkpoint_refs(
+        self, thread_id: str, thread: _Thread, checkpoint_ns: str, checkpoint: Checkpoint
+    ) -> None:
+        key = (checkpoint_ns, checkpoint["id"])
+        blobs = [
+            (thread_id, checkpoint_ns, channel, version)
+            for channel, version in checkpoint["channel_versions"].items()
+        ]
+        for blob in blobs:
+            thread.blob_refs[blob] = thread.blob_refs.get(blob, 0) + 1
+        # Released after the new references, so blobs both share are kept
+        self._release_blobs(thread, thread.checkpoint_blobs.pop(key, []))
+        thread.checkpoint_blobs[key] = blobs
+
+    def _release_blobs(self, thread: _Thread, blobs: List[BlobKey]) -> None:
+        for blob in blobs:
+            refs = thread.blob_refs.get(blob, 0) - 1
+            if refs > 0:
+                thread.blob_refs[blob] = refs
+                continue
+            thread.blob_refs.pop(blob, None)
+            value = self.blobs.pop(blob, None)
+            if value is not None:
+                thread.bytes -= _typed_size(value)
+
+    def _drop_checkpoint(
+        self, thread_id: str, thread: _Thread, checkpoint_ns: str, checkpoint_id: str
+    ) -> None:
+        saved = self.storage[thread_id][checkpoint_ns].pop(checkpoint_id, None)
+        if saved is not None:
+            thread.bytes -= _typed_size(saved[0]) + _typed_size(saved[1])
+        write_key = (thread_id, checkpoint_ns, checkpoint_id)
+        thread.bytes -= _writes_size(self.writes.pop(write_key, None))
+        thread.write_keys.discard(write_key)
+        self._release_blobs(
+            thread, thread.checkpoint_blobs.pop((checkpoint_ns, checkpoint_id), [])
+        )
+
+    def _trim(self, thread_id: str, thread: _Thread, checkpoint_ns: str) -> None:
+        """Keep the newest ``max_checkpoints`` (IDs sort by creation time)."""
+        checkpoint_ids = sorted(self.storage[thread_id][checkpoint_ns])
+        for checkpoint_id in checkpoint_ids[: -self.max_checkpoints]:
+            self._drop_checkpoint(thread_id, thread, checkpoint_ns, checkpoint_id)
+
+    def _take(self, thread_id: str) -> Tuple[_Thread, dict]:
+        """Remove a thread from memory and return its bookkeeping and data."""
+        thread = self._threads.pop(thread_id)
+        write_keys = thread.write_keys | {
+            (thread_id, ns, checkpoint_id) for ns, checkpoint_id in thread.checkpoint_blobs
+        }
+        data = {
+            "storage": {
+                ns: dict(checkpoints)
+                for ns, checkpoints in self.storage.pop(thread_id, {}).items()
+            },
+            "writes": {
+                key: self.writes.pop(key) for key in write_keys if key in self.writes
+            },
+            "blobs": {
+                key: self.blobs.pop(key) for key in thread.blob_refs if key in self.blobs
+            },
+        }
+        return thread, data
+
+    def _evict(self, thread_id: str, reason: str) -> None:
+        thread, data = self._take(thread_id)
+        THREAD_EVICTIONS.inc(reason=reason)
+        if not self.spill_dir:
+            return
+        path = self._spill_path(thread_id)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        # Values are already serialized by the saver's serde; pickle only wraps them
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"thread": thread, **data}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self._spilled[thread_id] = thread.bytes
+
+    def _restore(self, thread_id: str) -> Optional[_Thread]:
+        path = self._spill_path(thread_id)
+        self._spilled.pop(thread_id, None)
+        try:
+            with open(path, "rb") as f:
+                spilled = pickle.load(f)
+            os.remove(path)
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            logger.warning(f"⚠️ Could not restore spilled thread {thread_id}: {e}")
+            return None
+        for ns, checkpoints in spilled["storage"].items():
+            self.storage[thread_id][ns].update(checkpoints)
+        for key, writes in spilled["writes"].items():
+            self.writes[key] = writes
+        self.blobs.update(spilled["blobs"])
+        thread = self._threads[thread_id] = spilled["thread"]
+        thread.last_access = time.monotonic()
+        THREAD_RESTORES.inc()
+        self._enforce_limits()
+        return thread
+
+    def _enforce_limits(self) -> None:
+        now = time.monotonic()
+        while self._threads:
+            thread_id, thread = next(iter(self._threads.items()))
+            if self.ttl_seconds and now - thread.last_access > self.ttl_seconds:
+                self._evict(thread_id, "ttl")
+            elif len(self._threads) > self.max_threads:
+                self._evict(thread_id, "lru")
+            else:
+                break
+
+    # BaseCheckpointSaver interface (the async methods delegate to these)
+
+    def get_tuple(self, config: RunnableConfig):
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            known = self._touch(thread_id, create=False) is not None
+            result = super().get_tuple(config)
+            if not known:
+                # The base class's defaultdicts add empty entries on lookup
+                self.storage.pop(thread_id, None)
+                self.writes.pop(
+                    (thread_id, config["configurable"].get("checkpoint_ns", ""),
+                     config["configurable"].get("checkpoint_id")),
+                    None,
+                )
+            return result
+
+    def list(self, config: Optional[RunnableConfig], **kwargs: Any) -> Iterator:
+        with self._lock:
+            if config:
+                self._touch(config["configurable"]["thread_id"], create=False)
+            # Materialized, so evictions on other threads can't change it mid-iteration
+            items = list(super().list(config, **kwargs))
+        yield from items
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._lock:
+            thread = self._touch(thread_id)
+            replaced = self.storage[thread_id][checkpoint_ns].get(checkpoint["id"])
+            replaced_blobs = {
+                key: self.blobs[key]
+                for key in (
+                    (thread_id, checkpoint_ns, channel, version)
+                    for channel, version in new_versions.items()
+                )
+                if key in self.blobs
+            }
+            result = super().put(config, checkpoint, metadata, new_versions)
+
+            saved = self.storage[thread_id][checkpoint_ns][checkpoint["id"]]
+            thread.bytes += _typed_size(saved[0]) + _typed_size(saved[1])
+            if replaced is not None:
+                thread.bytes -= _typed_size(replaced[0]) + _typed_size(replaced[1])
+            for channel, version in new_versions.items():
+                key = (thread_id, checkpoint_ns, channel, version)
+                thread.bytes += _typed_size(self.blobs[key])
+                if key in replaced_blobs:
+                    thread.bytes -= _typed_size(replaced_blobs[key])
+                thread.blob_refs.setdefault(key, 0)
+            self._add_checkpoint_refs(thread_id, thread, checkpoint_ns, checkpoint)
+
+            self._trim(thread_id, thread, checkpoint_ns)
+            self._enforce_limits()
+            return result
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Any,
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        key = (
+            thread_id,
+            config["configurable"].get("checkpoint_ns", ""),
+            config["configurable"]["checkpoint_id"],
+        )
+        with self._lock:
+            thread = self._touch(thread_id)
+            before = _writes_size(self.writes.get(key))
+            super().put_writes(config, writes, task_id, task_path)
+            thread.bytes += _writes_size(self.writes.get(key)) - before
+            thread.write_keys.add(key)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            if thread_id in self._threads:
+                self._take(thread_id)
+            else:
+                super().delete_thread(thread_id)
+            if self._spilled.pop(thread_id, None) is not None:
+                try:
+                    os.remove(self._spill_path(thread_id))
+                except OSError:
+                    pass
+
+    # Maintenance
+
+    def evict_idle(self) -> int:
+        """Evict threads past the TTL now instead of on the next write."""
+        with self._lock:
+            before = len(self._threads)
+            self._enforce_limits()
+            return before - len(self._threads)
+
+    def delete_spilled_before(self, cutoff: float) -> int:
+        """Delete spill files last written before ``cutoff`` (Unix time)."""
+        deleted = 0
+        with self._lock:
+            for thread_id in list(self._spilled):
+                path = self._spill_path(thread_id)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        deleted += 1
+                    else:
+                        continue
+                except OSError:
+                    pass
+                self._spilled.pop(thread_id, None)
+        return deleted
+
+    def close(self) -> None:
+        """Drop spilled threads and remove this saver's spill directory."""
+        with self._lock:
+            self._spilled.clear()
+            if self._remove_spill_dir is not None:
+                self._remove_spill_dir()
+            # Threads evicted from now on are dropped
+            self.spill_dir = None
+
+    def stats(self) -> Dict[str, float]:
+        """Live and spilled threads and their serialized bytes."""
+        with self._lock:
+            return {
+                "live_threads": len(self._threads),
+                "live_bytes": sum(thread.bytes for thread in self._threads.values()),
+                "spilled_threads": len(self._spilled),
+                "spilled_bytes": sum(self._spilled.values()),
+            }
+
+
+if __name__ == "__main__":
+    """Demo: 50 threads through a saver that keeps 10, spilling the rest."""
+    import tempfile
+    from langgraph.checkpoint.base import empty_checkpoint
+    from langgraph.checkpoint.base.id import uuid6
+    from src.chatbot.instrumentation import configure_logging
+
+    configure_logging()
+    print("🧪 Testing Bounded Memory Saver...")
+    with tempfile.TemporaryDirectory() as spill_dir:
+        saver = BoundedMemorySaver(max_threads=10, max_checkpoints=3, spill_dir=spill_dir)
+        for index in range(50):
+            version = None
+            for turn in range(5):
+                version = saver.get_next_version(version, None)
+                checkpoint = empty_checkpoint()
+                checkpoint["id"] = str(uuid6(clock_seq=index * 10 + turn))
+                checkpoint["channel_values"] = {"messages": [f"turn {turn}"] * 50}
+                checkpoint["channel_versions"] = {"messages": version}
+                config = {"configurable": {"thread_id": f"demo-{index}", "checkpoint_ns": ""}}
+                saver.put(config, checkpoint, {"step": turn}, {"messages": version})
+        print(f"✅ After 50 threads: {saver.stats()}")
+
+        restored = saver.get_tuple({"configurable": {"thread_id": "demo-0"}})
+        history = list(saver.list({"configurable": {"thread_id": "demo-0"}}))
+        print(
+            f"✅ Restored demo-0: {restored.checkpoint['channel_values']['messages'][0]!r}, "
+            f"{len(history)} checkpoints kept"
+        )
+        print(f"✅ Stats: {saver.stats()}")
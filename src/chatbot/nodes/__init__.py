@@ -2,6 +2,12 @@
 LangGraph nodes for the conversation chatbot.
 """
 
-from .respond import generate_response
+from .history import aupdate_history_summary, update_history_summary
+from .respond import agenerate_response, generate_response
 
-__all__ = ["generate_response"]
+__all__ = [
+    "agenerate_response",
+    "aupdate_history_summary",
+    "generate_response",
+    "update_history_summary",
+]
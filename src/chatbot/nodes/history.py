@@ -0,0 +1,292 @@
+"""
+History windowing node for the conversation chatbot.
+
+The response prompt only carries the most recent turns verbatim. Older turns
+are folded into a rolling summary kept in the conversation state, so prompt
+size stays flat no matter how long a thread gets. Folds run on a background
+worker and land in the state on the thread's next turn.
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from langchain_core.messages import BaseMessage, HumanMessage
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableConfig
+
+from src.chatbot.nodes.storage import filter_system_messages, format_conversation
+from src.chatbot.state import ConversationState
+from src.chatbot.tokens import count_message_tokens
+from src.llm import Priority, get_chain
+
+logger = logging.getLogger(__name__)
+
+# Token budget for the verbatim part of the history (the summary comes on top)
+HISTORY_TOKEN_BUDGET = int(os.getenv("CHATBOT_HISTORY_TOKEN_BUDGET", 2000))
+# Turns (user message + reply) to keep verbatim before folding into the summary
+HISTORY_MAX_TURNS = int(os.getenv("CHATBOT_HISTORY_MAX_TURNS", 6))
+# Fold at least this many turns per summary update, to batch the LLM calls
+SUMMARY_BATCH_TURNS = int(os.getenv("CHATBOT_HISTORY_SUMMARY_BATCH", 2))
+
+
+HISTORY_SUMMARY_PROMPT = """Update the running summary of a conversation with the new lines below.
+Keep names, facts, preferences, decisions and open questions. Drop small talk.
+Reply with the updated summary only.
+
+Current summary:
+{summary}
+
+New lines:
+{conversation_text}
+
+Updated summary:"""
+
+
+def turn_starts(messages: List[BaseMessage], start: int = 0) -> List[int]:
+    """Indices of the user messages that open each turn, from ``start`` on."""
+    return [
+        index
+        for index in range(start, len(messages))
+        if isinstance(messages[index], HumanMessage)
+    ]
+
+
+def window_start(
+    messages: List[BaseMessage],
+    start: int = 0,
+    token_budget: int = HISTORY_TOKEN_BUDGET,
+    max_turns: Optional[int] = None,
+) -> int:
+    """
+    Index of the oldest message to keep verbatim.
+
+    Walks back whole turns from the end while they fit in ``token_budget``
+    (and ``max_turns``). The latest turn is always kept.
+
+    Args:
+        messages: Full message history
+        start: Messages before this index are already summarized
+        token_budget: Token budget for the kept messages
+        max_turns: Optional cap on the number of kept turns
+
+    Returns:
+        Index into ``messages`` where the verbatim window begins
+    """
+    starts = turn_starts(messages, start)
+    if not starts:
+        return start
+
+    cut = len(messages)
+    used = 0
+    for turns, turn_start in enumerate(reversed(starts)):
+        if max_turns is not None and turns >= max_turns:
+            break
+        used += count_message_tokens(filter_system_messages(messages[turn_start:cut]))
+        if turns > 0 and used > token_budget:
+            break
+        cut = turn_start
+    return cut
+
+
+def select_history(state: ConversationState) -> List[BaseMessage]:
+    """
+    Messages not yet in the rolling summary.
+
+    The window starts at the first unfolded message, so a turn is always
+    either in the summary or sent verbatim. Folding keeps it near the token
+    budget, up to SUMMARY_BATCH_TURNS turns (plus one while a fold runs) over.
+    """
+    start = state.get("summarized_message_count", 0)
+    return filter_system_messages(state["messages"][start:])
+
+
+def messages_to_fold(state: ConversationState) -> Optional[Tuple[List[BaseMessage], int]]:
+    """
+    Turns outside the token budget (or HISTORY_MAX_TURNS) not yet summarized.
+
+    Returns:
+        (messages to fold, new summarized_message_count), or None if fewer than
+        SUMMARY_BATCH_TURNS turns are waiting
+    """
+    messages = state["messages"]
+    start = state.get("summarized_message_count", 0)
+    cut = window_start(messages, start, HISTORY_TOKEN_BUDGET, HISTORY_MAX_TURNS)
+    if len(turn_starts(messages[:cut], start)) < SUMMARY_BATCH_TURNS:
+        return None
+    return filter_system_messages(messages[start:cut]), cut
+
+
+def get_history_summary_chain():
+    """Shared HISTORY_SUMMARY_PROMPT | gpt-4o-mini chain."""
+    return get_chain(
+        "summarize_history",
+        lambda: ChatPromptTemplate.from_template(HISTORY_SUMMARY_PROMPT),
+        "openai:gpt-4o-mini",
+        priority=Priority.BACKGROUND,
+        temperature=0.2,
+    )
+
+
+def fold_history(summary: str, folded: List[BaseMessage], cut: int) -> ConversationState:
+    """
+    Fold ``folded`` into ``summary`` with the summary model.
+
+    Returns:
+        Updated history_summary and summarized_message_count (empty on failure)
+    """
+    inputs = {
+        "summary": summary or "(none yet)",
+        "conversation_text": format_conversation(folded),
+    }
+    try:
+        response = get_history_summary_chain().invoke(inputs)
+    except Exception as e:
+        logger.error(f"❌ History summary error: {e}")
+        return {}
+
+    logger.info(f"🗜️ Folded {len(folded)} messages into the history summary")
+    return {"history_summary": response.content.strip(), "summarized_message_count": cut}
+
+
+class HistoryFolder:
+    """Runs history summary updates on a background worker, one per thread at a time."""
+
+    def __init__(self, workers: int = 2, max_threads: int = 10_000):
+        """
+        Args:
+            workers: Concurrent summary model calls
+            max_threads: Finished folds kept for threads that haven't come back
+        """
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="history-summary"
+        )
+        # thread_id -> (summarized_message_count the fold started from, its future)
+        self._pending: "OrderedDict[str, Tuple[int, Future]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_threads = max_threads
+
+    def step(self, thread_id: str, state: ConversationState) -> ConversationState:
+        """
+        Apply the thread's finished fold, and start the next one if turns are waiting.
+
+        Returns:
+            State update from the finished fold (empty if none is ready)
+        """
+        with self._lock:
+            pending = self._pending.get(thread_id)
+            if pending is not None and not pending[1].done():
+                return {}
+            self._pending.pop(thread_id, None)
+
+        update: ConversationState = {}
+        start = state.get("summarized_message_count", 0)
+        if pending is not None and pending[0] == start:
+            update = pending[1].result()
+            state = {**state, **update}
+
+        fold = messages_to_fold(state)
+        if fold is not None:
+            folded, cut = fold
+            future = self._executor.submit(
+                fold_history, state.get("history_summary", ""), folded, cut
+            )
+            with self._lock:
+                self._pending[thread_id] = (state.get("summarized_message_count", 0), future)
+                while len(self._pending) > self.max_threads:
+                    self._pending.popitem(last=False)
+        return update
+
+    def close(self) -> None:
+        """Drop queued folds; unfinished threads are folded again on their next turn."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_shared_folder: Optional[HistoryFolder] = None
+_shared_lock = threading.Lock()
+
+
+def get_history_folder() -> HistoryFolder:
+    """Return the process-wide history folder, creating it on first use."""
+    global _shared_folder
+    if _shared_folder is None:
+        with _shared_lock:
+            if _shared_folder is None:
+                _shared_folder = HistoryFolder()
+                atexit.register(_shared_folder.close)
+    return _shared_folder
+
+
+def _thread_id(config: Optional[RunnableConfig]) -> Optional[str]:
+    return (config or {}).get("configurable", {}).get("thread_id")
+
+
+def update_history_summary(
+    state: ConversationState, config: Optional[RunnableConfig] = None
+) -> ConversationState:
+    """
+    Fold turns that left the verbatim window into the rolling summary.
+
+    The summary model runs in the background, so neither the reply nor the
+    end of the turn waits for it: this node applies the fold started on an
+    earlier turn and starts the next. Without a thread ID the fold runs inline.
+
+    Args:
+        state: Current conversation state
+        config: Run config carrying the thread_id
+
+    Returns:
+        Updated history_summary and summarized_message_count (empty if nothing was folded)
+    """
+    thread_id = _thread_id(config)
+    if thread_id is None:
+        fold = messages_to_fold(state)
+        if fold is None:
+            return {}
+        return fold_history(state.get("history_summary", ""), *fold)
+    return get_history_folder().step(thread_id, state)
+
+
+async def aupdate_history_summary(
+    state: ConversationState, config: Optional[RunnableConfig] = None
+) -> ConversationState:
+    """Async variant of update_history_summary (it never blocks on the model)."""
+    thread_id = _thread_id(config)
+    if thread_id is None:
+        fold = messages_to_fold(state)
+        if fold is None:
+            return {}
+        return await asyncio.to_thread(fold_history, state.get("history_summary", ""), *fold)
+    return get_history_folder().step(thread_id, state)
+
+
+if __name__ == "__main__":
+    """Demo: prompt tokens stay flat as a thread grows."""
+    from langchain_core.messages import AIMessage
+
+    from src.chatbot.benchmarks.fakes import FakeChatModel
+    from src.chatbot.instrumentation import configure_logging
+    from src.llm import override_chat_model
+
+    configure_logging()
+    print("🧪 Testing History Windowing...")
+    override_chat_model(
+        "openai:gpt-4o-mini", FakeChatModel(response="Summary of earlier turns.", latency_ms=0)
+    )
+
+    state = {"messages": [], "history_summary": "", "summarized_message_count": 0}
+    for turn in range(40):
+        state["messages"].append(HumanMessage(content=f"Question {turn}: how do I scale LangGraph? " * 5))
+        state["messages"].append(AIMessage(content=f"Answer {turn}: add workers and a pooled database. " * 10))
+        state.update(update_history_summary(state))
+        if turn % 5 == 4:
+            window = select_history(state)
+            print(
+                f"✅ Turn {turn + 1:>2}: {len(state['messages'])} messages, "
+                f"{len(window)} verbatim, {count_message_tokens(window)} prompt tokens"
+            )
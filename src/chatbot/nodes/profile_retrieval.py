@@ -3,15 +3,28 @@ Profile retrieval node using LangGraph Store.
 Retrieves user conversation profile from LangGraph's native memory store.
 """
 
-from typing import List
+import logging
+from typing import List, Optional
 from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.store.base import BaseStore
 from langgraph.store.memory import InMemoryStore
 
+from src.chatbot.context_packing import Memory, log_packing, pack_context
+from src.chatbot.instrumentation import configure_logging, db_timer
+from src.chatbot.profile_store import profile_namespace
 from src.chatbot.state import ConversationState
 
+logger = logging.getLogger(__name__)
 
-def search_user_profile(state: ConversationState, *, store) -> ConversationState:
-    """Retrieve user profile from LangGraph Store."""
+
+def search_user_profile(
+    state: ConversationState,
+    config: Optional[RunnableConfig] = None,
+    *,
+    store: BaseStore,
+) -> ConversationState:
+    """Retrieve the run's user profile from LangGraph Store."""
     try:
         messages = state["messages"]
         if not messages:
@@ -25,36 +38,42 @@ def search_user_profile(state: ConversationState, *, store) -> ConversationState
             return {"retrieved_conversations": []}
 
         search_query = str(human_messages[-1].content).strip()
-        print(f"🔍 Searching profile: '{search_query[:50]}...'")
+        logger.info(f"🔍 Searching profile: '{search_query[:50]}...'")
 
         # Search user profile in LangGraph Store
-        namespace = ("user", "demo_user")  # Simple demo namespace
-        results = store.search(namespace, query=search_query, limit=3)
+        with db_timer():
+            results = store.search(
+                profile_namespace(config), query=search_query, limit=3
+            )
 
         if results:
             # Extract profile info as conversation context - prioritize facts
             profile_items = []
             for item in results:
-                # Put facts first (these have the specific details)
-                if "facts" in item.value and item.value["facts"]:
-                    profile_items.extend(item.value["facts"])
+                score = item.score or 0.0
+                # Facts have the specific details, so they outrank topic lines
+                for fact in item.value.get("facts") or []:
+                    profile_items.append(Memory(fact, score + 1.0))
 
                 # Add interests/topics with more detail
-                if "topics" in item.value and item.value["topics"]:
+                if item.value.get("topics"):
                     profile_items.append(
-                        f"User is interested in: {', '.join(item.value['topics'])}"
+                        Memory(
+                            f"User is interested in: {', '.join(item.value['topics'])}",
+                            score,
+                        )
                     )
 
-            print(f"✅ Found profile info: {len(profile_items)} items")
-            return {
-                "retrieved_conversations": profile_items[:4]
-            }  # More items, facts first
+            logger.info(f"✅ Found profile info: {len(profile_items)} items")
+            packed, packing = pack_context(profile_items)
+            log_packing(packing, "profile items")
+            return {"retrieved_conversations": packed}
         else:
-            print("ℹ️ No profile found")
+            logger.info("ℹ️ No profile found")
             return {"retrieved_conversations": []}
 
     except Exception as e:
-        print(f"❌ Profile retrieval error: {e}")
+        logger.error(f"❌ Profile retrieval error: {e}")
         return {"retrieved_conversations": []}
 
 
@@ -62,6 +81,7 @@ if __name__ == "__main__":
     """Demo the profile retrieval node."""
     from dotenv import load_dotenv
 
+    configure_logging()
     load_dotenv()
 
     print("🧪 Testing Profile Retrieval Node...")
@@ -70,7 +90,7 @@ if __name__ == "__main__":
     store = InMemoryStore()
 
     # Add sample profile data
-    namespace = ("user", "demo_user")
+    namespace = profile_namespace(None)
     store.put(
         namespace,
         "interests",
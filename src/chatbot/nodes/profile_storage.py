@@ -3,15 +3,25 @@ Profile storage node using LangGraph Store.
 Updates user conversation profile in LangGraph's native memory store.
 """
 
-from typing import List, Optional
+import logging
+from typing import List, Optional, Tuple
 from langchain_core.messages import SystemMessage, BaseMessage
-from langchain.chat_models import init_chat_model
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableConfig
+from langgraph.store.base import BaseStore
 from langgraph.store.memory import InMemoryStore
-from dotenv import load_dotenv
-
+from src.chatbot.nodes.routing import should_store_conversation
+from src.chatbot.profile_scheduler import ProfileUpdateScheduler
+from src.chatbot.profile_store import (
+    VERSION_FIELD,
+    profile_namespace,
+    read_profile,
+    update_profile,
+)
 from src.chatbot.state import ConversationState
+from src.llm import Priority, get_chain
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
 PROFILE_UPDATE_PROMPT = """Update the user profile based on this conversation.
 
@@ -29,6 +39,28 @@ Return a JSON profile with these fields:
 Focus on concrete facts and details. Include specific names, relationships, and personal details that help remember who this person is."""
 
 
+def conversation_text(messages: List[BaseMessage]) -> str:
+    """Render non-system messages as a Human/AI transcript."""
+    text = ""
+    for msg in messages:
+        if hasattr(msg, "type") and msg.type != "system":
+            role = "Human" if msg.type == "human" else "AI"
+            text += f"{role}: {msg.content}\n"
+    return text
+
+
+def load_profile(store: BaseStore, namespace: Tuple[str, ...]) -> dict:
+    """Current user profile (keyed read), or an empty one."""
+    profile, _ = read_profile(store, namespace)
+    profile.pop(VERSION_FIELD, None)
+    return profile
+
+
+def save_profile(store: BaseStore, namespace: Tuple[str, ...], profile: dict) -> dict:
+    """Merge ``profile`` into the stored one with compare-and-swap retries."""
+    return update_profile(store, namespace, profile)
+
+
 def extract_profile_info(
     messages: List[BaseMessage], current_profile: dict
 ) -> Optional[dict]:
@@ -36,19 +68,20 @@ def extract_profile_info(
     if len(messages) < 2:
         return None
 
-    # Convert conversation to text
-    conversation_text = ""
-    for msg in messages:
-        if hasattr(msg, "type") and msg.type != "system":
-            role = "Human" if msg.type == "human" else "AI"
-            conversation_text += f"{role}: {msg.content}\n"
-
     try:
-        llm = init_chat_model("openai:gpt-4o-mini", temperature=0.1)
-        prompt = PROFILE_UPDATE_PROMPT.format(
-            current_profile=current_profile, conversation_text=conversation_text
+        chain = get_chain(
+            "extract_profile_info",
+            lambda: ChatPromptTemplate.from_template(PROFILE_UPDATE_PROMPT),
+            "openai:gpt-4o-mini",
+            priority=Priority.BACKGROUND,
+            temperature=0.1,
+        )
+        response = chain.invoke(
+            {
+                "current_profile": current_profile,
+                "conversation_text": conversation_text(messages),
+            }
         )
-        response = llm.invoke(prompt)
 
         # Simple profile parsing (could use structured output in real app)
         content = response.content.strip()
@@ -63,12 +96,24 @@ def extract_profile_info(
 
         return None
     except Exception as e:
-        print(f"❌ Profile extraction error: {e}")
+        logger.error(f"❌ Profile extraction error: {e}")
         return None
 
 
-def update_user_profile(state: ConversationState, *, store) -> ConversationState:
-    """Update user profile in LangGraph Store."""
+def update_user_profile(
+    state: ConversationState,
+    config: Optional[RunnableConfig] = None,
+    *,
+    store: BaseStore,
+    scheduler: Optional[ProfileUpdateScheduler] = None,
+) -> ConversationState:
+    """
+    Update user profile in LangGraph Store.
+
+    With a scheduler, only messages past the thread's watermark are sent, in
+    batches on a background worker; quitting flushes the rest. Without one,
+    the whole conversation is re-extracted inline.
+    """
     try:
         messages = state["messages"]
 
@@ -79,36 +124,54 @@ def update_user_profile(state: ConversationState, *, store) -> ConversationState
             if not (hasattr(msg, "type") and msg.type == "system")
         ]
 
-        if len(filtered_messages) >= 2:
-            print("📝 Updating user profile...")
+        namespace = profile_namespace(config)
 
-            # Get current profile
-            namespace = ("user", "demo_user")
-            current_items = store.search(namespace)
-            current_profile = current_items[0].value if current_items else {}
+        if len(filtered_messages) < 2:
+            msg = "ℹ️ Conversation too short to update profile."
+        elif scheduler is not None:
+            thread_id = (config or {}).get("configurable", {}).get("thread_id", "default")
+            if should_store_conversation(state) == "store_conversation":
+                updated_profile = scheduler.flush(
+                    thread_id, filtered_messages, store, namespace
+                )
+                msg = (
+                    "✅ Profile updated!"
+                    if updated_profile
+                    else "ℹ️ No profile updates needed."
+                )
+            else:
+                scheduler.observe(thread_id, filtered_messages, store, namespace)
+                msg = "🕒 Profile update scheduled."
+        else:
+            logger.info("📝 Updating user profile...")
 
             # Extract new profile info
-            updated_profile = extract_profile_info(filtered_messages, current_profile)
+            updated_profile = extract_profile_info(
+                filtered_messages, load_profile(store, namespace)
+            )
 
             if updated_profile:
                 # Update profile in store
-                store.put(namespace, "profile", updated_profile)
+                save_profile(store, namespace, updated_profile)
                 msg = "✅ Profile updated!"
             else:
                 msg = "ℹ️ No profile updates needed."
-        else:
-            msg = "ℹ️ Conversation too short to update profile."
 
         return {"messages": [SystemMessage(content=msg)]}
 
     except Exception as e:
-        print(f"❌ Profile storage error: {e}")
+        logger.error(f"❌ Profile storage error: {e}")
         return {"messages": [SystemMessage(content="❌ Could not update profile.")]}
 
 
 if __name__ == "__main__":
     """Demo the profile storage node."""
+    from dotenv import load_dotenv
     from langchain_core.messages import HumanMessage, AIMessage
+    from src.chatbot.instrumentation import configure_logging
+
+    configure_logging()
+    load_dotenv()
 
     print("🧪 Testing Profile Storage Node...")
 
@@ -130,7 +193,5 @@ if __name__ == "__main__":
     print(f"✅ Storage result: {result['messages'][-1].content}")
 
     # Check what was stored
-    namespace = ("user", "demo_user")
-    stored_items = store.search(namespace)
-    if stored_items:
-        print(f"📋 Stored profile: {stored_items[0].value}")
+    stored_profile, version = read_profile(store, profile_namespace(None))
+    print(f"📋 Stored profile (version {version}): {stored_profile}")
@@ -3,10 +3,11 @@ Response generation node for the conversation chatbot.
 """
 
 from langchain_core.prompts import ChatPromptTemplate
-from langchain.chat_models import init_chat_model
 from typing import List
 
+from src.chatbot.nodes.history import select_history
 from src.chatbot.state import ConversationState
+from src.llm import get_chain
 
 
 SYSTEM_TEMPLATE = """You are a helpful and friendly AI assistant. You can:
@@ -17,55 +18,90 @@ SYSTEM_TEMPLATE = """You are a helpful and friendly AI assistant. You can:
 
 Keep your responses conversational and helpful.
 
+Summary of the earlier conversation (there may not be any):
+{history_summary}
+
 Relevant information (there may not be any):
 {conversations}"""
 
 
-def generate_response(state: ConversationState) -> ConversationState:
-    """
-    Generate AI response based on conversation history.
-
-    Args:
-        state: Current conversation state with message history
-
-    Returns:
-        Updated state with AI response added
-    """
-    # Initialize the LLM with streaming enabled
-    llm = init_chat_model("openai:gpt-4o", temperature=0.7, streaming=True)
-
-    # Create the system prompt
-    system_prompt = ChatPromptTemplate.from_messages(
+def build_response_prompt() -> ChatPromptTemplate:
+    """Create the system prompt followed by the conversation history."""
+    return ChatPromptTemplate.from_messages(
         [
             ("system", SYSTEM_TEMPLATE),
             (
                 "placeholder",
                 "{messages}",
-            ),  # This expands to the full conversation history
+            ),  # This expands to the recent, token-budgeted history
         ]
     )
 
+
+def get_response_chain():
+    """Shared prompt | LLM chain with streaming enabled (built once per process)."""
+    return get_chain(
+        "respond",
+        build_response_prompt,
+        "openai:gpt-4o",
+        temperature=0.7,
+        streaming=True,
+    )
+
+
+def build_response_inputs(state: ConversationState) -> dict:
+    """Prompt variables for the response chain."""
     # Prepare conversations list
     retrieved_conversations = state.get("retrieved_conversations", [])
     conversations = "\n".join(f"- {conv}" for conv in retrieved_conversations)
+    return {
+        "messages": select_history(state),
+        "history_summary": state.get("history_summary", ""),
+        "conversations": conversations,
+    }
+
+
+def generate_response(state: ConversationState) -> ConversationState:
+    """
+    Generate AI response based on conversation history.
+
+    Args:
+        state: Current conversation state with message history
 
-    # Create the chain
-    chain = system_prompt | llm
+    Returns:
+        Updated state with AI response added
+    """
+    chain = get_response_chain()
 
     # Generate response
-    response = chain.invoke(
-        {"messages": state["messages"], "conversations": conversations}
-    )
+    response = chain.invoke(build_response_inputs(state))
 
     # Return updated state
     return {"messages": [response]}
 
 
+async def agenerate_response(state: ConversationState) -> ConversationState:
+    """
+    Async variant of generate_response using the model's async HTTP client.
+
+    Args:
+        state: Current conversation state with message history
+
+    Returns:
+        Updated state with AI response added
+    """
+    chain = get_response_chain()
+    response = await chain.ainvoke(build_response_inputs(state))
+    return {"messages": [response]}
+
+
 if __name__ == "__main__":
     """Demo the response generation node."""
     from dotenv import load_dotenv
     from langchain_core.messages import HumanMessage, AIMessage
+    from src.chatbot.instrumentation import configure_logging
 
+    configure_logging()
     load_dotenv()
 
     print("🧪 Testing Response Generation Node...")
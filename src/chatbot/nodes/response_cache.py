@@ -0,0 +1,110 @@
+"""
+Semantic response cache nodes for the conversation chatbot.
+
+On the first turn of a thread, a near-duplicate question with the same
+retrieved context is answered from the cache. The cached answer is replayed
+through a fake chat model so it streams chunk by chunk like a real reply.
+"""
+
+import logging
+from typing import Optional
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from src.chatbot.nodes.storage import filter_system_messages
+from src.chatbot.response_cache import SemanticResponseCache
+from src.chatbot.state import ConversationState
+
+logger = logging.getLogger(__name__)
+
+
+def is_first_turn(state: ConversationState, replied: bool = False) -> bool:
+    """True while the thread holds only the opening question (and its reply)."""
+    return len(filter_system_messages(state["messages"])) == (2 if replied else 1)
+
+
+def _question(state: ConversationState) -> str:
+    return str(state["messages"][-1].content)
+
+
+def check_response_cache(
+    state: ConversationState, *, response_cache: SemanticResponseCache
+) -> ConversationState:
+    """Look up a cached answer for a first-turn question."""
+    if not is_first_turn(state):
+        return {"cached_answer": ""}
+    answer = response_cache.lookup(
+        _question(state), state.get("retrieved_conversations", [])
+    )
+    if answer:
+        logger.info("⚡ Answering from the response cache")
+    return {"cached_answer": answer or ""}
+
+
+async def acheck_response_cache(
+    state: ConversationState, *, response_cache: SemanticResponseCache
+) -> ConversationState:
+    """Async variant of check_response_cache."""
+    if not is_first_turn(state):
+        return {"cached_answer": ""}
+    answer = await response_cache.alookup(
+        _question(state), state.get("retrieved_conversations", [])
+    )
+    if answer:
+        logger.info("⚡ Answering from the response cache")
+    return {"cached_answer": answer or ""}
+
+
+def route_response_cache(state: ConversationState) -> str:
+    """Serve the cached answer on a hit, otherwise generate a new one."""
+    return "cached_response" if state.get("cached_answer") else "generate_response"
+
+
+def _replay_model(answer: str) -> GenericFakeChatModel:
+    # Streams the answer word by word, so stream_mode="messages" sees chunks
+    return GenericFakeChatModel(messages=iter([AIMessage(content=answer)]))
+
+
+def cached_response(state: ConversationState) -> ConversationState:
+    """Reply with the cached answer."""
+    response = _replay_model(state["cached_answer"]).invoke(state["messages"])
+    return {"messages": [response]}
+
+
+async def acached_response(state: ConversationState) -> ConversationState:
+    """Async variant of cached_response."""
+    response = await _replay_model(state["cached_answer"]).ainvoke(state["messages"])
+    return {"messages": [response]}
+
+
+def _answer_to_store(state: ConversationState) -> Optional[tuple]:
+    """(question, context, answer) for a freshly generated first-turn reply."""
+    if not is_first_turn(state, replied=True):
+        return None
+    messages = filter_system_messages(state["messages"])
+    return (
+        str(messages[0].content),
+        state.get("retrieved_conversations", []),
+        str(messages[-1].content),
+    )
+
+
+def update_response_cache(
+    state: ConversationState, *, response_cache: SemanticResponseCache
+) -> ConversationState:
+    """Remember the generated first-turn answer."""
+    entry = _answer_to_store(state)
+    if entry:
+        response_cache.store(*entry)
+    return {}
+
+
+async def aupdate_response_cache(
+    state: ConversationState, *, response_cache: SemanticResponseCache
+) -> ConversationState:
+    """Async variant of update_response_cache."""
+    entry = _answer_to_store(state)
+    if entry:
+        await response_cache.astore(*entry)
+    return {}
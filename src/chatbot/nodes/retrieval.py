@@ -3,12 +3,43 @@ Retrieval node for LangGraph that searches past conversations for context.
 Enhances responses by finding relevant historical conversations.
 """
 
-from typing import List
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import List, Optional
 from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
 
-from src.chatbot.simple_vector_store import SimpleVectorStore
+from src.chatbot.context_packing import log_packing, pack_context, ranked
+from src.chatbot.metrics import REGISTRY, RETRIEVAL_LATENCY, Counter
+from src.chatbot.simple_vector_store import SimpleVectorStore, get_vector_store
 from src.chatbot.state import ConversationState
 
+logger = logging.getLogger(__name__)
+
+# Per-turn retrieval budget, off by default (0): a turn that misses it is
+# answered without past context. Override per invocation with
+# config={"configurable": {"retrieval_deadline_ms": 150}}
+DEFAULT_RETRIEVAL_DEADLINE_MS = float(os.getenv("CHATBOT_RETRIEVAL_DEADLINE_MS", 0))
+RETRIEVAL_WORKERS = int(os.getenv("CHATBOT_RETRIEVAL_WORKERS", 8))
+# Summaries fetched per search; the packer keeps what fits the token budget
+RETRIEVAL_CANDIDATES = int(os.getenv("CHATBOT_RETRIEVAL_CANDIDATES", 4))
+
+RETRIEVAL_DEADLINE_MISSES = REGISTRY.register(
+    Counter(
+        "chatbot_retrieval_deadline_misses_total",
+        "Turns answered without past context because retrieval missed its deadline",
+    )
+)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
 
 def extract_search_query_from_messages(messages: List) -> str:
     """Just get the latest human message as the search query."""
@@ -22,8 +53,71 @@ def extract_search_query_from_messages(messages: List) -> str:
     return str(human_messages[-1].content).strip()
 
 
-def search_relevant_conversations(state: ConversationState) -> ConversationState:
-    """Simple retrieval: search with the latest message and add context if found."""
+def get_retrieval_deadline_ms(config: Optional[RunnableConfig]) -> Optional[float]:
+    """Per-invocation retrieval budget from config, falling back to the default.
+
+    A value of 0 or None disables the deadline.
+    """
+    configurable = (config or {}).get("configurable", {})
+    deadline_ms = configurable.get("retrieval_deadline_ms", DEFAULT_RETRIEVAL_DEADLINE_MS)
+    return deadline_ms or None
+
+
+def _retrieval_executor() -> ThreadPoolExecutor:
+    """Bounded worker pool so timed-out searches can't pile up unbounded threads."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=RETRIEVAL_WORKERS, thread_name_prefix="retrieval"
+                )
+    return _executor
+
+
+def _retrieval_result(
+    results: List[str], elapsed_ms: float, in_budget: bool, deadline_ms: Optional[float]
+) -> ConversationState:
+    """Record the timing, pack the results and build the node's state update."""
+    RETRIEVAL_LATENCY.record(elapsed_ms, in_budget=in_budget)
+    if not in_budget:
+        RETRIEVAL_DEADLINE_MISSES.inc()
+        logger.warning(
+            f"⏱️ Retrieval took over its {deadline_ms:.0f}ms deadline, answering without"
+            " past context (the search finishes in the background)"
+        )
+    elif results:
+        logger.info(f"✅ Found context from {len(results)} past conversations")
+
+    # Search results arrive best first
+    packed, packing = pack_context(ranked(results))
+    log_packing(packing, "past conversations")
+
+    stats = RETRIEVAL_LATENCY.summary()
+    return {
+        "retrieved_conversations": packed,
+        "retrieval_stats": {
+            "elapsed_ms": round(elapsed_ms, 2),
+            "deadline_ms": deadline_ms,
+            "in_budget": in_budget,
+            "p50_ms": stats["p50_ms"],
+            "p95_ms": stats["p95_ms"],
+            "packing": packing,
+        },
+    }
+
+
+def search_relevant_conversations(
+    state: ConversationState,
+    config: Optional[RunnableConfig] = None,
+    *,
+    vector_store: Optional[SimpleVectorStore] = None,
+) -> ConversationState:
+    """Simple retrieval: search with the latest message and add context if found.
+
+    Uses the injected ``vector_store`` or falls back to the shared pooled store.
+    If the search misses the retrieval deadline, the turn continues without context.
+    """
     try:
         messages = state["messages"]
         search_query = extract_search_query_from_messages(messages)
@@ -31,30 +125,99 @@ def search_relevant_conversations(state: ConversationState) -> ConversationState
         if not search_query:
             return state
 
-        print(f"🔍 Searching: '{search_query[:50]}...'")
+        logger.info(f"🔍 Searching: '{search_query[:50]}...'")
 
         # Search vector store using LangChain's pgvector
-        vector_store = SimpleVectorStore()
-        results = vector_store.search_conversations(
-            query=search_query, limit=2, distance_threshold=0.8
-        )
-
-        if results:
-            print(f"✅ Found context from {len(results)} past conversations")
-            return {"retrieved_conversations": results}
+        vector_store = vector_store or get_vector_store()
+        deadline_ms = get_retrieval_deadline_ms(config)
+        start = time.perf_counter()
+
+        if deadline_ms is None:
+            results = vector_store.search_conversations(
+                query=search_query, limit=RETRIEVAL_CANDIDATES, distance_threshold=0.8
+            )
+            in_budget = True
         else:
-            return {"retrieved_conversations": []}
+            future = _retrieval_executor().submit(
+                contextvars.copy_context().run,
+                vector_store.search_conversations,
+                query=search_query,
+                limit=RETRIEVAL_CANDIDATES,
+                distance_threshold=0.8,
+            )
+            try:
+                results = future.result(timeout=deadline_ms / 1000)
+                in_budget = True
+            except FutureTimeoutError:
+                future.cancel()  # drop it if it hasn't started; otherwise ignore its result
+                results, in_budget = [], False
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        return _retrieval_result(results, elapsed_ms, in_budget, deadline_ms)
 
     except Exception as e:
-        print(f"❌ Error in retrieval: {e}")
+        logger.error(f"❌ Error in retrieval: {e}")
         return {"retrieved_conversations": []}
 
 
+async def asearch_relevant_conversations(
+    state: ConversationState,
+    config: Optional[RunnableConfig] = None,
+    *,
+    vector_store: Optional[SimpleVectorStore] = None,
+) -> ConversationState:
+    """Async variant of search_relevant_conversations (non-blocking DB and embeddings).
+
+    A search that misses the retrieval deadline is abandoned, not stopped:
+    it may be shared with other turns, so it runs to completion.
+    """
+    try:
+        messages = state["messages"]
+        search_query = extract_search_query_from_messages(messages)
+
+        if not search_query:
+            return state
+
+        logger.info(f"🔍 Searching: '{search_query[:50]}...'")
+
+        vector_store = vector_store or get_vector_store()
+        deadline_ms = get_retrieval_deadline_ms(config)
+        start = time.perf_counter()
+
+        try:
+            results = await asyncio.wait_for(
+                vector_store.asearch_conversations(
+                    query=search_query,
+                    limit=RETRIEVAL_CANDIDATES,
+                    distance_threshold=0.8,
+                ),
+                timeout=deadline_ms / 1000 if deadline_ms else None,
+            )
+            in_budget = True
+        except asyncio.TimeoutError:
+            results, in_budget = [], False
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        return _retrieval_result(results, elapsed_ms, in_budget, deadline_ms)
+
+    except Exception as e:
+        logger.error(f"❌ Error in retrieval: {e}")
+        return {"retrieved_conversations": []}
+
+
+def skip_retrieval(state: ConversationState) -> ConversationState:
+    """Clear last turn's context for a message the intent gate judged not worth a search."""
+    logger.info("⏭️ Skipping retrieval for small talk")
+    return {"retrieved_conversations": [], "retrieval_stats": {"skipped": True}}
+
+
 if __name__ == "__main__":
     """Test the retrieval functionality."""
     from dotenv import load_dotenv
     from langchain_core.messages import HumanMessage
+    from src.chatbot.instrumentation import configure_logging
 
+    configure_logging()
     load_dotenv()
 
     print("🧪 Testing Simple Retrieval...")
@@ -67,6 +230,8 @@ if __name__ == "__main__":
         f"Retrieved conversations: {len(result_state.get('retrieved_conversations', []))}"
     )
 
+    print(f"Retrieval stats: {result_state.get('retrieval_stats')}")
+
     if result_state.get("retrieved_conversations"):
         print("✅ Context found!")
         for i, conv in enumerate(result_state["retrieved_conversations"], 1):
@@ -1,9 +1,12 @@
 """
 Routing node for LangGraph that decides the next step in conversation flow.
-Determines whether to store conversation or generate response.
+Determines whether to store conversation or generate response, and whether
+the response needs a memory search first.
 """
 
-from typing import List
+from typing import List, Optional
+from src.chatbot.intent import IntentGate, get_intent_gate, record_route
+from src.chatbot.nodes.retrieval import extract_search_query_from_messages
 from src.chatbot.state import ConversationState
 
 
@@ -20,10 +23,27 @@ def should_store_conversation(state: ConversationState) -> str:
     return "generate_response"
 
 
+def route_turn(
+    state: ConversationState, *, intent_gate: Optional[IntentGate] = None
+) -> str:
+    """Store on quit; otherwise search memory unless the intent gate skips it."""
+    if should_store_conversation(state) == "store_conversation":
+        record_route("store_conversation", "quit")
+        return "store_conversation"
+
+    intent_gate = intent_gate or get_intent_gate()
+    query = extract_search_query_from_messages(state["messages"])
+    if intent_gate.should_retrieve(query):
+        return "search_conversations"
+    return "skip_retrieval"
+
+
 if __name__ == "__main__":
     """Demo the routing node."""
     from langchain_core.messages import HumanMessage
+    from src.chatbot.instrumentation import configure_logging
 
+    configure_logging()
     print("🧪 Testing Routing Node...")
 
     # Test normal message routing
@@ -58,3 +78,8 @@ if __name__ == "__main__":
 
     route4 = should_store_conversation(empty_state)
     print(f"✅ Empty messages routes to: {route4}")
+
+    # Test the intent gate on small talk and a real question
+    for message in ["thanks!", "How do I use Docker?"]:
+        state = {"messages": [HumanMessage(content=message)]}
+        print(f"✅ {message!r} routes to: {route_turn(state, intent_gate=IntentGate())}")
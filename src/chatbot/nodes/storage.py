@@ -1,17 +1,27 @@
 """
 Storage node for LangGraph that handles conversation summarization and storage.
 Saves conversation summaries when conversations end.
+
+By default the transcript is handed to the write-behind queue, so the user is
+not kept waiting for summarization, embedding and the insert.
 """
 
+import asyncio
+import logging
 from typing import Dict, List, Optional
 from langchain_core.messages import SystemMessage, BaseMessage
-from langchain.chat_models import init_chat_model
-from dotenv import load_dotenv
-
-from src.chatbot.simple_vector_store import SimpleVectorStore
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableConfig
+from src.chatbot.simple_vector_store import SimpleVectorStore, get_vector_store
 from src.chatbot.state import ConversationState
+from src.chatbot.write_behind import (
+    WRITE_BEHIND_ENABLED,
+    WriteBehindQueue,
+    get_write_queue,
+)
+from src.llm import Priority, get_chain
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
 
 SUMMARIZATION_PROMPT = """Create a structured summary of this conversation as a list of things discussed, with topics at the end for better searchability.
@@ -28,64 +38,167 @@ Here are the things we discussed:
 Topics: [list main topics separated by commas]"""
 
 
-def summarize_conversation(messages: List[BaseMessage]) -> Optional[str]:
-    """Simple conversation summarizer - returns combined summary with topics."""
-    if len(messages) < 2:
-        return None
-
-    # Convert to text
+def format_conversation(messages: List[BaseMessage]) -> str:
+    """Convert messages to a "Human: ... / AI: ..." transcript."""
     conversation_text = ""
     for msg in messages:
         if hasattr(msg, "type"):
             role = "Human" if msg.type == "human" else "AI"
             conversation_text += f"{role}: {msg.content}\n"
+    return conversation_text
+
+
+def get_summarization_chain():
+    """Shared SUMMARIZATION_PROMPT | gpt-4o-mini chain."""
+    return get_chain(
+        "summarize_conversation",
+        lambda: ChatPromptTemplate.from_template(SUMMARIZATION_PROMPT),
+        "openai:gpt-4o-mini",
+        priority=Priority.BACKGROUND,
+        temperature=0.3,
+    )
+
+
+def summarize_conversation(messages: List[BaseMessage]) -> Optional[str]:
+    """Simple conversation summarizer - returns combined summary with topics."""
+    if len(messages) < 2:
+        return None
 
     try:
-        llm = init_chat_model("openai:gpt-4o-mini", temperature=0.3)
-        prompt = SUMMARIZATION_PROMPT.format(conversation_text=conversation_text)
-        response = llm.invoke(prompt)
+        chain = get_summarization_chain()
+        response = chain.invoke({"conversation_text": format_conversation(messages)})
         summary = response.content.strip()
 
         return summary if summary else None
 
     except Exception as e:
-        print(f"❌ Summarization error: {e}")
+        logger.error(f"❌ Summarization error: {e}")
         return None
 
 
-def store_conversation_summary(state: ConversationState) -> ConversationState:
-    """Simple storage: summarize and store using LangChain pgvector."""
+async def asummarize_conversation(messages: List[BaseMessage]) -> Optional[str]:
+    """Async variant of summarize_conversation."""
+    if len(messages) < 2:
+        return None
+
     try:
-        messages = state["messages"]
+        chain = get_summarization_chain()
+        response = await chain.ainvoke(
+            {"conversation_text": format_conversation(messages)}
+        )
+        summary = response.content.strip()
+
+        return summary if summary else None
+
+    except Exception as e:
+        logger.error(f"❌ Summarization error: {e}")
+        return None
+
+
+def filter_system_messages(messages: List[BaseMessage]) -> List[BaseMessage]:
+    """Drop system messages (status notes) before summarizing."""
+    return [
+        msg for msg in messages if not (hasattr(msg, "type") and msg.type == "system")
+    ]
+
+
+def resolve_write_queue(
+    vector_store: Optional[SimpleVectorStore], write_queue: Optional[WriteBehindQueue]
+) -> Optional[WriteBehindQueue]:
+    """Queue to hand transcripts to, or None to summarize and store inline.
 
+    An explicitly injected store without a queue is written to inline.
+    """
+    if write_queue is not None:
+        return write_queue
+    if vector_store is None and WRITE_BEHIND_ENABLED:
+        return get_write_queue()
+    return None
+
+
+def _thread_id(config: Optional[RunnableConfig]) -> Optional[str]:
+    return (config or {}).get("configurable", {}).get("thread_id")
+
+
+def store_conversation_summary(
+    state: ConversationState,
+    config: Optional[RunnableConfig] = None,
+    *,
+    vector_store: Optional[SimpleVectorStore] = None,
+    write_queue: Optional[WriteBehindQueue] = None,
+) -> ConversationState:
+    """Simple storage: summarize and store using LangChain pgvector.
+
+    Journals the transcript to the write-behind queue and returns at once, or
+    stores inline into the injected ``vector_store`` when no queue is used.
+    """
+    try:
         # Filter out system messages
-        filtered_messages = [
-            msg
-            for msg in messages
-            if not (hasattr(msg, "type") and msg.type == "system")
-        ]
+        filtered_messages = filter_system_messages(state["messages"])
 
-        if len(filtered_messages) >= 2:
-            print("📝 Storing conversation...")
+        if len(filtered_messages) < 2:
+            msg = "ℹ️ Conversation too short to save."
+        elif queue := resolve_write_queue(vector_store, write_queue):
+            queue.enqueue(format_conversation(filtered_messages), _thread_id(config))
+            msg = "✅ Conversation queued for saving!"
+        else:
+            logger.info("📝 Storing conversation...")
 
             # Create simple summary
             summary = summarize_conversation(filtered_messages)
 
             if summary:
                 # Store using LangChain pgvector
-                vector_store = SimpleVectorStore()
-                vector_store.store_conversation(summary=summary)
+                vector_store = vector_store or get_vector_store()
+                vector_store.store_conversation(summary=summary, thread_id=_thread_id(config))
                 msg = "✅ Conversation saved!"
             else:
                 msg = "ℹ️ Conversation too short to save."
-        else:
-            msg = "ℹ️ Conversation too short to save."
 
         # Add confirmation message
         return {"messages": [SystemMessage(content=msg)]}
 
     except Exception as e:
-        print(f"❌ Storage error: {e}")
+        logger.error(f"❌ Storage error: {e}")
+        return {"messages": [SystemMessage(content="❌ Could not save conversation.")]}
+
+
+async def astore_conversation_summary(
+    state: ConversationState,
+    config: Optional[RunnableConfig] = None,
+    *,
+    vector_store: Optional[SimpleVectorStore] = None,
+    write_queue: Optional[WriteBehindQueue] = None,
+) -> ConversationState:
+    """Async variant of store_conversation_summary."""
+    try:
+        filtered_messages = filter_system_messages(state["messages"])
+
+        if len(filtered_messages) < 2:
+            msg = "ℹ️ Conversation too short to save."
+        elif queue := resolve_write_queue(vector_store, write_queue):
+            await asyncio.to_thread(
+                queue.enqueue, format_conversation(filtered_messages), _thread_id(config)
+            )
+            msg = "✅ Conversation queued for saving!"
+        else:
+            logger.info("📝 Storing conversation...")
+
+            summary = await asummarize_conversation(filtered_messages)
+
+            if summary:
+                vector_store = vector_store or get_vector_store()
+                await vector_store.astore_conversation(
+                    summary=summary, thread_id=_thread_id(config)
+                )
+                msg = "✅ Conversation saved!"
+            else:
+                msg = "ℹ️ Conversation too short to save."
+
+        return {"messages": [SystemMessage(content=msg)]}
+
+    except Exception as e:
+        logger.error(f"❌ Storage error: {e}")
         return {"messages": [SystemMessage(content="❌ Could not save conversation.")]}
 
 
@@ -93,7 +206,9 @@ if __name__ == "__main__":
     """Demo the storage node."""
     from dotenv import load_dotenv
     from langchain_core.messages import HumanMessage, AIMessage
+    from src.chatbot.instrumentation import configure_logging
 
+    configure_logging()
     load_dotenv()
 
     print("🧪 Testing Storage Node...")
@@ -122,3 +237,6 @@ if __name__ == "__main__":
 
     result = store_conversation_summary(test_state)
     print(f"✅ Storage result: {result['messages'][-1].content}")
+
+    # Wait for the write-behind workers before the demo exits
+    get_write_queue().drain(timeout=30)
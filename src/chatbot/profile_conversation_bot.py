@@ -4,24 +4,136 @@ Interactive profile-based conversation bot using LangGraph Store.
 Shows how user profiles are built and used over time.
 """
 
+import queue
+import time
 import uuid
-from typing import Optional
-from langchain_core.messages import HumanMessage
-
-from src.chatbot.graph.profile_graph import create_profile_graph
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterator, Optional
+from dotenv import load_dotenv
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langgraph.store.base import BaseStore
+
+from src.chatbot.checkpointer import (
+    CHECKPOINT_DURABILITY,
+    Checkpointers,
+    get_checkpointers,
+)
+from src.chatbot.graph.profile_graph import build_profile_graph
+from src.chatbot.instrumentation import configure_logging
+from src.chatbot.metrics import TIME_TO_FIRST_TOKEN, TIME_TO_LAST_TOKEN
+from src.chatbot.profile_scheduler import ProfileUpdateScheduler
+from src.chatbot.profile_store import DEFAULT_USER_ID
 
 
 class ProfileConversationBot:
     """
     Profile-based conversational AI bot using LangGraph Store.
     Builds and maintains user profiles instead of storing conversation summaries.
+
+    Responses stream token by token. The profile update that follows each
+    reply finishes in the background, so the next prompt is not delayed.
     """
 
-    def __init__(self):
-        """Initialize the profile conversation bot."""
-        self.graph = create_profile_graph()
+    def __init__(
+        self,
+        checkpointers: Optional[Checkpointers] = None,
+        user_id: Optional[str] = None,
+        store: Optional[BaseStore] = None,
+        scheduler: Optional[ProfileUpdateScheduler] = None,
+    ):
+        """
+        Initialize the profile conversation bot.
+
+        Args:
+            checkpointers: Checkpoint backend for thread history
+                           (default: the shared persistent backend)
+            user_id: Whose profile to read and update (default: CHATBOT_USER_ID)
+            store: Profile store (default: the shared persistent store)
+            scheduler: Batches profile updates (default: the shared scheduler)
+        """
+        # API keys from .env are read when the clients are first built
+        load_dotenv()
+        self.checkpointers = checkpointers or get_checkpointers()
+        self.user_id = user_id or DEFAULT_USER_ID
+        self.graph = build_profile_graph(
+            checkpointer=self.checkpointers.saver, scheduler=scheduler, store=store
+        )
+        # Graph runs continue here after the reply has been streamed
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="profile-turn")
+        self._pending: Dict[str, Future] = {}
+        self.last_turn_timing: Dict[str, Optional[float]] = {}
         print("🤖 Profile Chatbot initialized with LangGraph Store!")
 
+    def _run_graph(self, input_state: dict, config: dict, events: queue.Queue) -> None:
+        """Run one turn, forwarding (mode, payload) stream events to ``events``."""
+        try:
+            for mode, payload in self.graph.stream(
+                input_state,
+                config=config,
+                stream_mode=["messages", "updates"],
+                durability=CHECKPOINT_DURABILITY,
+            ):
+                events.put((mode, payload))
+        except Exception as e:
+            events.put(("error", e))
+        finally:
+            events.put(("done", None))
+
+    def chat_stream(self, message: str, thread_id: str) -> Iterator[str]:
+        """
+        Stream the AI response tokens for one message.
+
+        The generator ends as soon as the response is complete; the profile
+        update keeps running in the background and the next turn on the same
+        thread waits for it.
+
+        Args:
+            message: User's message
+            thread_id: Conversation thread identifier
+
+        Yields:
+            Response chunks (or the profile status message when quitting)
+        """
+        start = time.perf_counter()
+        # Turns on one thread must not overlap, or they'd race on its checkpoint
+        pending = self._pending.get(thread_id)
+        if pending is not None:
+            pending.result()
+
+        input_state = {"messages": [HumanMessage(content=message)]}
+        config = {"configurable": {"thread_id": thread_id, "user_id": self.user_id}}
+        events: queue.Queue = queue.Queue()
+
+        first_token_ms = None
+        self._pending[thread_id] = self._executor.submit(
+            self._run_graph, input_state, config, events
+        )
+
+        while True:
+            mode, payload = events.get()
+            if mode == "messages":
+                chunk, metadata = payload
+                node = metadata.get("langgraph_node")
+                if node == "generate_response" and isinstance(chunk, AIMessage):
+                    if chunk.content:
+                        if first_token_ms is None:
+                            first_token_ms = (time.perf_counter() - start) * 1000
+                        yield chunk.content
+                elif isinstance(chunk, SystemMessage) and node == "update_profile":
+                    yield chunk.content
+            elif mode == "updates" and "generate_response" in payload:
+                break  # response complete; the profile update continues
+            elif mode == "error":
+                raise payload
+            elif mode == "done":
+                break
+
+        last_token_ms = (time.perf_counter() - start) * 1000
+        self.last_turn_timing = {"ttft_ms": first_token_ms, "ttlt_ms": last_token_ms}
+        if first_token_ms is not None:
+            TIME_TO_FIRST_TOKEN.record(first_token_ms)
+            TIME_TO_LAST_TOKEN.record(last_token_ms)
+
     def chat(self, message: str, thread_id: str) -> str:
         """
         Process a single message and return AI response with streaming.
@@ -34,28 +146,12 @@ class ProfileConversationBot:
             AI response string
         """
         try:
-            # Create input state
-            input_state = {"messages": [HumanMessage(content=message)]}
-            config = {"configurable": {"thread_id": thread_id}}
-
-            # Stream the response
             response_content = ""
             print("Bot: ", end="", flush=True)
 
-            # Try streaming with different approach
-            for chunk in self.graph.stream(input_state, config=config):
-                # Check if chunk contains messages from any node
-                if isinstance(chunk, dict):
-                    for node_name, node_output in chunk.items():
-                        if isinstance(node_output, dict) and "messages" in node_output:
-                            for message in node_output["messages"]:
-                                if hasattr(message, "type") and (
-                                    message.type == "ai" or message.type == "system"
-                                ):
-                                    content = message.content
-                                    print(content, end="", flush=True)
-                                    response_content = content
-                                    break
+            for chunk in self.chat_stream(message, thread_id):
+                print(chunk, end="", flush=True)
+                response_content += chunk
 
             print()  # New line after response
             return (
@@ -68,8 +164,13 @@ class ProfileConversationBot:
             print(f"❌ Error processing message: {e}")
             return "I encountered an error processing your message."
 
+    def close(self) -> None:
+        """Wait for background profile updates to finish."""
+        self._executor.shutdown(wait=True)
+
     def start_conversation(self):
         """Start an interactive conversation session."""
+        configure_logging()
         print("\n🤖 Profile Chatbot Ready! (LangGraph Store)")
         print("Type 'quit' to exit, 'new' to start new conversation")
         print("Watch how your profile builds over time!")
@@ -98,12 +199,19 @@ class ProfileConversationBot:
 
                 # Process message and get streaming response
                 response = self.chat(user_input, thread_id)
+                timing = self.last_turn_timing
+                if timing.get("ttft_ms") is not None:
+                    print(
+                        f"⏱️ first token {timing['ttft_ms']:.0f}ms, "
+                        f"last token {timing['ttlt_ms']:.0f}ms"
+                    )
 
         except KeyboardInterrupt:
             pass
         except Exception as e:
             print(f"\n❌ Conversation error: {e}")
 
+        self.close()
         print("\n👋 Goodbye!")
 
 
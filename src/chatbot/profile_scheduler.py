@@ -0,0 +1,377 @@
+"""
+Debounced, incremental user profile updates.
+
+Instead of re-sending the whole conversation to gpt-4o-mini after every
+reply, the scheduler keeps a per-thread watermark of messages already folded
+into the profile. An update sends only the messages past the watermark and
+runs on a background worker once enough turns have piled up, or after the
+thread has been idle for a while. Quitting flushes whatever is left.
+Once a thread is caught up its messages are dropped; only the watermark is
+remembered, for a bounded number of threads.
+"""
+
+import atexit
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.messages import BaseMessage
+from langgraph.store.base import BaseStore
+
+from src.chatbot.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Set CHATBOT_PROFILE_SCHEDULER=0 to extract the profile inline after every reply
+PROFILE_SCHEDULER_ENABLED = os.getenv("CHATBOT_PROFILE_SCHEDULER", "1") != "0"
+
+
+@dataclass(frozen=True)
+class ProfileUpdateSettings:
+    """When to run a profile update for a thread."""
+
+    # Update once this many user turns are past the watermark
+    batch_turns: int = 3
+    # ...or once the thread has been quiet this long
+    idle_seconds: float = 30.0
+    workers: int = 1
+    # Watermarks remembered for threads whose messages were dropped
+    max_idle_threads: int = 100_000
+
+    @classmethod
+    def from_env(cls) -> "ProfileUpdateSettings":
+        """Read settings from CHATBOT_PROFILE_* environment variables."""
+        return cls(
+            batch_turns=int(os.getenv("CHATBOT_PROFILE_UPDATE_TURNS", cls.batch_turns)),
+            idle_seconds=float(
+                os.getenv("CHATBOT_PROFILE_IDLE_SECONDS", cls.idle_seconds)
+            ),
+        )
+
+
+@dataclass
+class ThreadProfileState:
+    """Latest messages seen for one thread and how far they were processed."""
+
+    store: BaseStore
+    namespace: Tuple[str, ...]
+    messages: List[BaseMessage] = field(default_factory=list)
+    watermark: int = 0
+    timer: Optional[threading.Timer] = None
+    future: Optional[Future] = None
+    # Messages the running (or last) update started from, and whether it failed
+    seen: int = 0
+    failed: bool = False
+    flushing: bool = False
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def pending_turns(messages: List[BaseMessage]) -> int:
+    """Number of user turns in ``messages``."""
+    return sum(1 for msg in messages if msg.type == "human")
+
+
+class ProfileUpdateScheduler:
+    """Batches profile updates per thread and runs them off the response path."""
+
+    def __init__(self, settings: Optional[ProfileUpdateSettings] = None):
+        """
+        Args:
+            settings: Batch and idle thresholds (default: from the environment)
+        """
+        self.settings = settings or ProfileUpdateSettings.from_env()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.settings.workers, thread_name_prefix="profile-update"
+        )
+        self._threads: Dict[str, ThreadProfileState] = {}
+        # thread_id -> watermark of threads that were caught up and dropped
+        self._watermarks: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._counters = {
+            "updates": 0,
+            "skipped": 0,
+            "failed": 0,
+            "tokens_sent": 0,
+            "last_tokens_sent": 0,
+        }
+
+    def _record(
+        self,
+        thread_id: str,
+        messages: List[BaseMessage],
+        store: BaseStore,
+        namespace: Tuple[str, ...],
+    ) -> ThreadProfileState:
+        with self._lock:
+            state = self._threads.get(thread_id)
+            if state is None:
+                state = self._threads[thread_id] = ThreadProfileState(
+                    store=store,
+                    namespace=namespace,
+                    watermark=self._watermarks.pop(thread_id, 0),
+                )
+            # Under the scheduler lock, so the thread isn't forgotten meanwhile
+            with state.lock:
+                state.messages = list(messages)
+                state.store = store
+                state.namespace = namespace
+        self._cancel_timer(state)
+        return state
+
+    def _forget(self, thread_id: str, state: ThreadProfileState) -> None:
+        """Drop a caught-up thread's messages, keeping its watermark (holds both locks)."""
+        del self._threads[thread_id]
+        self._watermarks[thread_id] = state.watermark
+        while len(self._watermarks) > self.settings.max_idle_threads:
+            self._watermarks.popitem(last=False)
+
+    def observe(
+        self,
+        thread_id: str,
+        messages: List[BaseMessage],
+        store: BaseStore,
+        namespace: Tuple[str, ...],
+    ) -> bool:
+        """
+        Record the thread's conversation after a reply.
+
+        Args:
+            thread_id: Conversation thread identifier
+            messages: Conversation so far, without system messages
+            store: Store holding the user profile
+            namespace: The user's profile namespace
+
+        Returns:
+            True if an update was scheduled, False if it was deferred
+        """
+        state = self._record(thread_id, messages, store, namespace)
+        with state.lock:
+            waiting = pending_turns(state.messages[state.watermark :])
+
+        if waiting >= self.settings.batch_turns:
+            self._submit(thread_id)
+            return True
+
+        with self._lock:
+            self._counters["skipped"] += 1
+        self._arm_timer(thread_id, state)
+        return False
+
+    def _arm_timer(self, thread_id: str, state: ThreadProfileState) -> None:
+        self._cancel_timer(state)
+        if self._closed:
+            return
+        state.timer = threading.Timer(
+            self.settings.idle_seconds, self._on_idle, args=(thread_id, state)
+        )
+        state.timer.daemon = True
+        state.timer.start()
+
+    def _on_idle(self, thread_id: str, state: ThreadProfileState) -> None:
+        state.timer = None
+        self._submit(thread_id)
+
+    @staticmethod
+    def _cancel_timer(state: ThreadProfileState) -> None:
+        if state.timer is not None:
+            state.timer.cancel()
+            state.timer = None
+
+    def _submit(self, thread_id: str) -> Optional[Future]:
+        state = self._threads.get(thread_id)
+        if state is None or self._closed:
+            return None
+        with state.lock:
+            # One in-flight update per thread; it picks up every message seen so far
+            if state.future is not None and not state.future.done():
+                return state.future
+            future = state.future = self._executor.submit(self._update, thread_id)
+        # Outside the lock: the callback runs right away if the update already finished
+        future.add_done_callback(lambda _: self._after_update(thread_id))
+        return future
+
+    def _after_update(self, thread_id: str) -> None:
+        """Catch up on messages that came in during an update, or forget the thread."""
+        with self._lock:
+            state = self._threads.get(thread_id)
+            if state is None or self._closed:
+                return
+            with state.lock:
+                # flush runs its own update; a newer observe armed its own timer
+                if state.flushing or state.timer is not None:
+                    return
+                arrived = len(state.messages) > state.seen
+                waiting = pending_turns(state.messages[state.watermark :])
+                if not arrived and not state.failed:
+                    self._forget(thread_id, state)
+                    return
+
+        if arrived and waiting >= self.settings.batch_turns:
+            self._submit(thread_id)
+        else:
+            # A few new turns, or a failed update to retry once the thread is quiet
+            self._arm_timer(thread_id, state)
+
+    def _update(self, thread_id: str) -> Optional[dict]:
+        """Fold the messages past the watermark into the profile."""
+        # Imported here: the profile storage node module imports this one
+        from src.chatbot.nodes.profile_storage import (
+            PROFILE_UPDATE_PROMPT,
+            conversation_text,
+            extract_profile_info,
+            load_profile,
+            save_profile,
+        )
+
+        state = self._threads.get(thread_id)
+        if state is None:
+            return None
+        with state.lock:
+            processed = len(state.messages)
+            new_messages = state.messages[state.watermark : processed]
+            store, namespace = state.store, state.namespace
+            state.seen = processed
+            state.failed = False
+        if len(new_messages) < 2:
+            return None
+
+        logger.info(f"📝 Updating user profile with {len(new_messages)} new messages...")
+        current_profile = load_profile(store, namespace)
+        tokens = count_tokens(
+            PROFILE_UPDATE_PROMPT.format(
+                current_profile=current_profile,
+                conversation_text=conversation_text(new_messages),
+            )
+        )
+        updated_profile = extract_profile_info(new_messages, current_profile)
+
+        with self._lock:
+            self._counters["tokens_sent"] += tokens
+            self._counters["last_tokens_sent"] = tokens
+            self._counters["updates" if updated_profile else "failed"] += 1
+        if not updated_profile:
+            # Leave the watermark alone so the next update retries these messages
+            with state.lock:
+                state.failed = True
+            return None
+
+        updated_profile = save_profile(store, namespace, updated_profile)
+        with state.lock:
+            state.watermark = max(state.watermark, processed)
+        return updated_profile
+
+    def flush(
+        self,
+        thread_id: str,
+        messages: Optional[List[BaseMessage]] = None,
+        store: Optional[BaseStore] = None,
+        namespace: Optional[Tuple[str, ...]] = None,
+    ) -> Optional[dict]:
+        """
+        Run any pending update for ``thread_id`` now and wait for it.
+
+        Args:
+            thread_id: Conversation thread identifier
+            messages: Final conversation, if it changed since the last observe
+            store: Store holding the user profile (required with ``messages``)
+            namespace: The user's profile namespace (required with ``messages``)
+
+        Returns:
+            The updated profile, or None if nothing new was sent or it failed
+        """
+        if messages is not None:
+            state = self._record(thread_id, messages, store, namespace)
+        else:
+            state = self._threads.get(thread_id)
+            if state is None:
+                return None
+            self._cancel_timer(state)
+        with state.lock:
+            state.flushing = True
+        try:
+            running = state.future
+            if running is not None:
+                running.result()
+            return self._update(thread_id)
+        finally:
+            with self._lock, state.lock:
+                state.flushing = False
+                retry = state.failed
+                if self._threads.get(thread_id) is state and not retry:
+                    self._forget(thread_id, state)
+            if retry:
+                self._arm_timer(thread_id, state)
+
+    def stats(self) -> Dict[str, float]:
+        """Update/skip counters and prompt tokens sent to the profile model."""
+        with self._lock:
+            counters = dict(self._counters)
+            counters["threads"] = len(self._threads)
+        counters["avg_tokens_per_update"] = (
+            counters["tokens_sent"] / counters["updates"] if counters["updates"] else 0.0
+        )
+        return counters
+
+    def close(self) -> None:
+        """Flush every thread and stop the worker."""
+        if self._closed:
+            return
+        for thread_id in list(self._threads):
+            try:
+                self.flush(thread_id)
+            except Exception as e:
+                logger.error(f"❌ Profile update error for {thread_id}: {e}")
+        self._closed = True
+        self._executor.shutdown(wait=True)
+
+
+_shared_scheduler: Optional[ProfileUpdateScheduler] = None
+_shared_lock = threading.Lock()
+
+
+def get_profile_scheduler() -> ProfileUpdateScheduler:
+    """Return the process-wide profile scheduler, creating it on first use."""
+    global _shared_scheduler
+    if _shared_scheduler is None:
+        with _shared_lock:
+            if _shared_scheduler is None:
+                _shared_scheduler = ProfileUpdateScheduler()
+                atexit.register(_shared_scheduler.close)
+    return _shared_scheduler
+
+
+if __name__ == "__main__":
+    """Demo: five turns with a batch of two, then a flush."""
+    from langchain_core.messages import AIMessage, HumanMessage
+    from langgraph.store.memory import InMemoryStore
+
+    from src.chatbot.benchmarks.fakes import FakeChatModel
+    from src.chatbot.instrumentation import configure_logging
+    from src.llm import override_chat_model
+
+    configure_logging()
+    print("🧪 Testing Profile Update Scheduler...")
+    override_chat_model(
+        "openai:gpt-4o-mini",
+        FakeChatModel(response='{"topics": ["docker"], "facts": []}', latency_ms=100),
+    )
+    store = InMemoryStore()
+    scheduler = ProfileUpdateScheduler(ProfileUpdateSettings(batch_turns=2))
+
+    messages: List[BaseMessage] = []
+    for turn in range(5):
+        messages += [
+            HumanMessage(content=f"Question {turn} about Docker"),
+            AIMessage(content=f"Answer {turn}"),
+        ]
+        scheduled = scheduler.observe("demo", messages, store, ("user", "demo_user"))
+        print(f"Turn {turn}: {'scheduled' if scheduled else 'deferred'}")
+
+    scheduler.flush("demo")
+    print(f"✅ Stats: {scheduler.stats()}")
+    scheduler.close()
@@ -0,0 +1,448 @@
+"""
+Persistent, embedding-indexed LangGraph Store for user profiles.
+
+Profiles live in Postgres (the pgvector instance from docker-compose.yml),
+falling back to a local SQLite file when Postgres is unavailable. Profile
+facts and topics are embedded so ``store.search(namespace, query=...)`` ranks
+semantically, and each user gets their own namespace, keyed by the
+``user_id`` in the run config.
+
+Choose the backend with CHATBOT_PROFILE_STORE:
+    auto (default) - Postgres, or SQLite if Postgres can't be reached
+    postgres | sqlite | memory
+"""
+
+import hashlib
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.runnables import RunnableConfig
+from langgraph.store.base import BaseStore, PutOp
+from langgraph.store.memory import InMemoryStore
+
+from src.chatbot.checkpointer import _postgres_conninfo
+from src.chatbot.embedding_cache import CachedEmbeddings, openai_embeddings
+from src.chatbot.instrumentation import configure_logging, timed_db
+from src.chatbot.simple_vector_store import PoolSettings, database_url
+
+logger = logging.getLogger(__name__)
+
+SQLITE_PROFILE_PATH = ".cache/profiles.sqlite"
+DEFAULT_USER_ID = os.getenv("CHATBOT_USER_ID", "demo_user")
+PROFILE_KEY = "profile"
+# Keys older code stored profile data under; read once and folded in on write
+LEGACY_PROFILE_KEYS = ("interests",)
+VERSION_FIELD = "version"
+# Attempts before a write that keeps losing compare-and-swap races gives up
+CAS_MAX_ATTEMPTS = int(os.getenv("CHATBOT_PROFILE_CAS_ATTEMPTS", 5))
+# First backoff after a lost race; doubled on each further attempt
+CAS_RETRY_BASE_SECONDS = 0.1
+EMBEDDING_DIMENSIONS = 1536  # text-embedding-3-small
+# Profile fields embedded for semantic search; one vector per list element
+INDEXED_FIELDS = ["facts[*]", "topics[*]"]
+
+
+def user_id(config: Optional[RunnableConfig]) -> str:
+    """User the run belongs to (``configurable.user_id``)."""
+    return (config or {}).get("configurable", {}).get("user_id") or DEFAULT_USER_ID
+
+
+def profile_namespace(config: Optional[RunnableConfig]) -> Tuple[str, ...]:
+    """Store namespace holding the profile of the run's user."""
+    return ("user", user_id(config))
+
+
+def put_profiles(
+    store: BaseStore, profiles: Iterable[Tuple[Tuple[str, ...], str, dict]]
+) -> None:
+    """
+    Write many profile items in one batch.
+
+    Indexed stores embed every item in the batch with one embeddings call
+    and insert them in one round trip.
+
+    Args:
+        store: Profile store
+        profiles: (namespace, key, value) for each item
+    """
+    ops = [PutOp(namespace, key, value) for namespace, key, value in profiles]
+    if isinstance(store, InMemoryStore):
+        # InMemoryStore.batch fails when two items in one batch share an
+        # indexed text (e.g. a topic), so put them one at a time
+        for op in ops:
+            store.batch([op])
+    elif ops:
+        store.batch(ops)
+
+
+def _merge_list(current: List[str], update: List[str]) -> List[str]:
+    """Union of two lists, keeping order and dropping case-insensitive repeats."""
+    merged, seen = [], set()
+    for item in [*current, *update]:
+        marker = str(item).strip().lower()
+        if marker and marker not in seen:
+            seen.add(marker)
+            merged.append(item)
+    return merged
+
+
+def merge_profiles(current: dict, update: dict) -> dict:
+    """
+    Field-level merge of a profile update into the current profile.
+
+    Topics and facts are unioned, so a concurrent writer's additions are not
+    lost; other fields take the update's value when it has one.
+    """
+    merged = {k: v for k, v in current.items() if k != VERSION_FIELD}
+    for field, value in update.items():
+        if field == VERSION_FIELD:
+            continue
+        if field in ("topics", "facts"):
+            existing = merged.get(field) or []
+            if isinstance(existing, str):
+                existing = [existing]
+            if isinstance(value, str):
+                value = [value]
+            merged[field] = _merge_list(existing, value or [])
+        elif value:
+            merged[field] = value
+    return merged
+
+
+# Striped locks serialize writers between threads of this process
+_cas_locks = [threading.Lock() for _ in range(64)]
+
+
+def _cas_lock(namespace: Tuple[str, ...], key: str) -> threading.Lock:
+    return _cas_locks[hash((namespace, key)) % len(_cas_locks)]
+
+
+def _lock_id(namespace: Tuple[str, ...], key: str) -> int:
+    """Stable signed 64-bit ID for an item (hash() differs between processes)."""
+    digest = hashlib.blake2b("\x1f".join([*namespace, key]).encode(), digest_size=8)
+    return int.from_bytes(digest.digest(), "big", signed=True)
+
+
+@contextmanager
+def _postgres_write_lock(store: BaseStore, lock_id: int) -> Iterator[bool]:
+    """Try to take a transaction-scoped advisory lock shared by all processes."""
+    from psycopg_pool import ConnectionPool
+
+    # The lock is held on its own connection; get and put use the store's pool
+    if isinstance(store.conn, ConnectionPool):
+        connection = store.conn.connection()
+    else:
+        connection = nullcontext(store.conn)
+    with connection as conn, conn.transaction():
+        row = conn.execute("SELECT pg_try_advisory_xact_lock(%s) AS locked", (lock_id,)).fetchone()
+        yield bool(row["locked"] if isinstance(row, dict) else row[0])
+
+
+@contextmanager
+def _sqlite_write_lock(store: BaseStore, lock_id: int) -> Iterator[bool]:
+    """Try to take an exclusive lock on a file next to the SQLite database."""
+    path = store.conn.execute("PRAGMA database_list").fetchone()[2]
+    try:
+        import fcntl
+    except ImportError:  # Windows: only threads of this process are serialized
+        fcntl = None
+    if not path or fcntl is None:
+        yield True
+        return
+
+    # A few lock files striped by item keep unrelated users from contending
+    with open(f"{path}.lock-{lock_id & 0xF:x}", "a") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+@contextmanager
+def write_lock(store: BaseStore, namespace: Tuple[str, ...], key: str) -> Iterator[bool]:
+    """
+    Exclusive right to read-check-write one item, across threads and processes.
+
+    Postgres stores use an advisory lock and SQLite stores a lock file, so
+    server worker processes sharing the database serialize too; the in-memory
+    store is private to the process.
+
+    Yields:
+        False if another writer holds the lock (treat it as a lost race)
+    """
+    with _cas_lock(namespace, key):
+        backend = type(store).__name__
+        if backend == "PostgresStore":
+            with _postgres_write_lock(store, _lock_id(namespace, key)) as locked:
+                yield locked
+        elif backend == "SqliteStore":
+            with _sqlite_write_lock(store, _lock_id(namespace, key)) as locked:
+                yield locked
+        else:
+            yield True
+
+
+@timed_db
+def read_profile(
+    store: BaseStore, namespace: Tuple[str, ...]
+) -> Tuple[dict, Optional[int]]:
+    """
+    Keyed read of a user's profile.
+
+    Returns:
+        (profile, version); version is None when no profile is stored yet,
+        in which case legacy keys (e.g. "interests") seed the profile
+    """
+    item = store.get(namespace, PROFILE_KEY)
+    if item is not None:
+        return dict(item.value), item.value.get(VERSION_FIELD, 0)
+
+    profile: dict = {}
+    for key in LEGACY_PROFILE_KEYS:
+        legacy = store.get(namespace, key)
+        if legacy is not None:
+            profile = merge_profiles(profile, legacy.value)
+    return profile, None
+
+
+@timed_db
+def compare_and_put(
+    store: BaseStore,
+    namespace: Tuple[str, ...],
+    profile: dict,
+    expected_version: Optional[int],
+) -> Optional[int]:
+    """
+    Write ``profile`` only if the stored version is still ``expected_version``.
+
+    The check and the write happen under ``write_lock``, which every process
+    sharing the database honours, so a concurrent writer can't slip in between.
+
+    Returns:
+        The new version, or None if another writer got there first
+    """
+    with write_lock(store, namespace, PROFILE_KEY) as locked:
+        if not locked:
+            return None
+        item = store.get(namespace, PROFILE_KEY)
+        stored_version = item.value.get(VERSION_FIELD, 0) if item is not None else None
+        if stored_version != expected_version:
+            return None
+        version = (expected_version or 0) + 1
+        store.put(namespace, PROFILE_KEY, {**profile, VERSION_FIELD: version})
+        return version
+
+
+def update_profile(
+    store: BaseStore,
+    namespace: Tuple[str, ...],
+    update: dict,
+    max_attempts: int = CAS_MAX_ATTEMPTS,
+) -> dict:
+    """
+    Merge ``update`` into the stored profile with compare-and-swap retries.
+
+    Args:
+        store: Profile store
+        namespace: The user's profile namespace
+        update: Profile fields to merge in
+        max_attempts: Read-merge-write attempts before giving up
+
+    Returns:
+        The stored profile, including its new version
+
+    Raises:
+        RuntimeError: If every attempt lost a race with another writer
+    """
+    for attempt in range(max_attempts):
+        if attempt:
+            # Back off with jitter so racing writers don't collide again
+            time.sleep(CAS_RETRY_BASE_SECONDS * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+        current, version = read_profile(store, namespace)
+        merged = merge_profiles(current, update)
+        new_version = compare_and_put(store, namespace, merged, version)
+        if new_version is not None:
+            return {**merged, VERSION_FIELD: new_version}
+    raise RuntimeError(
+        f"Profile update for {namespace} lost {max_attempts} concurrent-write races"
+    )
+
+
+class ProfileStore:
+    """LangGraph Store for user profiles over one backend."""
+
+    def __init__(
+        self,
+        backend: Optional[str] = None,
+        connection: Optional[str] = None,
+        sqlite_path: Optional[str] = None,
+        pool_settings: Optional[PoolSettings] = None,
+        embeddings: Optional[Embeddings] = None,
+        dimensions: int = EMBEDDING_DIMENSIONS,
+    ):
+        """
+        Args:
+            backend: auto | postgres | sqlite | memory (default: CHATBOT_PROFILE_STORE)
+            connection: Postgres connection string
+            sqlite_path: SQLite file used by the sqlite backend
+            pool_settings: Postgres connection pool limits
+            embeddings: Embeddings for the profile index (default: cached OpenAI)
+            dimensions: Embedding size
+        """
+        # Read here rather than at import, so values from .env apply
+        self.connection = _postgres_conninfo(connection or database_url())
+        self.sqlite_path = sqlite_path or os.getenv(
+            "CHATBOT_PROFILE_SQLITE_PATH", SQLITE_PROFILE_PATH
+        )
+        self.pool_settings = pool_settings or PoolSettings.from_env()
+        self.embeddings = embeddings or CachedEmbeddings(openai_embeddings())
+        self.dimensions = dimensions
+        self._pool = None
+
+        backend = backend or os.getenv("CHATBOT_PROFILE_STORE", "auto")
+        if backend == "auto":
+            try:
+                self.store = self._create_postgres_store()
+                backend = "postgres"
+            except Exception as e:
+                logger.warning(f"⚠️ Postgres profile store unavailable ({e}), using SQLite")
+                self.store = self._create_sqlite_store()
+                backend = "sqlite"
+        elif backend == "postgres":
+            self.store = self._create_postgres_store()
+        elif backend == "sqlite":
+            self.store = self._create_sqlite_store()
+        elif backend == "memory":
+            self.store = InMemoryStore(index=self._index_config())
+        else:
+            raise ValueError(f"Unknown profile store backend: {backend}")
+        self.backend = backend
+
+    def _index_config(self) -> dict:
+        return {
+            "dims": self.dimensions,
+            "embed": self.embeddings,
+            "fields": INDEXED_FIELDS,
+        }
+
+    def _create_postgres_store(self) -> BaseStore:
+        from langgraph.store.postgres import PostgresStore
+        from psycopg.rows import dict_row
+        from psycopg_pool import ConnectionPool
+
+        pool = ConnectionPool(
+            self.connection,
+            min_size=self.pool_settings.min_size,
+            max_size=self.pool_settings.max_size,
+            timeout=self.pool_settings.checkout_timeout,
+            max_lifetime=self.pool_settings.recycle_seconds,
+            kwargs={
+                "autocommit": True,
+                "prepare_threshold": 0,
+                "row_factory": dict_row,
+                "connect_timeout": self.pool_settings.connect_timeout,
+            },
+            check=ConnectionPool.check_connection,
+            open=False,
+        )
+        try:
+            pool.open(wait=True, timeout=self.pool_settings.connect_timeout)
+            store = PostgresStore(
+                pool,
+                index={
+                    **self._index_config(),
+                    "distance_type": "cosine",
+                    "ann_index_config": {"kind": "hnsw"},
+                },
+            )
+            store.setup()
+        except Exception:
+            pool.close()
+            raise
+        self._pool = pool
+        return store
+
+    def _create_sqlite_store(self) -> BaseStore:
+        from langgraph.store.sqlite import SqliteStore
+
+        directory = os.path.dirname(self.sqlite_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(
+            self.sqlite_path, check_same_thread=False, isolation_level=None
+        )
+        try:
+            # The vector index needs the sqlite-vec extension
+            store = SqliteStore(conn, index=self._index_config())
+            store.setup()
+        except (AttributeError, sqlite3.Error) as e:
+            logger.warning(
+                f"⚠️ SQLite vector index unavailable ({type(e).__name__}), "
+                "profile search will not rank semantically"
+            )
+            store = SqliteStore(conn)
+            store.setup()
+        return store
+
+    def close(self) -> None:
+        """Close the store's connections."""
+        if self._pool is not None:
+            self._pool.close()
+        elif self.backend == "sqlite":
+            self.store.conn.close()
+
+
+_shared_store: Optional[ProfileStore] = None
+_shared_lock = threading.Lock()
+
+
+def get_profile_store() -> ProfileStore:
+    """Return the process-wide profile store, creating it on first use."""
+    global _shared_store
+    if _shared_store is None:
+        with _shared_lock:
+            if _shared_store is None:
+                _shared_store = ProfileStore()
+    return _shared_store
+
+
+if __name__ == "__main__":
+    """Demo: two users' profiles, searched semantically in their own namespaces."""
+    import tempfile
+
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+
+    configure_logging()
+    print("🧪 Testing Profile Store...")
+    with tempfile.TemporaryDirectory() as tmp:
+        profiles = ProfileStore(
+            backend="sqlite",
+            sqlite_path=f"{tmp}/profiles.sqlite",
+            embeddings=DeterministicFakeEmbedding(size=64),
+            dimensions=64,
+        )
+        alice = profile_namespace({"configurable": {"user_id": "alice"}})
+        bob = profile_namespace({"configurable": {"user_id": "bob"}})
+        put_profiles(
+            profiles.store,
+            [
+                (alice, PROFILE_KEY, {"topics": ["Docker"], "facts": ["Name is Alice"]}),
+                (bob, PROFILE_KEY, {"topics": ["Go"], "facts": ["Name is Bob"]}),
+            ],
+        )
+        for namespace in (alice, bob):
+            items = profiles.store.search(namespace, query="What is my name?", limit=3)
+            print(f"✅ {namespace}: {[item.value['facts'] for item in items]}")
+        profiles.close()
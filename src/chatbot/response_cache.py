@@ -0,0 +1,167 @@
+"""
+Semantic cache of answers to first-turn questions.
+
+Near-duplicate opening questions ("what is LangGraph?", "What's LangGraph")
+with the same retrieved context get the stored answer instead of a new gpt-4o
+generation. Entries expire after a TTL and the least recently used entry is
+evicted once the cache is full.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from src.chatbot.embedding_cache import CachedEmbeddings, openai_embeddings
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Set CHATBOT_RESPONSE_CACHE=1 to add the cache to create_conversation_graph()
+RESPONSE_CACHE_ENABLED = os.getenv("CHATBOT_RESPONSE_CACHE", "0") == "1"
+RESPONSE_CACHE_THRESHOLD = float(os.getenv("CHATBOT_RESPONSE_CACHE_THRESHOLD", 0.95))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("CHATBOT_RESPONSE_CACHE_TTL", 3600))
+RESPONSE_CACHE_SIZE = int(os.getenv("CHATBOT_RESPONSE_CACHE_SIZE", 1000))
+
+
+@dataclass
+class CacheEntry:
+    vector: "np.ndarray"
+    context_key: str
+    answer: str
+    created_at: float
+
+
+def context_key(retrieved_conversations: List[str]) -> str:
+    """Stable key for the retrieved context an answer was generated with."""
+    joined = "\n".join(sorted(retrieved_conversations))
+    return hashlib.sha256(joined.encode("utf-8")).hexdigest()
+
+
+class SemanticResponseCache:
+    """Answers keyed by question embedding and retrieved context."""
+
+    def __init__(
+        self,
+        embeddings: Optional[Embeddings] = None,
+        threshold: float = RESPONSE_CACHE_THRESHOLD,
+        ttl_seconds: float = RESPONSE_CACHE_TTL_SECONDS,
+        max_entries: int = RESPONSE_CACHE_SIZE,
+    ):
+        """
+        Args:
+            embeddings: Question embeddings (default: cached OpenAI embeddings)
+            threshold: Minimum cosine similarity for a hit
+            ttl_seconds: Age after which an entry is no longer served
+            max_entries: Entries kept before evicting the least recently used
+        """
+        self.embeddings = embeddings or CachedEmbeddings(openai_embeddings())
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._entries: "OrderedDict[int, CacheEntry]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> "np.ndarray":
+        # Imported here: the cache is off by default and numpy slows cold start
+        import numpy as np
+
+        array = np.asarray(vector, dtype=np.float32)
+        return array / (np.linalg.norm(array) + 1e-12)
+
+    def _match(self, vector: "np.ndarray", key: str) -> Optional[str]:
+        """Best entry for ``vector`` with the same context, if similar enough."""
+        import numpy as np
+
+        now = time.time()
+        with self._lock:
+            expired = [
+                entry_id
+                for entry_id, entry in self._entries.items()
+                if now - entry.created_at > self.ttl_seconds
+            ]
+            for entry_id in expired:
+                del self._entries[entry_id]
+            self._counters["expired"] += len(expired)
+
+            candidates = [
+                (entry_id, entry)
+                for entry_id, entry in self._entries.items()
+                if entry.context_key == key
+            ]
+            if candidates:
+                similarities = np.stack([e.vector for _, e in candidates]) @ vector
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    entry_id, entry = candidates[best]
+                    self._entries.move_to_end(entry_id)
+                    self._counters["hits"] += 1
+                    return entry.answer
+
+            self._counters["misses"] += 1
+            return None
+
+    def _add(self, vector: "np.ndarray", key: str, answer: str) -> None:
+        with self._lock:
+            self._entries[self._next_id] = CacheEntry(vector, key, answer, time.time())
+            self._next_id += 1
+            self._counters["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def lookup(self, question: str, retrieved_conversations: List[str]) -> Optional[str]:
+        """Cached answer for a similar question with the same context, or None."""
+        vector = self._normalize(self.embeddings.embed_query(question))
+        return self._match(vector, context_key(retrieved_conversations))
+
+    async def alookup(
+        self, question: str, retrieved_conversations: List[str]
+    ) -> Optional[str]:
+        """Async variant of lookup."""
+        vector = self._normalize(await self.embeddings.aembed_query(question))
+        return self._match(vector, context_key(retrieved_conversations))
+
+    def store(self, question: str, retrieved_conversations: List[str], answer: str) -> None:
+        """Remember ``answer`` for ``question`` asked with this context."""
+        vector = self._normalize(self.embeddings.embed_query(question))
+        self._add(vector, context_key(retrieved_conversations), answer)
+
+    async def astore(
+        self, question: str, retrieved_conversations: List[str], answer: str
+    ) -> None:
+        """Async variant of store."""
+        vector = self._normalize(await self.embeddings.aembed_query(question))
+        self._add(vector, context_key(retrieved_conversations), answer)
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters, current size and hit rate."""
+        with self._lock:
+            counters = dict(self._counters)
+            counters["entries"] = len(self._entries)
+        lookups = counters["hits"] + counters["misses"]
+        counters["hit_rate"] = counters["hits"] / lookups if lookups else 0.0
+        return counters
+
+
+_shared_cache: Optional[SemanticResponseCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_response_cache() -> SemanticResponseCache:
+    """Return the process-wide response cache, creating it on first use."""
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_lock:
+            if _shared_cache is None:
+                _shared_cache = SemanticResponseCache()
+    return _shared_cache
@@ -0,0 +1,344 @@
+"""
+HTTP and Server-Sent-Events serving layer for ConversationBot.
+
+Each worker process compiles one conversation graph and serves every request
+from it:
+
+    POST /chat          {"message": "...", "thread_id": "..."} -> JSON reply
+    POST /chat/stream   same body -> text/event-stream of "token" events, then "done"
+    GET  /healthz       in-flight requests and the limit
+    GET  /metrics       Prometheus text format
+
+At most CHATBOT_SERVER_MAX_IN_FLIGHT requests run per worker; the rest get
+429 with a Retry-After header instead of queueing behind the model. A client
+that disconnects cancels its graph run. Turns of one thread run one at a
+time within a worker; with several workers, route a thread's requests to the
+same worker (sticky routing on thread_id) or concurrent turns can lose one.
+
+    uv run python -m src.chatbot.server --workers 4 --port 8000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from src.chatbot.conversation_bot import ConversationBot
+from src.chatbot.instrumentation import configure_logging
+from src.chatbot.metrics import (
+    REGISTRY,
+    TIME_TO_FIRST_TOKEN,
+    TIME_TO_LAST_TOKEN,
+    Counter,
+)
+
+logger = logging.getLogger(__name__)
+
+SERVER_HOST = os.getenv("CHATBOT_SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("CHATBOT_SERVER_PORT", 8000))
+SERVER_WORKERS = int(os.getenv("CHATBOT_SERVER_WORKERS", 1))
+# Requests one worker runs at once; more are rejected with 429
+MAX_IN_FLIGHT = int(os.getenv("CHATBOT_SERVER_MAX_IN_FLIGHT", 64))
+RETRY_AFTER_SECONDS = int(os.getenv("CHATBOT_SERVER_RETRY_AFTER", 1))
+
+HTTP_REQUESTS = REGISTRY.register(
+    Counter(
+        "chatbot_http_requests_total",
+        "HTTP requests by endpoint and status",
+        ("endpoint", "status"),
+    )
+)
+CLIENT_DISCONNECTS = REGISTRY.register(
+    Counter(
+        "chatbot_http_disconnects_total",
+        "Requests cancelled because the client went away",
+        ("endpoint",),
+    )
+)
+
+
+class InFlightLimiter:
+    """Non-blocking cap on concurrent requests in one event loop."""
+
+    def __init__(self, limit: int = MAX_IN_FLIGHT):
+        self.limit = limit
+        self.in_flight = 0
+
+    def try_acquire(self) -> bool:
+        """Take a slot, or return False if all are in use."""
+        if self.in_flight >= self.limit:
+            return False
+        self.in_flight += 1
+        return True
+
+    def slot(self) -> "Slot":
+        return Slot(self)
+
+
+class Slot:
+    """One acquired request slot; releasing it more than once is a no-op."""
+
+    def __init__(self, limiter: InFlightLimiter):
+        self._limiter = limiter
+        self._held = True
+
+    def release(self) -> None:
+        if self._held:
+            self._held = False
+            self._limiter.in_flight -= 1
+
+
+class ThreadLocks:
+    """
+    One asyncio lock per conversation thread in one event loop.
+
+    Two turns of a thread running at once would both start from the same
+    checkpoint, and the later write would drop the other turn. Locks are
+    removed once nobody holds or waits for them.
+    """
+
+    def __init__(self):
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._users: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def hold(self, thread_id: str) -> AsyncIterator[None]:
+        """Run the block while no other turn of ``thread_id`` is running."""
+        lock = self._locks.setdefault(thread_id, asyncio.Lock())
+        self._users[thread_id] = self._users.get(thread_id, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._users[thread_id] -= 1
+            if not self._users[thread_id]:
+                del self._users[thread_id]
+                del self._locks[thread_id]
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+
+class ChatRequestError(ValueError):
+    """The request body is not a valid chat request."""
+
+
+async def parse_chat_request(request: Request) -> tuple:
+    """(message, thread_id) from a JSON body; a thread ID is made if missing."""
+    try:
+        body = await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise ChatRequestError("Body must be JSON")
+    if not isinstance(body, dict):
+        raise ChatRequestError("Body must be a JSON object")
+    message = body.get("message")
+    if not isinstance(message, str) or not message.strip():
+        raise ChatRequestError('"message" must be a non-empty string')
+    thread_id = body.get("thread_id") or str(uuid.uuid4())
+    return message, str(thread_id)
+
+
+async def wait_for_disconnect(request: Request) -> None:
+    """Return once the client has closed the connection."""
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def rejected(endpoint: str, limiter: InFlightLimiter) -> JSONResponse:
+    HTTP_REQUESTS.inc(endpoint=endpoint, status="429")
+    return JSONResponse(
+        {"error": "Server busy, retry later", "max_in_flight": limiter.limit},
+        status_code=429,
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+    )
+
+
+def bad_request(endpoint: str, error: ChatRequestError) -> JSONResponse:
+    HTTP_REQUESTS.inc(endpoint=endpoint, status="400")
+    return JSONResponse({"error": str(error)}, status_code=400)
+
+
+def create_app(
+    bot: Optional[ConversationBot] = None, max_in_flight: int = MAX_IN_FLIGHT
+) -> Starlette:
+    """
+    Build the ASGI app around one ConversationBot.
+
+    Args:
+        bot: Bot whose graph serves every request (default: a new ConversationBot)
+        max_in_flight: Concurrent requests before new ones get 429
+
+    Returns:
+        Starlette application
+    """
+    if bot is None:
+        # Built by uvicorn: worker processes don't inherit main()'s logging setup
+        configure_logging()
+        bot = ConversationBot()
+    limiter = InFlightLimiter(max_in_flight)
+    thread_locks = ThreadLocks()
+
+    async def run_turn(message: str, thread_id: str) -> str:
+        async with thread_locks.hold(thread_id):
+            return await bot.achat(message, thread_id)
+
+    async def chat(request: Request) -> Response:
+        try:
+            message, thread_id = await parse_chat_request(request)
+        except ChatRequestError as e:
+            return bad_request("chat", e)
+        if not limiter.try_acquire():
+            return rejected("chat", limiter)
+
+        slot = limiter.slot()
+        run = asyncio.ensure_future(run_turn(message, thread_id))
+        disconnect = asyncio.ensure_future(wait_for_disconnect(request))
+        try:
+            await asyncio.wait({run, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+            if not run.done():
+                run.cancel()
+                CLIENT_DISCONNECTS.inc(endpoint="chat")
+                logger.info(f"🔌 Client left, cancelled turn on thread {thread_id}")
+                return Response(status_code=499)
+            response = run.result()
+        except Exception as e:
+            logger.error(f"❌ Chat request failed: {e}")
+            HTTP_REQUESTS.inc(endpoint="chat", status="500")
+            return JSONResponse({"error": "Chat failed"}, status_code=500)
+        finally:
+            disconnect.cancel()
+            slot.release()
+
+        HTTP_REQUESTS.inc(endpoint="chat", status="200")
+        return JSONResponse({"response": response, "thread_id": thread_id})
+
+    async def chat_stream(request: Request) -> Response:
+        try:
+            message, thread_id = await parse_chat_request(request)
+        except ChatRequestError as e:
+            return bad_request("chat_stream", e)
+        if not limiter.try_acquire():
+            return rejected("chat_stream", limiter)
+
+        slot = limiter.slot()
+
+        async def events() -> AsyncIterator[str]:
+            start = time.perf_counter()
+            first_token_ms = None
+            try:
+                yield sse_event("start", {"thread_id": thread_id})
+                async with thread_locks.hold(thread_id):
+                    tokens = bot.achat_stream(message, thread_id)
+                    try:
+                        async for token in tokens:
+                            if first_token_ms is None:
+                                first_token_ms = (time.perf_counter() - start) * 1000
+                                TIME_TO_FIRST_TOKEN.record(first_token_ms)
+                            yield sse_event("token", {"content": token})
+                    finally:
+                        # Stops an unfinished run before the thread's next turn starts
+                        await tokens.aclose()
+                TIME_TO_LAST_TOKEN.record((time.perf_counter() - start) * 1000)
+                yield sse_event("done", {"thread_id": thread_id})
+                HTTP_REQUESTS.inc(endpoint="chat_stream", status="200")
+            except asyncio.CancelledError:
+                # Starlette cancels the response when the client disconnects
+                CLIENT_DISCONNECTS.inc(endpoint="chat_stream")
+                logger.info(f"🔌 Client left, cancelled stream on thread {thread_id}")
+                raise
+            except Exception as e:
+                logger.error(f"❌ Chat stream failed: {e}")
+                HTTP_REQUESTS.inc(endpoint="chat_stream", status="500")
+                yield sse_event("error", {"error": "Chat failed"})
+            finally:
+                slot.release()
+
+        # The background task frees the slot if the stream never started
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            background=BackgroundTask(slot.release),
+        )
+
+    async def healthz(request: Request) -> Response:
+        return JSONResponse(
+            {"status": "ok", "in_flight": limiter.in_flight, "max_in_flight": limiter.limit}
+        )
+
+    async def metrics(request: Request) -> Response:
+        return PlainTextResponse(
+            REGISTRY.render_prometheus(),
+            media_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette) -> AsyncIterator[None]:
+        yield
+        # The async checkpointer's connections belong to this event loop
+        await bot.aclose()
+
+    app = Starlette(
+        lifespan=lifespan,
+        routes=[
+            Route("/chat", chat, methods=["POST"]),
+            Route("/chat/stream", chat_stream, methods=["POST"]),
+            Route("/healthz", healthz, methods=["GET"]),
+            Route("/metrics", metrics, methods=["GET"]),
+        ]
+    )
+    app.state.bot = bot
+    app.state.limiter = limiter
+    app.state.thread_locks = thread_locks
+    return app
+
+
+def main():
+    import uvicorn
+
+    configure_logging()
+    parser = argparse.ArgumentParser(description="Serve ConversationBot over HTTP/SSE")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=SERVER_WORKERS,
+        help="Worker processes, each with its own graph and in-flight limit",
+    )
+    args = parser.parse_args()
+
+    print(
+        f"🚀 Serving ConversationBot on http://{args.host}:{args.port} "
+        f"({args.workers} worker(s), {MAX_IN_FLIGHT} requests in flight each)"
+    )
+    # Workers import the app factory by name, so each builds its own graph
+    uvicorn.run(
+        "src.chatbot.server:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,9 @@ This is a minimal example showing how to use the ConversationBot
 for educational purposes in an AI course.
 """
 
-from dotenv import load_dotenv
 from langchain_core.messages import HumanMessage, AIMessage
 from src.chatbot.conversation_bot import ConversationBot
-
-load_dotenv()
+from src.chatbot.instrumentation import configure_logging
 
 
 def demo_basic_chat():
@@ -79,6 +77,7 @@ def main():
     """
     Run all chatbot examples.
     """
+    configure_logging()
     print("🚀 LangGraph Chatbot Examples")
     print("=" * 50)
     print()
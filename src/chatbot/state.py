@@ -2,7 +2,7 @@
 Shared state definition for the conversation chatbot.
 """
 
-from typing import List
+from typing import Any, Dict, List
 from langgraph.graph import MessagesState
 
 
@@ -10,3 +10,11 @@ class ConversationState(MessagesState):
     """Extended state that includes retrieved conversations."""
 
     retrieved_conversations: List[str] = []
+    # Timing of the latest retrieval: elapsed_ms, deadline_ms, in_budget, p50_ms, p95_ms
+    retrieval_stats: Dict[str, Any] = {}
+    # Rolling summary of turns that fell out of the verbatim history window
+    history_summary: str = ""
+    # Number of leading messages already folded into history_summary
+    summarized_message_count: int = 0
+    # Answer found by the semantic response cache this turn ("" on a miss)
+    cached_answer: str = ""
@@ -0,0 +1,525 @@
+"""
+Conversation store on the native ``conversation_summaries`` table.
+
+Unlike SimpleVectorStore, which writes into langchain_postgres' generic
+collection tables, this store uses the schema from init-db.sql: one row per
+summary with its thread_id and topics, and an HNSW index on the embedding.
+Enable it with ``CHATBOT_VECTOR_BACKEND=summaries``.
+
+Searches are hybrid by default: vector neighbours are fused with full-text and
+topic matches, so exact names (libraries, projects) are found even when the
+embedding blurs them.
+"""
+
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from src.chatbot.coalescing import SingleFlight, vector_key
+from src.chatbot.embedding_cache import CachedEmbeddings, openai_embeddings
+from src.chatbot.instrumentation import configure_logging, timed_db
+from src.chatbot.simple_vector_store import (
+    PoolSettings,
+    database_url,
+    filter_search_results,
+)
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIMENSIONS = 1536  # text-embedding-3-small
+# "hybrid" fuses vector, full-text and topic matches; "vector" is cosine only
+SEARCH_MODE = os.getenv("CHATBOT_SEARCH_MODE", "hybrid")
+RRF_K = 60  # reciprocal-rank fusion damping constant
+HYBRID_CANDIDATES_PER_RESULT = 10  # candidates fetched from each ranking per result
+# Full-text rank a match needs to skip the distance threshold without a topic
+# match (ts_rank_cd gives about 0.1 per occurrence of a query word)
+LEXICAL_MIN_RANK = float(os.getenv("CHATBOT_LEXICAL_MIN_RANK", 0.3))
+
+# Words every summary or chat request contains; they would match every row
+GENERIC_QUERY_WORDS = frozenset(
+    "things thing discussed discuss discussion talk talked topics help use using used"
+    " know tell want need like get make remember conversation chat please".split()
+)
+# Indexed text: the summary without the prompt template's header and labels
+_SUMMARY_TSV_EXPRESSION = (
+    "to_tsvector('english', regexp_replace(summary,"
+    " '^\\s*(here are the things we discussed|topics)\\s*:', '', 'gin'))"
+)
+
+# Reciprocal-rank fusion of the nearest vectors and the best lexical matches
+# (full-text rank, boosted when a query term is one of the summary's topics).
+# "strong" marks lexical matches on a topic or with a high enough rank.
+_HYBRID_SEARCH_SQL = """
+WITH search_terms AS (
+    SELECT to_tsquery('english', :tsquery) AS tsq, CAST(:terms AS text[]) AS terms
+), vector_hits AS (
+    SELECT id, row_number() OVER (ORDER BY distance) AS rank
+    FROM (
+        SELECT id, embedding <=> CAST(:embedding AS vector) AS distance
+        FROM {table}
+        ORDER BY embedding <=> CAST(:embedding AS vector)
+        LIMIT :candidates
+    ) nearest
+), lexical_hits AS (
+    SELECT id, row_number() OVER (ORDER BY relevance DESC) AS rank,
+           topic_match OR text_rank >= :min_rank AS strong
+    FROM (
+        SELECT id, text_rank, topic_match,
+               text_rank + CASE WHEN topic_match THEN 1 ELSE 0 END AS relevance
+        FROM (
+            SELECT id,
+                   ts_rank_cd(summary_tsv, search_terms.tsq) AS text_rank,
+                   topics && search_terms.terms AS topic_match
+            FROM {table}, search_terms
+            WHERE summary_tsv @@ search_terms.tsq OR topics && search_terms.terms
+        ) scored
+        ORDER BY relevance DESC
+        LIMIT :candidates
+    ) matches
+), fused AS (
+    SELECT id, SUM(1.0 / (:rrf_k + rank)) AS score, bool_or(strong) AS strong
+    FROM (
+        SELECT id, rank, false AS strong FROM vector_hits
+        UNION ALL
+        SELECT id, rank, strong FROM lexical_hits
+    ) hits
+    GROUP BY id
+)
+SELECT s.summary, s.embedding <=> CAST(:embedding AS vector) AS distance, fused.strong
+FROM fused JOIN {table} s ON s.id = fused.id
+ORDER BY fused.score DESC
+LIMIT :limit
+"""
+
+
+@dataclass(frozen=True)
+class HnswSettings:
+    """HNSW build and query parameters (see pgvector's README)."""
+
+    m: int = 16  # graph degree: higher improves recall, costs memory and build time
+    ef_construction: int = 64  # candidate list size while building
+    ef_search: int = 40  # candidate list size per query (must be >= the limit)
+
+    @classmethod
+    def from_env(cls) -> "HnswSettings":
+        """Read parameters from CHATBOT_HNSW_* environment variables."""
+        return cls(
+            m=int(os.getenv("CHATBOT_HNSW_M", cls.m)),
+            ef_construction=int(
+                os.getenv("CHATBOT_HNSW_EF_CONSTRUCTION", cls.ef_construction)
+            ),
+            ef_search=int(os.getenv("CHATBOT_HNSW_EF_SEARCH", cls.ef_search)),
+        )
+
+
+def parse_topics(summary: str) -> List[str]:
+    """
+    Topics from the "Topics: a, b, c" line the summarization prompt asks for.
+
+    A multi-word topic ("web development") is followed by its words, so a
+    query naming one of them still matches the topic.
+    """
+    match = re.search(r"^\s*Topics:\s*(.+)$", summary, re.IGNORECASE | re.MULTILINE)
+    if not match:
+        return []
+    topics = []
+    for phrase in match.group(1).split(","):
+        phrase = " ".join(phrase.strip(" .[]").lower().split())
+        words = phrase.split() if " " in phrase else []
+        for topic in [phrase, *words]:
+            if topic and topic not in GENERIC_QUERY_WORDS and topic not in topics:
+                topics.append(topic)
+    return topics
+
+
+def search_terms(query: str) -> List[str]:
+    """Lowercased words of a query, for the full-text and topic match."""
+    terms = []
+    for word in re.findall(r"[a-z0-9]+", query.lower()):
+        if len(word) > 1 and word not in GENERIC_QUERY_WORDS and word not in terms:
+            terms.append(word)
+    return terms
+
+
+def topic_terms(query: str) -> List[str]:
+    """Query words plus its two- and three-word phrases, to match whole topics."""
+    words = re.findall(r"[a-z0-9]+", query.lower())
+    phrases = [
+        " ".join(words[start : start + size])
+        for size in (2, 3)
+        for start in range(len(words) - size + 1)
+    ]
+    return search_terms(query) + list(dict.fromkeys(phrases))
+
+
+def vector_literal(embedding: Sequence[float]) -> str:
+    """pgvector text representation, bound as a parameter and cast to vector."""
+    return "[" + ",".join(repr(float(value)) for value in embedding) + "]"
+
+
+class SummaryStore:
+    """pgvector store on the conversation_summaries table with an HNSW index."""
+
+    def __init__(
+        self,
+        connection: Optional[str] = None,
+        embeddings: Optional[Embeddings] = None,
+        pool_settings: Optional[PoolSettings] = None,
+        hnsw: Optional[HnswSettings] = None,
+        table: str = "conversation_summaries",
+        dimensions: int = EMBEDDING_DIMENSIONS,
+        search_mode: str = SEARCH_MODE,
+    ):
+        """
+        Args:
+            connection: Postgres URL (default: CHATBOT_DATABASE_URL)
+            embeddings: Embeddings for summaries and queries (default: cached OpenAI)
+            pool_settings: Connection pool limits (default: from environment)
+            hnsw: Index build and query parameters (default: from environment)
+            table: Table name (benchmarks use a scratch table)
+            dimensions: Embedding dimensions of the table's vector column
+            search_mode: "hybrid" (vector + full text + topics) or "vector"
+        """
+        self.connection_string = connection or database_url()
+        self.pool_settings = pool_settings or PoolSettings.from_env()
+        self.hnsw = hnsw or HnswSettings.from_env()
+        self.table = table
+        self.dimensions = dimensions
+        self.search_mode = search_mode
+
+        self.embeddings = embeddings or CachedEmbeddings(openai_embeddings())
+        self.engine = create_engine(
+            self.connection_string, **self.pool_settings.engine_args()
+        )
+        self.async_engine: Optional[AsyncEngine] = None
+        self._async_lock = threading.Lock()
+        # Identical concurrent searches share one query
+        self._search_flight = SingleFlight("search")
+
+        self.ensure_schema()
+
+    def ensure_schema(self) -> None:
+        """Create the table and its indexes if missing (mirrors init-db.sql)."""
+        with self.engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+            conn.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                    " id SERIAL PRIMARY KEY,"
+                    " thread_id VARCHAR(255) NOT NULL,"
+                    " summary TEXT NOT NULL,"
+                    " participants TEXT,"
+                    " topics TEXT[],"
+                    " created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),"
+                    " updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),"
+                    f" embedding vector({self.dimensions}))"
+                )
+            )
+            conn.execute(
+                text(
+                    f"CREATE INDEX IF NOT EXISTS {self.table}_thread_id_idx"
+                    f" ON {self.table} (thread_id)"
+                )
+            )
+            # Full-text and topic lookups for hybrid search; columns generated
+            # before the template boilerplate was stripped are rebuilt
+            expression = conn.execute(
+                text(
+                    "SELECT generation_expression FROM information_schema.columns"
+                    " WHERE table_name = :table AND column_name = 'summary_tsv'"
+                ),
+                {"table": self.table},
+            ).scalar()
+            if expression is not None and "regexp_replace" not in expression:
+                conn.execute(text(f"ALTER TABLE {self.table} DROP COLUMN summary_tsv"))
+            conn.execute(
+                text(
+                    f"ALTER TABLE {self.table} ADD COLUMN IF NOT EXISTS summary_tsv"
+                    f" tsvector GENERATED ALWAYS AS ({_SUMMARY_TSV_EXPRESSION}) STORED"
+                )
+            )
+            conn.execute(
+                text(
+                    f"CREATE INDEX IF NOT EXISTS {self.table}_summary_tsv_idx"
+                    f" ON {self.table} USING gin (summary_tsv)"
+                )
+            )
+            conn.execute(
+                text(
+                    f"CREATE INDEX IF NOT EXISTS {self.table}_topics_idx"
+                    f" ON {self.table} USING gin (topics)"
+                )
+            )
+            # The original ivfflat index was built on an empty table; HNSW
+            # needs no training data and keeps recall as rows are added
+            conn.execute(text(f"DROP INDEX IF EXISTS {self.table}_embedding_idx"))
+            conn.execute(
+                text(
+                    f"CREATE INDEX IF NOT EXISTS {self.table}_embedding_hnsw_idx"
+                    f" ON {self.table} USING hnsw (embedding vector_cosine_ops)"
+                    f" WITH (m = {int(self.hnsw.m)},"
+                    f" ef_construction = {int(self.hnsw.ef_construction)})"
+                )
+            )
+
+    def _get_async_engine(self) -> AsyncEngine:
+        """Async psycopg engine, created on first async call."""
+        if self.async_engine is None:
+            with self._async_lock:
+                if self.async_engine is None:
+                    async_url = self.connection_string.replace(
+                        "postgresql://", "postgresql+psycopg://", 1
+                    )
+                    self.async_engine = create_async_engine(
+                        async_url, **self.pool_settings.engine_args()
+                    )
+        return self.async_engine
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.engine.dispose()
+
+    async def aclose(self) -> None:
+        """Close pooled connections, including the async engine."""
+        self.engine.dispose()
+        if self.async_engine is not None:
+            await self.async_engine.dispose()
+
+    def _insert_sql(self):
+        return text(
+            f"INSERT INTO {self.table} (thread_id, summary, topics, embedding)"
+            " VALUES (:thread_id, :summary, :topics, CAST(:embedding AS vector))"
+        )
+
+    def _search_sql(self):
+        return text(
+            "SELECT summary, embedding <=> CAST(:embedding AS vector) AS distance"
+            f" FROM {self.table}"
+            " ORDER BY embedding <=> CAST(:embedding AS vector) LIMIT :limit"
+        )
+
+    def _ef_search_sql(self, limit: int, ef_search: Optional[int]):
+        # SET LOCAL scopes the setting to the query's transaction
+        ef_search = max(int(ef_search or self.hnsw.ef_search), limit)
+        return text(f"SET LOCAL hnsw.ef_search = {ef_search}")
+
+    @staticmethod
+    def _rows(
+        summaries: List[str],
+        embeddings: List[List[float]],
+        thread_ids: Optional[List[Optional[str]]] = None,
+    ) -> List[dict]:
+        thread_ids = thread_ids or [None] * len(summaries)
+        return [
+            {
+                "thread_id": thread_id or "unknown",
+                "summary": summary,
+                "topics": parse_topics(summary),
+                "embedding": vector_literal(embedding),
+            }
+            for summary, embedding, thread_id in zip(summaries, embeddings, thread_ids)
+        ]
+
+    @timed_db
+    def add_embeddings(
+        self,
+        summaries: List[str],
+        embeddings: List[List[float]],
+        thread_ids: Optional[List[Optional[str]]] = None,
+    ) -> None:
+        """Insert pre-embedded summaries in one transaction."""
+        with self.engine.begin() as conn:
+            conn.execute(self._insert_sql(), self._rows(summaries, embeddings, thread_ids))
+
+    def store_conversation(self, summary: str, thread_id: Optional[str] = None) -> None:
+        """Store a conversation summary with its thread ID and topics."""
+        self.store_conversations([summary], [thread_id])
+
+    def store_conversations(
+        self, summaries: List[str], thread_ids: Optional[List[Optional[str]]] = None
+    ) -> None:
+        """Store many summaries with one embeddings request and one insert transaction."""
+        self.add_embeddings(summaries, self.embeddings.embed_documents(summaries), thread_ids)
+        logger.info(f"✅ Stored {len(summaries)} conversation summaries")
+
+    @timed_db
+    async def astore_conversation(
+        self, summary: str, thread_id: Optional[str] = None
+    ) -> None:
+        """Async variant of store_conversation."""
+        embeddings = await self.embeddings.aembed_documents([summary])
+        async with self._get_async_engine().begin() as conn:
+            await conn.execute(
+                self._insert_sql(), self._rows([summary], embeddings, [thread_id])
+            )
+        logger.info(f"✅ Stored conversation summary")
+
+    def _hybrid_sql(self):
+        return text(_HYBRID_SEARCH_SQL.format(table=self.table))
+
+    @staticmethod
+    def _hybrid_candidates(limit: int) -> int:
+        """Rows fetched from each ranking before fusion."""
+        return max(limit * HYBRID_CANDIDATES_PER_RESULT, 20)
+
+    def _hybrid_params(self, query: str, embedding: List[float], limit: int) -> dict:
+        terms = search_terms(query)
+        return {
+            "embedding": vector_literal(embedding),
+            "tsquery": " | ".join(terms),
+            "terms": topic_terms(query),
+            "candidates": self._hybrid_candidates(limit),
+            "rrf_k": RRF_K,
+            "min_rank": LEXICAL_MIN_RANK,
+            "limit": limit,
+        }
+
+    @timed_db
+    def search_by_vector(
+        self, embedding: List[float], limit: int = 2, ef_search: Optional[int] = None
+    ) -> List[tuple]:
+        """(Document, cosine distance) pairs nearest to ``embedding``."""
+        with self.engine.begin() as conn:
+            conn.execute(self._ef_search_sql(limit, ef_search))
+            rows = conn.execute(
+                self._search_sql(),
+                {"embedding": vector_literal(embedding), "limit": limit},
+            ).all()
+        return [(Document(page_content=summary), distance) for summary, distance in rows]
+
+    @timed_db
+    def hybrid_search(
+        self,
+        query: str,
+        embedding: List[float],
+        limit: int = 2,
+        ef_search: Optional[int] = None,
+    ) -> List[tuple]:
+        """
+        Fuse vector and lexical (full text + topics) rankings in one round trip.
+
+        Returns:
+            (Document, cosine distance, strong lexical match) tuples, best first
+        """
+        with self.engine.begin() as conn:
+            # HNSW returns at most ef_search rows, and fusion wants every candidate
+            conn.execute(self._ef_search_sql(self._hybrid_candidates(limit), ef_search))
+            rows = conn.execute(
+                self._hybrid_sql(), self._hybrid_params(query, embedding, limit)
+            ).all()
+        return [(Document(page_content=s), d, lexical) for s, d, lexical in rows]
+
+    def _search_key(
+        self, query: str, embedding: List[float], limit: int, distance_threshold: float
+    ) -> tuple:
+        # Hybrid ranking also matches the query text lexically
+        lexical = query if self.search_mode == "hybrid" else None
+        return vector_key(embedding), lexical, limit, distance_threshold
+
+    def search_conversations(
+        self, query: str, limit: int = 2, distance_threshold: float = 0.8
+    ) -> List[str]:
+        """Search for similar conversations with distance filtering (lower distance = more similar)."""
+        try:
+            embedding = self.embeddings.embed_query(query)
+
+            def search() -> List[str]:
+                if self.search_mode == "hybrid":
+                    results = _threshold_hybrid(
+                        self.hybrid_search(query, embedding, limit), distance_threshold
+                    )
+                else:
+                    results = self.search_by_vector(embedding, limit)
+                return filter_search_results(results, distance_threshold)
+
+            matches = self._search_flight.do(
+                self._search_key(query, embedding, limit, distance_threshold), search
+            )
+            return list(matches)
+
+        except Exception as e:
+            logger.error(f"❌ Search error: {e}")
+            return []
+
+    @timed_db
+    async def asearch_conversations(
+        self, query: str, limit: int = 2, distance_threshold: float = 0.8
+    ) -> List[str]:
+        """Async variant of search_conversations."""
+        try:
+            embedding = await self.embeddings.aembed_query(query)
+
+            async def search() -> List[str]:
+                async with self._get_async_engine().begin() as conn:
+                    if self.search_mode == "hybrid":
+                        await conn.execute(
+                            self._ef_search_sql(self._hybrid_candidates(limit), None)
+                        )
+                        rows = (
+                            await conn.execute(
+                                self._hybrid_sql(),
+                                self._hybrid_params(query, embedding, limit),
+                            )
+                        ).all()
+                        results = _threshold_hybrid(
+                            [(Document(page_content=s), d, strong) for s, d, strong in rows],
+                            distance_threshold,
+                        )
+                    else:
+                        await conn.execute(self._ef_search_sql(limit, None))
+                        rows = (
+                            await conn.execute(
+                                self._search_sql(),
+                                {"embedding": vector_literal(embedding), "limit": limit},
+                            )
+                        ).all()
+                        results = [(Document(page_content=s), d) for s, d in rows]
+                return filter_search_results(results, distance_threshold)
+
+            matches = await self._search_flight.ado(
+                self._search_key(query, embedding, limit, distance_threshold), search
+            )
+            return list(matches)
+
+        except Exception as e:
+            logger.error(f"❌ Search error: {e}")
+            return []
+
+
+def _threshold_hybrid(results: List[tuple], distance_threshold: float) -> List[tuple]:
+    """(Document, distance) pairs where strong lexical matches pass the threshold.
+
+    Weak full-text matches (a common word, no topic) are held to the distance
+    threshold like vector neighbours.
+    """
+    return [
+        (doc, min(distance, distance_threshold) if strong else distance)
+        for doc, distance, strong in results
+    ]
+
+
+if __name__ == "__main__":
+    """Test the conversation_summaries store."""
+    configure_logging()
+    print("🧪 Testing Summary Store...")
+
+    store = SummaryStore()
+    store.store_conversation(
+        summary=(
+            "Here are the things we discussed:\n"
+            "- Choosing FastAPI for a REST API\n\n"
+            "Topics: python, fastapi, web development"
+        ),
+        thread_id="demo-thread",
+    )
+
+    for result in store.search_conversations("web development", limit=2):
+        print(f"📄 {result}")
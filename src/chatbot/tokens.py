@@ -0,0 +1,79 @@
+"""
+Token counting helpers for prompt budgeting.
+
+Encodings are loaded once per process and counts are memoized per text, so
+re-counting a long thread each turn only tokenizes the new messages.
+"""
+
+import logging
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Optional
+
+from langchain_core.messages import BaseMessage
+
+if TYPE_CHECKING:
+    import tiktoken
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_MODEL = "gpt-4o"
+# Role and separator tokens OpenAI adds around every chat message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str = DEFAULT_TOKEN_MODEL) -> Optional["tiktoken.Encoding"]:
+    """tiktoken encoding for ``model`` (None if it cannot be loaded, e.g. offline)."""
+    try:
+        import tiktoken
+
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning(f"⚠️ tiktoken encoding unavailable ({type(e).__name__}); estimating tokens from characters")
+        return None
+
+
+@lru_cache(maxsize=8192)
+def count_tokens(text: str, model: str = DEFAULT_TOKEN_MODEL) -> int:
+    """Number of tokens in ``text`` (about 4 characters per token as a fallback)."""
+    encoding = get_encoding(model)
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def message_text(message: BaseMessage) -> str:
+    """Plain text of a message, including text parts of multimodal content."""
+    if isinstance(message.content, str):
+        return message.content
+    return " ".join(
+        part if isinstance(part, str) else str(part.get("text", ""))
+        for part in message.content
+    )
+
+
+def count_message_tokens(
+    messages: List[BaseMessage], model: str = DEFAULT_TOKEN_MODEL
+) -> int:
+    """Approximate prompt tokens for a list of chat messages."""
+    return sum(
+        count_tokens(message_text(message), model) + MESSAGE_OVERHEAD_TOKENS
+        for message in messages
+    )
+
+
+def truncate_to_tokens(
+    text: str, max_tokens: int, model: str = DEFAULT_TOKEN_MODEL
+) -> str:
+    """Longest prefix of ``text`` that is at most ``max_tokens`` tokens."""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    encoding = get_encoding(model)
+    if encoding is None:
+        return text[: max_tokens * 4]
+    tokens = encoding.encode(text, disallowed_special=())
+    # Cutting mid-character can leave a broken byte sequence at the end
+    return encoding.decode(tokens[:max_tokens]).rstrip("�")
@@ -0,0 +1,362 @@
+"""
+Write-behind queue for conversation summaries.
+
+When a conversation ends, its transcript is appended to a SQLite journal and
+the user gets an answer right away. Background workers claim batches of
+transcripts, summarize them concurrently, embed all summaries in one request
+and insert them in one transaction. Failed batches are retried with backoff,
+and entries left in flight by a crash are picked up again on the next start.
+"""
+
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from src.chatbot.simple_vector_store import SimpleVectorStore, get_vector_store
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOURNAL_PATH = os.getenv(
+    "CHATBOT_WRITE_BEHIND_PATH", ".cache/write_behind.sqlite"
+)
+# Set CHATBOT_WRITE_BEHIND=0 to summarize and store inline on quit
+WRITE_BEHIND_ENABLED = os.getenv("CHATBOT_WRITE_BEHIND", "1") != "0"
+
+
+@dataclass(frozen=True)
+class WriteBehindSettings:
+    """Batching and retry settings for the write-behind workers."""
+
+    batch_size: int = 16
+    workers: int = 2
+    poll_interval_seconds: float = 1.0
+    max_attempts: int = 5
+    retry_base_seconds: float = 2.0
+    # An entry claimed longer ago than this is assumed lost and claimed again
+    lease_seconds: float = 300.0
+    # How long to keep draining the queue when the process exits
+    drain_seconds: float = 10.0
+
+    @classmethod
+    def from_env(cls) -> "WriteBehindSettings":
+        """Read settings from CHATBOT_WRITE_BEHIND_* environment variables."""
+        return cls(
+            batch_size=int(os.getenv("CHATBOT_WRITE_BEHIND_BATCH", cls.batch_size)),
+            workers=int(os.getenv("CHATBOT_WRITE_BEHIND_WORKERS", cls.workers)),
+            max_attempts=int(
+                os.getenv("CHATBOT_WRITE_BEHIND_MAX_ATTEMPTS", cls.max_attempts)
+            ),
+            drain_seconds=float(
+                os.getenv("CHATBOT_WRITE_BEHIND_DRAIN_SECONDS", cls.drain_seconds)
+            ),
+        )
+
+
+class SummaryJournal:
+    """Durable SQLite journal of transcripts waiting to be summarized and stored."""
+
+    def __init__(self, db_path: str = DEFAULT_JOURNAL_PATH):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        # Server worker processes share one journal file; wait for its write lock
+        self._db = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pending_summaries ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " thread_id TEXT,"
+            " transcript TEXT NOT NULL,"
+            " status TEXT NOT NULL DEFAULT 'pending',"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " available_at REAL NOT NULL,"
+            " claimed_at REAL,"
+            " last_error TEXT)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS pending_summaries_status"
+            " ON pending_summaries (status, available_at)"
+        )
+        self._db.commit()
+
+    def append(self, transcript: str, thread_id: Optional[str] = None) -> int:
+        """Durably record a transcript and return its journal ID."""
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO pending_summaries (thread_id, transcript, available_at)"
+                " VALUES (?, ?, ?)",
+                (thread_id, transcript, time.time()),
+            )
+            self._db.commit()
+            return cursor.lastrowid
+
+    def claim(
+        self, limit: int, lease_seconds: float
+    ) -> List[Tuple[int, Optional[str], str, int]]:
+        """
+        Claim up to ``limit`` due entries for processing.
+
+        Returns:
+            (id, thread_id, transcript, attempts) tuples
+        """
+        now = time.time()
+        with self._lock:
+            # Worker processes share the journal: take the write lock before
+            # reading, and select and mark the rows in one statement
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._db.execute(
+                    "UPDATE pending_summaries SET status = 'in_progress', claimed_at = ?"
+                    " WHERE id IN ("
+                    "   SELECT id FROM pending_summaries"
+                    "   WHERE (status = 'pending' AND available_at <= ?)"
+                    "      OR (status = 'in_progress' AND claimed_at < ?)"
+                    "   ORDER BY id LIMIT ?)"
+                    " RETURNING id, thread_id, transcript, attempts",
+                    (now, now, now - lease_seconds, limit),
+                ).fetchall()
+                self._db.commit()
+            except Exception:
+                self._db.rollback()
+                raise
+        return sorted(rows)
+
+    def complete(self, ids: List[int]) -> None:
+        """Drop entries that have been stored."""
+        with self._lock:
+            self._db.executemany(
+                "DELETE FROM pending_summaries WHERE id = ?", [(i,) for i in ids]
+            )
+            self._db.commit()
+
+    def retry(self, ids: List[int], error: str, settings: WriteBehindSettings) -> None:
+        """Reschedule entries with exponential backoff, or mark them failed."""
+        now = time.time()
+        with self._lock:
+            for entry_id in ids:
+                (attempts,) = self._db.execute(
+                    "SELECT attempts + 1 FROM pending_summaries WHERE id = ?",
+                    (entry_id,),
+                ).fetchone()
+                status = "failed" if attempts >= settings.max_attempts else "pending"
+                delay = settings.retry_base_seconds * 2 ** (attempts - 1)
+                self._db.execute(
+                    "UPDATE pending_summaries SET status = ?, attempts = ?,"
+                    " available_at = ?, claimed_at = NULL, last_error = ? WHERE id = ?",
+                    (status, attempts, now + delay, error[:500], entry_id),
+                )
+            self._db.commit()
+
+    def counts(self) -> Dict[str, int]:
+        """Number of entries per status."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT status, COUNT(*) FROM pending_summaries GROUP BY status"
+            ).fetchall()
+        return dict(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class WriteBehindQueue:
+    """
+    Acknowledge conversation saves immediately and store them in the background.
+
+    Features:
+    - Durable: transcripts are journaled to SQLite before the save is acknowledged
+    - Batched: one embeddings request and one insert transaction per batch
+    - Retries with exponential backoff; in-flight entries survive a crash
+    """
+
+    def __init__(
+        self,
+        vector_store: Optional[SimpleVectorStore] = None,
+        journal: Optional[SummaryJournal] = None,
+        settings: Optional[WriteBehindSettings] = None,
+    ):
+        """
+        Args:
+            vector_store: Destination store (default: shared pooled store)
+            journal: Journal to read from and write to (default: DEFAULT_JOURNAL_PATH)
+            settings: Batching and retry settings (default: from environment)
+        """
+        self._vector_store = vector_store
+        self.journal = journal or SummaryJournal()
+        self.settings = settings or WriteBehindSettings.from_env()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._workers: List[threading.Thread] = []
+
+    @property
+    def vector_store(self) -> SimpleVectorStore:
+        return self._vector_store or get_vector_store()
+
+    def enqueue(self, transcript: str, thread_id: Optional[str] = None) -> int:
+        """Journal a transcript for summarization and wake a worker."""
+        entry_id = self.journal.append(transcript, thread_id)
+        self._wakeup.set()
+        return entry_id
+
+    def process_batch(self) -> int:
+        """
+        Summarize and store one batch of due entries.
+
+        Returns:
+            Number of entries claimed
+        """
+        # Imported here: the storage node module imports this one
+        from src.chatbot.nodes.storage import get_summarization_chain
+
+        batch = self.journal.claim(self.settings.batch_size, self.settings.lease_seconds)
+        if not batch:
+            return 0
+
+        chain = get_summarization_chain()
+        responses = chain.batch(
+            [{"conversation_text": transcript} for _, _, transcript, _ in batch],
+            config={"max_concurrency": self.settings.batch_size},
+            return_exceptions=True,
+        )
+
+        stored, failed, errors = [], [], []
+        summaries, thread_ids = [], []
+        for (entry_id, thread_id, _, _), response in zip(batch, responses):
+            if isinstance(response, Exception):
+                failed.append(entry_id)
+                errors.append(str(response))
+                continue
+            summary = response.content.strip()
+            if summary:
+                summaries.append(summary)
+                thread_ids.append(thread_id)
+            stored.append(entry_id)
+
+        if summaries:
+            try:
+                self.vector_store.store_conversations(summaries, thread_ids=thread_ids)
+            except Exception as e:
+                failed.extend(stored)
+                errors.append(str(e))
+                stored = []
+
+        if stored:
+            self.journal.complete(stored)
+        if failed:
+            logger.error(f"❌ Write-behind batch error, will retry {len(failed)}: {errors[0]}")
+            self.journal.retry(failed, errors[0], self.settings)
+        return len(batch)
+
+    def start(self) -> None:
+        """Start the worker threads (idempotent); entries left by a crash are replayed."""
+        if self._workers:
+            return
+        counts = self.journal.counts()
+        leftover = counts.get("pending", 0) + counts.get("in_progress", 0)
+        if leftover:
+            logger.info(f"🔁 Replaying {leftover} journaled conversation(s)")
+
+        def run() -> None:
+            while not self._stop.is_set():
+                try:
+                    if self.process_batch():
+                        continue
+                except Exception as e:
+                    logger.error(f"❌ Write-behind worker error: {e}")
+                self._wakeup.wait(self.settings.poll_interval_seconds)
+                self._wakeup.clear()
+
+        for index in range(self.settings.workers):
+            worker = threading.Thread(
+                target=run, name=f"write-behind-{index}", daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until no entries are pending or in progress.
+
+        Returns:
+            True if the queue drained before ``timeout``
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            counts = self.journal.counts()
+            if not counts.get("pending") and not counts.get("in_progress"):
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            self._wakeup.set()
+            time.sleep(0.05)
+
+    def close(self, drain_seconds: Optional[float] = None) -> None:
+        """Drain for up to ``drain_seconds`` (default: settings), then stop workers."""
+        if self._workers:
+            timeout = self.settings.drain_seconds if drain_seconds is None else drain_seconds
+            if not self.drain(timeout):
+                logger.info("ℹ️ Unsaved conversations stay journaled for the next start.")
+        self._stop.set()
+        self._wakeup.set()
+        for worker in self._workers:
+            worker.join(timeout=1)
+        self._workers = []
+        self.journal.close()
+
+
+_shared_queue: Optional[WriteBehindQueue] = None
+_shared_lock = threading.Lock()
+
+
+def get_write_queue() -> WriteBehindQueue:
+    """Return the process-wide write-behind queue, starting its workers on first use."""
+    global _shared_queue
+    if _shared_queue is None:
+        with _shared_lock:
+            if _shared_queue is None:
+                _shared_queue = WriteBehindQueue()
+                _shared_queue.start()
+                atexit.register(_shared_queue.close)
+    return _shared_queue
+
+
+if __name__ == "__main__":
+    """Demo: queue a few transcripts and drain them into a fake store."""
+    import tempfile
+
+    from src.chatbot.benchmarks.fakes import FakeChatModel, FakeVectorStore
+    from src.chatbot.instrumentation import configure_logging
+    from src.llm import override_chat_model
+
+    configure_logging()
+    print("🧪 Testing Write-Behind Queue...")
+    override_chat_model(
+        "openai:gpt-4o-mini", FakeChatModel(response="Discussed Docker.", latency_ms=200)
+    )
+    store = FakeVectorStore(latency_ms=50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = WriteBehindQueue(
+            vector_store=store, journal=SummaryJournal(os.path.join(tmp, "journal.sqlite"))
+        )
+        queue.start()
+
+        start = time.perf_counter()
+        for index in range(20):
+            queue.enqueue(f"Human: question {index}\nAI: answer {index}\n", f"thread-{index}")
+        print(f"✅ Acknowledged 20 saves in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+        queue.drain(timeout=10)
+        print(
+            f"✅ Stored {len(store.stored)} summaries in "
+            f"{(time.perf_counter() - start) * 1000:.0f}ms ({store.store_calls} store calls)"
+        )
+        queue.close()
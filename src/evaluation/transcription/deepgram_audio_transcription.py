@@ -3,7 +3,6 @@ import os
 from pathlib import Path
 import time as t
 
-from deepgram import DeepgramClient, FileSource, PrerecordedOptions
 from dotenv import load_dotenv
 
 PREFIXES = [
@@ -12,10 +11,13 @@ PREFIXES = [
     # "Unlock Advanced RAG Secrets： LangChain Tutorial Finale",
     # "Unlock the Power of LangChain： Deploying to Production Made Easy",
 ]
-load_dotenv()
 
 
 async def main(prefixes):
+    from deepgram import DeepgramClient, FileSource, PrerecordedOptions
+
+    load_dotenv()
+
     # Get the current script's directory
     script_dir = Path(__file__).parent
     audio_dir = script_dir.parent / "audio"
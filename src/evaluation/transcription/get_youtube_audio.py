@@ -1,5 +1,3 @@
-import yt_dlp
-
 videos = [
     "https://www.youtube.com/watch?v=UwgZmrRAgQ4",
     "https://www.youtube.com/watch?v=xFWllDS6ZRw",
@@ -9,6 +7,8 @@ videos = [
 
 
 def download_audio(link):
+    import yt_dlp
+
     with yt_dlp.YoutubeDL(
         {"extract_audio": True, "format": "bestaudio", "outtmpl": "%(title)s.mp3"}
     ) as video:
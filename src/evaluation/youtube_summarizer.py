@@ -3,13 +3,10 @@ from operator import itemgetter
 
 from dotenv import load_dotenv
 from langchain_core.prompts import ChatPromptTemplate
-from langchain.chat_models import init_chat_model
 from langsmith import traceable
 
 from src.evaluation.prompts.summarize_transcript import summarize_transcript_prompt
-
-load_dotenv()
-llm = init_chat_model("openai:gpt-4o", temperature=0)
+from src.llm import Priority, get_chain
 
 files = [
     "Chat With Your PDFs： Part 1 - An End to End LangChain Tutorial.txt",
@@ -28,14 +25,18 @@ def get_file_contents(file_name):
 
 @traceable
 def summarize_transcript(file_text):
-    PROMPT_TEMPLATE = ChatPromptTemplate.from_template(summarize_transcript_prompt)
-
     # You don't need the passthrough for this one. I was a derp.
     # rag_chain = RunnablePassthrough(
     #     transcript=itemgetter("transcript")
     # )   PROMPT_TEMPLATE | llm
 
-    rag_chain = PROMPT_TEMPLATE | llm
+    rag_chain = get_chain(
+        "summarize_transcript",
+        lambda: ChatPromptTemplate.from_template(summarize_transcript_prompt),
+        "openai:gpt-4o",
+        priority=Priority.BACKGROUND,
+        temperature=0,
+    )
 
     return rag_chain.invoke(
         {
@@ -45,6 +46,7 @@ def summarize_transcript(file_text):
 
 
 def main():
+    load_dotenv()
     for file in files:
         file_text = get_file_contents(file)
         summary = summarize_transcript(file_text)
@@ -0,0 +1,15 @@
+"""
+Shared model clients for the course examples.
+"""
+
+from .rate_limit import Priority, get_rate_limiter
+from .registry import clear_registry, get_chain, get_chat_model, override_chat_model
+
+__all__ = [
+    "Priority",
+    "clear_registry",
+    "get_chain",
+    "get_chat_model",
+    "get_rate_limiter",
+    "override_chat_model",
+]
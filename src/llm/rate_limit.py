@@ -0,0 +1,533 @@
+"""
+Rate-limit-aware scheduling of chat model calls.
+
+Every call through a model from ``get_chat_model`` first reserves one request
+and its estimated tokens from the model's RPM and TPM token buckets. Callers
+that find a bucket empty wait in a priority queue, so interactive chat goes
+ahead of background summarization and profile work. Once the call returns,
+the estimate is settled against the reported usage. Rate-limited (429) and
+transient failures are retried with jittered backoff, honouring Retry-After;
+a 429 also pauses the model for every other caller, so retries don't storm.
+
+    LLM_RATE_LIMITS="gpt-4o=500:30000,gpt-4o-mini=500:200000"  (RPM:TPM per model)
+    LLM_RATE_LIMIT=0      disable scheduling (the OpenAI client retries instead)
+    LLM_MAX_RETRIES=4     attempts after the first
+
+Models without configured limits are not throttled, but still get priority
+ordering during a 429 pause and the shared retry policy.
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+
+RATE_LIMIT_ENABLED = os.getenv("LLM_RATE_LIMIT", "1") != "0"
+RATE_LIMITS_SPEC = os.getenv("LLM_RATE_LIMITS", "")
+# Bucket capacity in seconds of quota; OpenAI enforces limits over short windows
+BURST_SECONDS = float(os.getenv("LLM_RATE_LIMIT_BURST_SECONDS", 10))
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 4))
+RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", 0.5))
+RETRY_MAX_SECONDS = float(os.getenv("LLM_RETRY_MAX_SECONDS", 30))
+# Completion tokens reserved when a call sets no max_tokens
+COMPLETION_TOKEN_ESTIMATE = int(os.getenv("LLM_COMPLETION_TOKEN_ESTIMATE", 256))
+# How often an async waiter that is not at the head of the queue re-checks
+ASYNC_POLL_SECONDS = 0.01
+
+
+class Priority(IntEnum):
+    """Queue order when a model's quota runs short (lower goes first)."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+@dataclass(frozen=True)
+class ModelLimits:
+    """Requests and tokens per minute allowed for one model."""
+
+    rpm: float = 0.0  # 0 is unlimited
+    tpm: float = 0.0
+
+
+def parse_limits(spec: str) -> Dict[str, ModelLimits]:
+    """Parse "model=RPM:TPM,..." (either number may be empty for no limit)."""
+    limits = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, values = entry.partition("=")
+        rpm, _, tpm = values.partition(":")
+        limits[name.strip()] = ModelLimits(float(rpm or 0), float(tpm or 0))
+    return limits
+
+
+class TokenBucket:
+    """Continuously refilled quota; not thread-safe on its own."""
+
+    def __init__(self, per_minute: float, burst_seconds: float = BURST_SECONDS):
+        self.rate = per_minute / 60
+        # Room for at least one whole request, however low the limit
+        self.capacity = max(self.rate * burst_seconds, 1.0)
+        self.available = self.capacity
+        self._updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    def _refill(self, now: float) -> None:
+        self.available = min(
+            self.capacity, self.available + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` can be taken (0 if it can now)."""
+        if self.unlimited:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.available) / self.rate)
+
+    def take(self, amount: float) -> None:
+        if not self.unlimited:
+            self.available -= min(amount, self.capacity)
+
+    def adjust(self, amount: float) -> None:
+        """Return (positive) or charge (negative) quota after the fact."""
+        if not self.unlimited:
+            self.available = min(self.capacity, self.available + amount)
+
+
+class ModelScheduler:
+    """Token buckets and the priority queue of callers for one model."""
+
+    def __init__(self, model: str, limits: ModelLimits, window: int = 1000):
+        self.model = model
+        self.limits = limits
+        self.requests = TokenBucket(limits.rpm)
+        self.tokens = TokenBucket(limits.tpm)
+        self._queue: List[Tuple[int, int]] = []  # heap of (priority, sequence)
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._paused_until = 0.0
+        self._waits: Dict[Priority, Deque[float]] = {
+            priority: deque(maxlen=window) for priority in Priority
+        }
+        self.granted = 0
+        self.rate_limited = 0
+
+    def _enqueue(self, priority: Priority) -> Tuple[int, int]:
+        ticket = (int(priority), next(self._sequence))
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            # A new head of the queue may change who should be waiting
+            self._cond.notify_all()
+        return ticket
+
+    def _dequeue(self, ticket: Tuple[int, int]) -> None:
+        with self._cond:
+            if ticket in self._queue:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+
+    def _try_grant(self, ticket: Tuple[int, int], tokens: int) -> Optional[float]:
+        """
+        Take quota for ``ticket`` if it is first in line and quota is there.
+
+        Returns:
+            0 when granted, seconds to wait for quota when first in line,
+            or None when another caller is ahead
+        """
+        if self._queue[0] != ticket:
+            return None
+        now = time.monotonic()
+        wait = max(
+            self._paused_until - now,
+            self.requests.wait_time(1, now),
+            self.tokens.wait_time(tokens, now),
+        )
+        if wait > 0:
+            return wait
+        self.requests.take(1)
+        self.tokens.take(tokens)
+        heapq.heappop(self._queue)
+        self.granted += 1
+        self._cond.notify_all()
+        return 0.0
+
+    def _record_wait(self, priority: Priority, started: float) -> float:
+        waited = time.monotonic() - started
+        with self._cond:
+            self._waits[priority].append(waited * 1000)
+        return waited
+
+    def acquire(self, tokens: int, priority: Priority = Priority.INTERACTIVE) -> float:
+        """Block until one request and ``tokens`` are available; returns seconds waited."""
+        started = time.monotonic()
+        ticket = self._enqueue(priority)
+        try:
+            with self._cond:
+                while True:
+                    wait = self._try_grant(ticket, tokens)
+                    if wait == 0:
+                        break
+                    self._cond.wait(timeout=wait)
+        except BaseException:
+            self._dequeue(ticket)
+            raise
+        return self._record_wait(priority, started)
+
+    async def aacquire(
+        self, tokens: int, priority: Priority = Priority.INTERACTIVE
+    ) -> float:
+        """Async variant of acquire; waits without blocking the event loop."""
+        started = time.monotonic()
+        ticket = self._enqueue(priority)
+        try:
+            while True:
+                with self._cond:
+                    wait = self._try_grant(ticket, tokens)
+                if wait == 0:
+                    break
+                await asyncio.sleep(ASYNC_POLL_SECONDS if wait is None else wait)
+        except BaseException:
+            self._dequeue(ticket)
+            raise
+        return self._record_wait(priority, started)
+
+    def settle(self, estimated: int, actual: int) -> None:
+        """Correct the token bucket once a call's real usage is known."""
+        with self._cond:
+            self.tokens.adjust(estimated - actual)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller back, e.g. for the Retry-After of a 429."""
+        with self._cond:
+            self.rate_limited += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and wait percentiles (ms) per priority."""
+        with self._cond:
+            depth = {priority.name.lower(): 0 for priority in Priority}
+            for priority, _ in self._queue:
+                depth[Priority(priority).name.lower()] += 1
+            waits = {priority: sorted(samples) for priority, samples in self._waits.items()}
+            stats = {"granted": self.granted, "rate_limited": self.rate_limited}
+        stats["queue_depth"] = depth
+        for priority, ordered in waits.items():
+            name = priority.name.lower()
+            stats[f"{name}_wait_p50_ms"] = _nearest_rank(ordered, 50)
+            stats[f"{name}_wait_p95_ms"] = _nearest_rank(ordered, 95)
+        return stats
+
+
+def _nearest_rank(ordered: List[float], pct: float) -> Optional[float]:
+    if not ordered:
+        return None
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return round(ordered[index], 2)
+
+
+WaitObserver = Callable[[str, Priority, float], None]
+
+
+class RateLimiter:
+    """Process-wide schedulers for every model, created on first use."""
+
+    def __init__(self, limits: Optional[Dict[str, ModelLimits]] = None):
+        """
+        Args:
+            limits: Per-model limits (default: parsed from LLM_RATE_LIMITS)
+        """
+        self.limits = limits if limits is not None else parse_limits(RATE_LIMITS_SPEC)
+        self._schedulers: Dict[str, ModelScheduler] = {}
+        self._observers: List[WaitObserver] = []
+        self._lock = threading.Lock()
+
+    def scheduler(self, model: str) -> ModelScheduler:
+        with self._lock:
+            if model not in self._schedulers:
+                self._schedulers[model] = ModelScheduler(
+                    model, self.limits.get(model, ModelLimits())
+                )
+            return self._schedulers[model]
+
+    def add_wait_observer(self, observer: WaitObserver) -> None:
+        """Call ``observer(model, priority, wait_ms)`` after every acquire."""
+        self._observers.append(observer)
+
+    def notify_wait(self, model: str, priority: Priority, waited: float) -> None:
+        for observer in self._observers:
+            observer(model, priority, waited * 1000)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            schedulers = dict(self._schedulers)
+        return {model: scheduler.stats() for model, scheduler in schedulers.items()}
+
+
+_shared_limiter: Optional[RateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the process-wide rate limiter, creating it on first use."""
+    global _shared_limiter
+    if _shared_limiter is None:
+        with _shared_lock:
+            if _shared_limiter is None:
+                _shared_limiter = RateLimiter()
+    return _shared_limiter
+
+
+def estimate_tokens(messages: List[BaseMessage], completion_tokens: int) -> int:
+    """
+    Prompt plus completion tokens a call may use.
+
+    About 4 characters per token: cheaper than tokenizing every prompt, and
+    the bucket is settled against real usage afterwards anyway.
+    """
+    characters = sum(len(str(message.content)) for message in messages)
+    return characters // 4 + 4 * len(messages) + completion_tokens
+
+
+def is_retryable(error: BaseException) -> bool:
+    """429s, server errors, timeouts and dropped connections."""
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status in (408, 409, 429) or status >= 500
+    return any(
+        cls.__name__ in ("APIConnectionError", "APITimeoutError")
+        for cls in type(error).__mro__
+    )
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the API asked us to wait (retry-after-ms or retry-after), if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def retry_delay(attempt: int, error: BaseException) -> float:
+    """Retry-After when given, else capped exponential backoff; both jittered."""
+    delay = retry_after(error)
+    if delay is None:
+        delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2**attempt)
+    return delay * random.uniform(1.0, 1.25)
+
+
+class RateLimitedChatModel(BaseChatModel):
+    """Chat model wrapper that schedules and retries every call of ``inner``."""
+
+    inner: BaseChatModel
+    limit_key: str
+    priority: Priority = Priority.INTERACTIVE
+
+    @property
+    def _llm_type(self) -> str:
+        return self.inner._llm_type
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return self.inner._identifying_params
+
+    def get_name(self, suffix: Optional[str] = None, *, name: Optional[str] = None) -> str:
+        # Traces and metrics show the wrapped model
+        return self.inner.get_name(suffix, name=name)
+
+    def _get_ls_params(self, stop: Optional[List[str]] = None, **kwargs: Any):
+        return self.inner._get_ls_params(stop=stop, **kwargs)
+
+    def _should_stream(self, *, async_api: bool, **kwargs: Any) -> bool:
+        # Stream exactly when the wrapped model would
+        return self.inner._should_stream(async_api=async_api, **kwargs)
+
+    def _estimate(self, messages: List[BaseMessage], kwargs: Dict[str, Any]) -> int:
+        completion = (
+            kwargs.get("max_tokens")
+            or getattr(self.inner, "max_tokens", None)
+            or COMPLETION_TOKEN_ESTIMATE
+        )
+        return estimate_tokens(messages, completion)
+
+    def _scheduler(self) -> ModelScheduler:
+        return get_rate_limiter().scheduler(self.limit_key)
+
+    def _acquire(self, tokens: int) -> ModelScheduler:
+        scheduler = self._scheduler()
+        waited = scheduler.acquire(tokens, self.priority)
+        get_rate_limiter().notify_wait(self.limit_key, self.priority, waited)
+        return scheduler
+
+    async def _aacquire(self, tokens: int) -> ModelScheduler:
+        scheduler = self._scheduler()
+        waited = await scheduler.aacquire(tokens, self.priority)
+        get_rate_limiter().notify_wait(self.limit_key, self.priority, waited)
+        return scheduler
+
+    def _should_retry(
+        self, scheduler: ModelScheduler, attempt: int, error: BaseException
+    ) -> Optional[float]:
+        """Seconds to back off before retrying ``error``, or None to give up."""
+        if attempt >= MAX_RETRIES or not is_retryable(error):
+            return None
+        delay = retry_delay(attempt, error)
+        if getattr(error, "status_code", None) == 429:
+            scheduler.pause(delay)
+        return delay
+
+    @staticmethod
+    def _usage(result: ChatResult) -> Optional[int]:
+        for generation in result.generations:
+            usage = getattr(generation.message, "usage_metadata", None)
+            if usage:
+                return usage.get("total_tokens")
+        return None
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        estimated = self._estimate(messages, kwargs)
+        for attempt in itertools.count():
+            scheduler = self._acquire(estimated)
+            try:
+                result = self.inner._generate(
+                    messages, stop=stop, run_manager=run_manager, **kwargs
+                )
+            except Exception as e:
+                delay = self._should_retry(scheduler, attempt, e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            actual = self._usage(result)
+            if actual is not None:
+                scheduler.settle(estimated, actual)
+            return result
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        estimated = self._estimate(messages, kwargs)
+        for attempt in itertools.count():
+            scheduler = await self._aacquire(estimated)
+            try:
+                result = await self.inner._agenerate(
+                    messages, stop=stop, run_manager=run_manager, **kwargs
+                )
+            except Exception as e:
+                delay = self._should_retry(scheduler, attempt, e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            actual = self._usage(result)
+            if actual is not None:
+                scheduler.settle(estimated, actual)
+            return result
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        estimated = self._estimate(messages, kwargs)
+        for attempt in itertools.count():
+            scheduler = self._acquire(estimated)
+            started, actual = False, None
+            try:
+                # BaseChatModel.stream reports the tokens to callbacks itself
+                for chunk in self.inner._stream(messages, stop=stop, **kwargs):
+                    started = True
+                    usage = getattr(chunk.message, "usage_metadata", None)
+                    if usage:
+                        actual = (actual or 0) + usage.get("total_tokens", 0)
+                    yield chunk
+            except Exception as e:
+                # Once tokens have gone out the call cannot be replayed
+                delay = None if started else self._should_retry(scheduler, attempt, e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            if actual is not None:
+                scheduler.settle(estimated, actual)
+            return
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        estimated = self._estimate(messages, kwargs)
+        for attempt in itertools.count():
+            scheduler = await self._aacquire(estimated)
+            started, actual = False, None
+            try:
+                async for chunk in self.inner._astream(messages, stop=stop, **kwargs):
+                    started = True
+                    usage = getattr(chunk.message, "usage_metadata", None)
+                    if usage:
+                        actual = (actual or 0) + usage.get("total_tokens", 0)
+                    yield chunk
+            except Exception as e:
+                delay = None if started else self._should_retry(scheduler, attempt, e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            if actual is not None:
+                scheduler.settle(estimated, actual)
+            return
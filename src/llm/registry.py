@@ -0,0 +1,154 @@
+"""
+Process-wide registry of chat models and prompt | model chains.
+
+Building a chat model (client, HTTP connection pool) and compiling a prompt
+chain costs time on every call, so each is built once per
+(provider, model, params) and reused. OpenAI models share one keep-alive
+HTTP client, so repeated calls reuse warm connections to the API.
+
+Models are handed out wrapped in a RateLimitedChatModel (see rate_limit.py),
+so every call shares per-model RPM/TPM budgets and one retry policy.
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import Runnable
+
+from .rate_limit import RATE_LIMIT_ENABLED, Priority, RateLimitedChatModel
+
+ModelKey = Tuple[str, str, Tuple[Tuple[str, Hashable], ...]]
+
+_lock = threading.RLock()
+_models: Dict[ModelKey, BaseChatModel] = {}
+_chains: Dict[Tuple[str, ModelKey, Priority], Runnable] = {}
+_overrides: Dict[str, BaseChatModel] = {}
+_limited: Dict[Tuple[ModelKey, Priority], BaseChatModel] = {}
+_http_clients: Dict[str, Any] = {}
+
+
+def _split_model(model: str) -> Tuple[str, str]:
+    """Split "provider:model" into its parts (provider defaults to openai)."""
+    if ":" in model:
+        provider, name = model.split(":", 1)
+        return provider, name
+    return "openai", model
+
+
+def _model_key(model: str, params: Dict[str, Hashable]) -> ModelKey:
+    provider, name = _split_model(model)
+    return provider, name, tuple(sorted(params.items()))
+
+
+def get_http_client(provider: str) -> Any:
+    """Return the shared keep-alive HTTP client for a provider."""
+    with _lock:
+        if provider not in _http_clients:
+            import httpx
+            import openai
+
+            _http_clients[provider] = openai.DefaultHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", 100)),
+                    max_keepalive_connections=int(
+                        os.getenv("LLM_HTTP_MAX_KEEPALIVE", 20)
+                    ),
+                    keepalive_expiry=float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", 60)),
+                )
+            )
+        return _http_clients[provider]
+
+
+def _build_chat_model(provider: str, name: str, params: Dict[str, Any]) -> BaseChatModel:
+    # Imported here: it pulls in the provider integrations on first model build
+    from langchain.chat_models import init_chat_model
+
+    kwargs = dict(params)
+    if provider == "openai":
+        # Async calls use langchain_openai's own cached async client
+        kwargs.setdefault("http_client", get_http_client(provider))
+        if RATE_LIMIT_ENABLED:
+            # The scheduler retries; client retries would bypass its budgets
+            kwargs.setdefault("max_retries", 0)
+    return init_chat_model(f"{provider}:{name}", **kwargs)
+
+
+def get_chat_model(
+    model: str, priority: Priority = Priority.INTERACTIVE, **params: Hashable
+) -> BaseChatModel:
+    """
+    Return the shared chat model for (provider, model, params), building it once.
+
+    Args:
+        model: Model identifier in "provider:model" form, e.g. "openai:gpt-4o"
+        priority: Queue position when the model's rate limit runs short
+        **params: Model parameters such as temperature or streaming
+
+    Returns:
+        A chat model instance shared by every caller with the same key
+    """
+    with _lock:
+        key = _model_key(model, params)
+        if model in _overrides:
+            chat_model = _overrides[model]
+        else:
+            if key not in _models:
+                provider, name, _ = key
+                _models[key] = _build_chat_model(provider, name, params)
+            chat_model = _models[key]
+
+        if not RATE_LIMIT_ENABLED:
+            return chat_model
+        if (key, priority) not in _limited:
+            _limited[(key, priority)] = RateLimitedChatModel(
+                inner=chat_model, limit_key=key[1], priority=priority
+            )
+        return _limited[(key, priority)]
+
+
+def get_chain(
+    name: str,
+    build_prompt: Callable[[], Runnable],
+    model: str,
+    priority: Priority = Priority.INTERACTIVE,
+    **params: Hashable,
+) -> Runnable:
+    """
+    Return the shared ``prompt | model`` chain, compiling it once.
+
+    Args:
+        name: Unique name of the prompt, e.g. "respond"
+        build_prompt: Factory for the prompt template (called once)
+        model: Model identifier in "provider:model" form
+        priority: Queue position when the model's rate limit runs short
+        **params: Model parameters, as for get_chat_model
+
+    Returns:
+        The compiled chain shared by every caller with the same key
+    """
+    key = (name, _model_key(model, params), priority)
+    with _lock:
+        if key not in _chains:
+            _chains[key] = build_prompt() | get_chat_model(
+                model, priority=priority, **params
+            )
+        return _chains[key]
+
+
+def override_chat_model(model: str, chat_model: BaseChatModel) -> None:
+    """Serve ``chat_model`` for every request of ``model`` (fakes for tests and benchmarks)."""
+    with _lock:
+        _overrides[model] = chat_model
+        _chains.clear()
+        _limited.clear()
+
+
+def clear_registry() -> None:
+    """Forget all cached models, chains and overrides."""
+    with _lock:
+        _models.clear()
+        _chains.clear()
+        _overrides.clear()
+        _limited.clear()
@@ -3,8 +3,8 @@ from operator import itemgetter
 from dotenv import load_dotenv
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableParallel
-from langchain.chat_models import init_chat_model
 
+from src.llm import get_chat_model
 from src.prompt_engineering.prompts.advertising.costar_prompt_ads import (
     costar_prompt_advertising,
 )
@@ -12,9 +12,6 @@ from src.prompt_engineering.prompts.advertising.generic_prompt_ads import (
     generic_prompt_advertising,
 )
 
-load_dotenv()
-llm = init_chat_model("openai:gpt-4o", temperature=0, streaming=True)
-
 
 def run_costar_examples():
     GENERIC_PROMPT = ChatPromptTemplate.from_template(generic_prompt_advertising)
@@ -35,6 +32,8 @@ def run_costar_examples():
 
 
 def run_rag_chain(prompt, product, target_audience):
+    llm = get_chat_model("openai:gpt-4o", temperature=0, streaming=True)
+
     rag_chain = (
         RunnableParallel(
             product=itemgetter("product"),
@@ -52,4 +51,5 @@ def run_rag_chain(prompt, product, target_audience):
 
 
 if __name__ == "__main__":
+    load_dotenv()
     run_costar_examples()
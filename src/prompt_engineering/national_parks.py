@@ -2,13 +2,12 @@ import json
 from operator import itemgetter
 
 from dotenv import load_dotenv
-from langchain_tavily import TavilySearch
 from langchain_core.documents import Document
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableParallel
-from langchain.chat_models import init_chat_model
 from langsmith import traceable
 
+from src.llm import get_chat_model
 from src.prompt_engineering.prompts.national_parks.costar_prompt import (
     costar_prompt,
 )
@@ -16,9 +15,6 @@ from src.prompt_engineering.prompts.national_parks.generic_prompt import (
     generic_prompt,
 )
 
-load_dotenv()
-llm = init_chat_model("openai:gpt-4o", temperature=0, streaming=True)
-
 
 def run_costar_examples():
     GENERIC_PROMPT = ChatPromptTemplate.from_template(generic_prompt)
@@ -64,6 +60,8 @@ def get_internet_articles(
 ) -> list:
     question = f"Planning a trip to {destination} in {season} for {duration} with interests in {interests}"
 
+    from langchain_tavily import TavilySearch
+
     tavily_search = TavilySearch(max_results=5)
     search_response = tavily_search.invoke({"query": question})
 
@@ -78,6 +76,8 @@ def get_internet_articles(
 
 @traceable(name="national parks")
 def run_rag_chain(prompt, context, destination, season, duration, interests):
+    llm = get_chat_model("openai:gpt-4o", temperature=0, streaming=True)
+
     rag_chain = RunnableParallel(
         context=itemgetter("context"),
         destination=itemgetter("destination"),
@@ -98,4 +98,5 @@ def run_rag_chain(prompt, context, destination, season, duration, interests):
 
 
 if __name__ == "__main__":
+    load_dotenv()
     run_costar_examples()
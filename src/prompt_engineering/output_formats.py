@@ -3,13 +3,13 @@ from operator import itemgetter
 from dotenv import load_dotenv
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableParallel
-from langchain.chat_models import init_chat_model
 
-load_dotenv()
-llm = init_chat_model("openai:gpt-4o", temperature=0, streaming=True)
+from src.llm import get_chat_model
 
 
 def run_example():
+    llm = get_chat_model("openai:gpt-4o", temperature=0, streaming=True)
+
     # TODO: Update the prompt to output xml.
     prompt = """
     # Instructions
@@ -46,4 +46,5 @@ def run_example():
 
 
 if __name__ == "__main__":
+    load_dotenv()
     run_example()